@@ -40,3 +40,23 @@ class DatabaseConfig:
     def get_max_rows() -> int:
         """Limite maximale de lignes pour les requêtes"""
         return int(os.getenv('MAX_QUERY_ROWS', 10000))
+    
+    @staticmethod
+    def get_plan_cost_warning() -> float:
+        """Coût estimé par le planificateur au-delà duquel une VIEW est signalée coûteuse"""
+        return float(os.getenv('PLAN_COST_WARNING', 1000000))
+    
+    @staticmethod
+    def get_plan_rows_warning() -> int:
+        """Nombre de lignes estimé au-delà duquel le résultat d'une VIEW est signalé volumineux"""
+        return int(os.getenv('PLAN_ROWS_WARNING', 1000000))
+    
+    @staticmethod
+    def get_plan_scan_cost_warning() -> float:
+        """Coût d'un parcours séquentiel au-delà duquel il est signalé, même si la requête reste sous le seuil"""
+        return float(os.getenv('PLAN_SCAN_COST_WARNING', 100000))
+    
+    @staticmethod
+    def get_worker_threads() -> int:
+        """Nombre de threads du pool de tâches (inférieur à la taille du pool de connexions)"""
+        return int(os.getenv('WORKER_THREADS', 4))
@@ -2,41 +2,82 @@
 Contrôleur principal - Orchestration MVC et gestion des événements
 """
 
-from PySide6.QtCore import QObject, QTimer
+from PySide6.QtCore import QObject, QTimer, Qt
+from PySide6.QtWidgets import QProgressDialog
 import logging
-from typing import Dict, Optional
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional
 
-from ..models.analysis_engine import AnalysisEngine
+from ..models.result_cache import ResultCache
 from ..views.main_window import MainWindow
-from ..utils.worker import AnalysisWorker, ViewDiscoveryWorker, ViewInfoWorker
+from ..utils.worker import (AnalysisWorker, ExportWorker, StartupWorker, ViewDiscoveryWorker,
+                            ViewInfoWorker, prepare_analysis_filters)
+from ..config.database import DatabaseConfig
+from ..utils.task_scheduler import TaskScheduler, TaskPriority
+from .prefetch_policy import PrefetchPolicy
 from ..utils.exceptions import DatabaseConnectionError
 
+# Moteur (pandas, SQLAlchemy) créé en arrière-plan au démarrage
+if TYPE_CHECKING:
+    from ..models.analysis_engine import AnalysisEngine
+
 logger = logging.getLogger(__name__)
 
 class MainController(QObject):
     """Contrôleur principal de l'application MVC"""
     
-    def __init__(self, analysis_engine: AnalysisEngine, main_window: MainWindow):
+    # Délai d'attente après le dernier changement de filtre avant relance (ms)
+    FILTER_DEBOUNCE_MS = 400
+    
+    def __init__(self, analysis_engine: Optional['AnalysisEngine'], main_window: MainWindow):
         """
         Initialisation du contrôleur
         
         Args:
-            analysis_engine: Moteur d'analyse (Modèle)
+            analysis_engine: Moteur d'analyse (Modèle), ou None s'il est créé
+                en arrière-plan par start_background_startup()
             main_window: Interface principale (Vue)
         """
         super().__init__()
         self.analysis_engine = analysis_engine
         self.main_window = main_window
         
-        # Workers actifs
+        # Pool de tâches borné (threads réutilisés, priorités, annulation)
+        self.scheduler = TaskScheduler(
+            max_threads=DatabaseConfig.get_worker_threads(),
+            parent=self
+        )
+        self.scheduler.queue_depth_changed.connect(self.on_queue_depth_changed)
+        
+        # Tâches courantes (les résultats des autres tâches sont ignorés)
         self.current_analysis_worker: Optional[AnalysisWorker] = None
         self.current_discovery_worker: Optional[ViewDiscoveryWorker] = None
         self.current_info_worker: Optional[ViewInfoWorker] = None
+        self.current_export_worker: Optional[ExportWorker] = None
+        self.startup_worker: Optional[StartupWorker] = None
+        self._startup_started_at: Optional[float] = None
+        self._startup_factories = None  # Conservées pour réessayer la connexion
+        self._chunks_displayed = 0  # Blocs de l'analyse courante déjà affichés
+        self.export_progress_dialog: Optional[QProgressDialog] = None
         
         # État de l'application
         self.is_connected = False
         self.available_views = []
         
+        # Ré-analyse pilotée par les filtres (anti-rebond + cache de résultats)
+        self.result_cache = ResultCache()
+        self.displayed_view: Optional[str] = None  # VIEW dont les résultats sont affichés
+        self.displayed_params: Optional[Dict] = None  # Paramètres du résultat affiché (export)
+        self._pending_filters: Optional[Dict] = None
+        self.filter_debounce_timer = QTimer(self)
+        self.filter_debounce_timer.setSingleShot(True)
+        self.filter_debounce_timer.setInterval(self.FILTER_DEBOUNCE_MS)
+        self.filter_debounce_timer.timeout.connect(self._apply_pending_filters)
+        
+        # Préchargement spéculatif du rapport sélectionné ou survolé
+        self.prefetch_policy = PrefetchPolicy()
+        self.prefetch_tasks: Dict[tuple, AnalysisWorker] = {}
+        
         # Configuration
         self.setup_connections()
         self.initialize_application()
@@ -51,13 +92,21 @@ class MainController(QObject):
         self.main_window.report_selected.connect(self.on_report_selected)
         self.main_window.filters_changed.connect(self.on_filters_changed)
         self.main_window.view_structure_requested.connect(self.on_view_structure_requested)
+        self.main_window.export_requested.connect(self.on_export_requested)
+        self.main_window.report_hovered.connect(self.on_report_hovered)
         
         logger.info("🔗 Signal/slot connections configured")
     
     def initialize_application(self):
         """Initialisation de l'application au démarrage"""
-        # Test de connexion et chargement des VIEWs
-        self.refresh_views()
+        if self.analysis_engine is None:
+            # Connexion en cours en arrière-plan (start_background_startup)
+            self.main_window.update_connection_status(False)
+            return
+        
+        # Moteur déjà connecté : ses VIEWs sont réutilisées (pas de seconde découverte)
+        self.available_views = self.analysis_engine.get_available_analyses()
+        self.main_window.populate_views(self.available_views)
         
         # Mise à jour du statut de connexion
         try:
@@ -69,6 +118,56 @@ class MainController(QObject):
             self.main_window.update_connection_status(False)
             self.main_window.show_error(f"Erreur de connexion à la base de données: {e}")
     
+    def start_background_startup(self, database_manager_factory: Callable,
+                                 analysis_engine_factory: Callable):
+        """
+        Connexion et découverte des VIEWs en arrière-plan, fenêtre déjà affichée
+        
+        Args:
+            database_manager_factory: Création du DatabaseManager
+            analysis_engine_factory: Création du moteur à partir de (db_manager, views)
+        """
+        self._startup_started_at = time.perf_counter()
+        self._startup_factories = (database_manager_factory, analysis_engine_factory)
+        self.main_window.show_loading("Connexion à la base de données...")
+        
+        self.startup_worker = StartupWorker(database_manager_factory, analysis_engine_factory)
+        self.startup_worker.finished.connect(self.on_startup_finished)
+        self.startup_worker.error.connect(self.on_startup_error)
+        self.scheduler.submit(self.startup_worker)
+    
+    def on_startup_finished(self, analysis_engine, views_list: list, connection_info: dict):
+        """
+        Moteur prêt : rattachement au contrôleur et à la vue
+        
+        Args:
+            analysis_engine: Moteur créé avec les VIEWs découvertes
+            views_list: VIEWs découvertes (une seule découverte au démarrage)
+            connection_info: Informations de connexion
+        """
+        self.startup_worker = None
+        self.analysis_engine = analysis_engine
+        self.main_window.database_manager = analysis_engine.db_manager
+        self.main_window.analysis_engine = analysis_engine
+        
+        self.is_connected = True
+        self.main_window.update_connection_status(True, connection_info)
+        
+        self.available_views = views_list
+        self.main_window.populate_views(views_list)
+        self.main_window.hide_loading()
+        
+        elapsed_ms = (time.perf_counter() - self._startup_started_at) * 1000
+        logger.info(f"⏱️ Database ready {elapsed_ms:.0f} ms after window display")
+    
+    def on_startup_error(self, error_message: str):
+        """Échec de la connexion initiale (la fenêtre reste utilisable pour réessayer)"""
+        self.startup_worker = None
+        self.main_window.update_connection_status(False)
+        # Boutons réactivés : Actualiser relance la connexion
+        self.main_window.hide_loading()
+        self.main_window.show_error(error_message)
+    
     # === GESTION DES ÉVÉNEMENTS DE LA VUE ===
     
     def on_generate_analysis(self, params: Dict):
@@ -78,6 +177,10 @@ class MainController(QObject):
         Args:
             params: Paramètres de l'analyse (view_name, filtres, etc.)
         """
+        if self.analysis_engine is None:
+            self.main_window.show_warning("Connexion à la base de données en cours")
+            return
+        
         try:
             view_name = params.get('view_name', '')
             
@@ -91,31 +194,21 @@ class MainController(QObject):
             
             logger.info(f"🚀 Lancement analyse pour {view_name}")
             
-            # Annulation de l'analyse précédente si active
-            if self.current_analysis_worker and self.current_analysis_worker.isRunning():
-                self.current_analysis_worker.cancel()
-                self.current_analysis_worker.wait(1000)  # Attente max 1 seconde
-            
-            # Affichage du chargement
-            self.main_window.show_loading(f"Analyse de {view_name}...")
+            # Un clic explicite remplace toute ré-analyse en attente
+            self.filter_debounce_timer.stop()
+            self._pending_filters = None
             
             # Préparation des paramètres
             analysis_params = params.copy()
             analysis_params['view_name'] = view_name
             
-            # Création et lancement du worker
-            self.current_analysis_worker = AnalysisWorker(
-                self.analysis_engine, 
-                analysis_params
-            )
-            
-            # Connexion des signaux du worker
-            self.current_analysis_worker.finished.connect(self.on_analysis_finished)
-            self.current_analysis_worker.error.connect(self.on_analysis_error)
-            self.current_analysis_worker.progress.connect(self.on_analysis_progress)
+            # Résultat récent (préchargé) ou préchargement en cours : pas de nouvelle requête
+            if self._display_cached(analysis_params, max_age=self.prefetch_policy.ttl):
+                return
+            if self._adopt_prefetch(analysis_params):
+                return
             
-            # Démarrage
-            self.current_analysis_worker.start()
+            self._start_analysis(analysis_params)
             
         except Exception as e:
             logger.error(f"❌ Erreur lancement analyse: {e}")
@@ -129,7 +222,7 @@ class MainController(QObject):
         Args:
             report_name: Nom du rapport sélectionné
         """
-        if not report_name or report_name == "Aucun rapport disponible":
+        if not report_name or report_name == "Aucun rapport disponible" or self.analysis_engine is None:
             return
         
         # Extraction du nom réel
@@ -138,24 +231,63 @@ class MainController(QObject):
         logger.info(f"📋 Report selected: {view_name}")
         
         # Récupération des informations de la VIEW en arrière-plan
-        if self.current_info_worker and self.current_info_worker.isRunning():
-            self.current_info_worker.terminate()
+        self.scheduler.cancel(self.current_info_worker)
         
         self.current_info_worker = ViewInfoWorker(self.analysis_engine, view_name)
         self.current_info_worker.finished.connect(self.on_view_info_received)
         self.current_info_worker.error.connect(self.on_view_info_error)
-        self.current_info_worker.start()
+        self.scheduler.submit(self.current_info_worker)
+        
+        # Analyse préchargée avec les filtres actuels
+        self._prefetch(view_name)
+    
+    def on_report_hovered(self, view_name: str):
+        """
+        Survol d'un rapport dans la liste : préchargement si le budget le permet
+        
+        Args:
+            view_name: Nom de la VIEW survolée
+        """
+        self._prefetch(view_name)
     
     def on_filters_changed(self, filters: Dict):
         """
         Gestion du changement des filtres
         
+        Les changements rapprochés (défilement des dates) sont regroupés :
+        seul le dernier état est analysé, une fois le délai d'anti-rebond écoulé.
+        
         Args:
             filters: Nouveaux filtres appliqués
         """
-        # Pour l'instant, simple logging
-        # Peut être étendu pour un rafraîchissement automatique
         logger.debug(f"🔍 Filters modified: {filters}")
+        
+        self._pending_filters = filters
+        self.filter_debounce_timer.start()  # Redémarre le délai à chaque changement
+    
+    def _apply_pending_filters(self):
+        """Relance l'analyse affichée avec le dernier état des filtres"""
+        filters = self._pending_filters
+        self._pending_filters = None
+        
+        view_name = self._selected_view_name()
+        if not filters or not view_name or view_name != self.displayed_view:
+            # Pas encore de résultat affiché pour ce rapport : on attend « Générer »
+            return
+        
+        params = {
+            'view_name': view_name,
+            'date_start': filters.get('date_start'),
+            'date_end': filters.get('date_end'),
+            'filters': filters
+        }
+        
+        # Sous-plage d'un résultat déjà chargé : filtrage local, sans requête
+        if self._display_cached(params):
+            return
+        
+        logger.info(f"🔁 Live re-analysis for {view_name}")
+        self._start_analysis(params)
     
     def on_view_structure_requested(self, request: str):
         """
@@ -166,6 +298,7 @@ class MainController(QObject):
         """
         if request == "refresh":
             logger.info("♻️ VIEWs refresh requested")
+            self.result_cache.invalidate()
             self.refresh_views()
     
     # === GESTION DES RÉPONSES DES WORKERS ===
@@ -177,24 +310,53 @@ class MainController(QObject):
         Args:
             dataframe: Résultats de l'analyse
         """
+        worker = self.sender()
+        if worker is not self.current_analysis_worker:
+            # Résultat d'une requête remplacée entre-temps : ignoré
+            return
+        
         try:
             logger.info(f"✅ Analysis completed: {len(dataframe)} rows")
             
+            # Mise en cache pour le filtrage local des sous-plages
+            self._cache_result(worker.params, dataframe)
+            self.displayed_view = worker.params.get('view_name')
+            self.displayed_params = worker.params
+            
             # Masquage du chargement
             self.main_window.hide_loading()
             
-            # Affichage des résultats
-            self.main_window.display_data(dataframe)
+            # Affichage des résultats (finalisation si les blocs sont déjà affichés)
+            if self._chunks_displayed:
+                self.main_window.finish_data(dataframe)
+            else:
+                self.main_window.display_data(dataframe)
+            self._chunks_displayed = 0
             
             # Nettoyage
-            if self.current_analysis_worker:
-                self.current_analysis_worker.deleteLater()
-                self.current_analysis_worker = None
+            self.current_analysis_worker = None
             
         except Exception as e:
             logger.error(f"❌ Error processing results: {e}")
             self.main_window.show_error(f"Erreur lors de l'affichage des résultats: {e}")
     
+    def on_analysis_chunk(self, chunk):
+        """
+        Affichage progressif d'un bloc de résultats
+        
+        Args:
+            chunk: Bloc de lignes reçu par le worker
+        """
+        if self.sender() is not self.current_analysis_worker:
+            return
+        
+        if self._chunks_displayed == 0:
+            # Premier bloc : tableau, sélecteurs et graphique initialisés immédiatement
+            self.main_window.display_data(chunk)
+        else:
+            self.main_window.append_data(chunk)
+        self._chunks_displayed += 1
+    
     def on_analysis_error(self, error_message: str):
         """
         Gestion des erreurs d'analyse
@@ -202,15 +364,16 @@ class MainController(QObject):
         Args:
             error_message: Message d'erreur
         """
+        if self.sender() is not self.current_analysis_worker:
+            return
+        
         logger.error(f"❌ Erreur analyse: {error_message}")
         
         self.main_window.hide_loading()
         self.main_window.show_error(f"Erreur d'analyse: {error_message}")
         
         # Nettoyage
-        if self.current_analysis_worker:
-            self.current_analysis_worker.deleteLater()
-            self.current_analysis_worker = None
+        self.current_analysis_worker = None
     
     def on_analysis_progress(self, message: str):
         """
@@ -219,6 +382,9 @@ class MainController(QObject):
         Args:
             message: Message de progression
         """
+        if self.sender() is not self.current_analysis_worker:
+            return
+        
         # Mise à jour du statut
         if hasattr(self.main_window, 'lbl_status'):
             self.main_window.lbl_status.setText(message)
@@ -230,19 +396,21 @@ class MainController(QObject):
         Args:
             views_list: Liste des VIEWs découvertes
         """
+        if self.sender() is not self.current_discovery_worker:
+            return
+        
         try:
             logger.info(f"📊 {len(views_list)} VIEWs discovered")
             
             self.available_views = views_list
+            self.analysis_engine.set_available_views(views_list)
             self.main_window.populate_views(views_list)
             
             # Masquage du chargement
             self.main_window.hide_loading()
             
             # Nettoyage
-            if self.current_discovery_worker:
-                self.current_discovery_worker.deleteLater()
-                self.current_discovery_worker = None
+            self.current_discovery_worker = None
             
         except Exception as e:
             logger.error(f"❌ Erreur traitement VIEWs: {e}")
@@ -255,15 +423,16 @@ class MainController(QObject):
         Args:
             error_message: Message d'erreur
         """
+        if self.sender() is not self.current_discovery_worker:
+            return
+        
         logger.error(f"❌ Error discovering VIEWs: {error_message}")
         
         self.main_window.hide_loading()
         self.main_window.show_error(f"Erreur lors de la découverte des rapports: {error_message}")
         
         # Nettoyage
-        if self.current_discovery_worker:
-            self.current_discovery_worker.deleteLater()
-            self.current_discovery_worker = None
+        self.current_discovery_worker = None
     
     def on_view_info_received(self, view_name: str, info: dict):
         """
@@ -273,13 +442,14 @@ class MainController(QObject):
             view_name: Nom de la VIEW
             info: Informations détaillées
         """
+        if self.sender() is not self.current_info_worker:
+            return
+        
         logger.info(f"ℹ️ Information received for {view_name}")
         self.main_window.update_view_info(view_name, info)
         
         # Nettoyage
-        if self.current_info_worker:
-            self.current_info_worker.deleteLater()
-            self.current_info_worker = None
+        self.current_info_worker = None
     
     def on_view_info_error(self, view_name: str, error_message: str):
         """
@@ -289,22 +459,288 @@ class MainController(QObject):
             view_name: Nom de la VIEW
             error_message: Message d'erreur
         """
+        if self.sender() is not self.current_info_worker:
+            return
+        
         logger.warning(f"⚠️ Erreur info VIEW {view_name}: {error_message}")
         self.main_window.update_view_info(view_name, {'error': error_message})
         
         # Nettoyage
-        if self.current_info_worker:
-            self.current_info_worker.deleteLater()
-            self.current_info_worker = None
+        self.current_info_worker = None
+    
+    def on_queue_depth_changed(self, depth: int):
+        """Suivi de la file d'attente des tâches"""
+        logger.debug(f"🧵 Task queue depth: {depth}")
+    
+    # === PRÉCHARGEMENT ===
+    
+    def _prefetch(self, view_name: str):
+        """
+        Lance l'analyse d'une VIEW en basse priorité avec les filtres actuels
+        
+        Le résultat est mis en cache ; un clic sur « Générer » le réutilise.
+        """
+        if self.analysis_engine is None or view_name not in {view.get('name') for view in self.available_views}:
+            return
+        
+        params = self.main_window.get_analysis_params(view_name)
+        filters = prepare_analysis_filters(params)
+        key = self._prefetch_key(params)
+        
+        adopted = self.current_analysis_worker is not None and self.current_analysis_worker.key == key
+        if adopted or key in self.prefetch_tasks or self.result_cache.contains(
+                view_name, filters, max_age=self.prefetch_policy.ttl):
+            return
+        if not self.prefetch_policy.allow(key, self.scheduler.queue_depth()):
+            return
+        
+        task = AnalysisWorker(self.analysis_engine, params,
+                              priority=TaskPriority.PREFETCH, key=key)
+        task.finished.connect(self.on_prefetch_finished)
+        task.error.connect(self.on_prefetch_error)
+        
+        self.prefetch_tasks[key] = task
+        self.prefetch_policy.started(key)
+        self.scheduler.submit(task)
+        logger.info(f"🔮 Prefetching {view_name}")
+    
+    def on_prefetch_finished(self, dataframe):
+        """Mise en cache d'un résultat préchargé"""
+        task = self.sender()
+        self._release_prefetch(task)
+        if task is self.current_analysis_worker:
+            return  # Adopté : traité par on_analysis_finished
+        
+        self._cache_result(task.params, dataframe, ttl=self.prefetch_policy.ttl)
+        logger.info(f"🔮 Prefetched {task.params.get('view_name')}: {len(dataframe)} rows")
+    
+    def on_prefetch_error(self, error_message: str):
+        """Échec d'un préchargement (sans effet visible)"""
+        self._release_prefetch(self.sender())
+        logger.debug(f"🔮 Prefetch failed: {error_message}")
+    
+    def _adopt_prefetch(self, params: Dict) -> bool:
+        """
+        Reprend un préchargement en cours pour une demande explicite
+        
+        Un préchargement encore en file est annulé : la demande est relancée
+        en priorité normale plutôt que d'attendre derrière le travail en cours.
+        Un préchargement adopté quitte le suivi des préchargements ; une
+        nouvelle demande identique pendant son exécution le laisse continuer.
+        """
+        key = self._prefetch_key(params)
+        current = self.current_analysis_worker
+        if current is not None and current.key == key and not current.is_cancelled:
+            return True
+        
+        task = self.prefetch_tasks.get(key)
+        if task is None:
+            return False
+        
+        if not task.is_started:
+            self._release_prefetch(task)
+            self.scheduler.cancel(task)
+            return False
+        
+        logger.info(f"🔮 Adopting in-flight prefetch for {params['view_name']}")
+        del self.prefetch_tasks[key]
+        self.prefetch_policy.adopted(key)
+        
+        self._retire_analysis_worker()
+        self.main_window.show_loading(f"Analyse de {params['view_name']}...")
+        self.current_analysis_worker = task
+        # Blocs déjà lus non affichés : le résultat complet est affiché à la fin
+        task.finished.connect(self.on_analysis_finished)
+        task.error.connect(self.on_analysis_error)
+        task.progress.connect(self.on_analysis_progress)
+        return True
+    
+    def _release_prefetch(self, task):
+        """Retire un préchargement du suivi et libère son budget (sans effet s'il a été adopté)"""
+        if task is None or self.prefetch_tasks.get(task.key) is not task:
+            return
+        del self.prefetch_tasks[task.key]
+        self.prefetch_policy.finished(task.key)
+    
+    def _prefetch_key(self, params: Dict) -> tuple:
+        """Clé d'un préchargement : VIEW et filtres envoyés à la base"""
+        filters = prepare_analysis_filters(params)
+        return ('prefetch', params['view_name'],
+                tuple(sorted((k, str(v)) for k, v in filters.items())))
+    
+    # === EXPORT ===
+    
+    def on_export_requested(self, request: Dict):
+        """
+        Export complet de l'analyse affichée
+        
+        La requête est relancée sans limite de lignes et écrite par blocs :
+        le fichier contient tout le résultat, pas seulement les lignes affichées.
+        
+        Args:
+            request: Chemin ('path') et format ('format') du fichier
+        """
+        if not self.displayed_params:
+            self.main_window.show_warning("Aucune analyse à exporter")
+            return
+        if self.current_export_worker and not self.current_export_worker.is_done:
+            self.main_window.show_warning("Un export est déjà en cours")
+            return
+        
+        from ..models.export_pipeline import StreamingExporter
+        
+        exporter = StreamingExporter(self.analysis_engine)
+        self.current_export_worker = ExportWorker(
+            exporter, dict(self.displayed_params), request['path'], request['format']
+        )
+        
+        # Progression : nombre de lignes inconnu à l'avance (barre indéterminée)
+        dialog = QProgressDialog("Export en cours...", "Annuler", 0, 0, self.main_window)
+        dialog.setWindowTitle("📤 Export")
+        dialog.setWindowModality(Qt.WindowModal)
+        dialog.setMinimumDuration(0)
+        dialog.canceled.connect(self.current_export_worker.cancel)
+        self.export_progress_dialog = dialog
+        
+        self.current_export_worker.progress.connect(self.on_export_progress)
+        self.current_export_worker.finished.connect(self.on_export_finished)
+        self.current_export_worker.error.connect(self.on_export_error)
+        self.current_export_worker.cancelled.connect(self.on_export_cancelled)
+        
+        self.scheduler.submit(self.current_export_worker)
+        dialog.show()
+    
+    def on_export_progress(self, rows: int, rows_per_second: float):
+        """Mise à jour de la progression de l'export"""
+        if self.export_progress_dialog:
+            self.export_progress_dialog.setLabelText(
+                f"{rows:,} lignes exportées ({rows_per_second:,.0f} lignes/s)"
+            )
+    
+    def on_export_finished(self, path: str, rows: int):
+        """Fin de l'export"""
+        self._finish_export()
+        self.main_window.lbl_status.setText(f"Export terminé: {rows} lignes")
+        self.main_window.show_info(f"{rows} lignes exportées vers {path}")
+    
+    def on_export_error(self, error_message: str):
+        """Erreur d'export (aucun fichier partiel n'est conservé)"""
+        self._finish_export()
+        self.main_window.show_error(error_message)
+    
+    def on_export_cancelled(self):
+        """Export annulé par l'utilisateur"""
+        self._finish_export()
+        self.main_window.lbl_status.setText("Export annulé")
+    
+    def _finish_export(self):
+        """Fermeture du dialogue de progression et libération du worker"""
+        if self.export_progress_dialog:
+            self.export_progress_dialog.canceled.disconnect()
+            self.export_progress_dialog.close()
+            self.export_progress_dialog.deleteLater()
+            self.export_progress_dialog = None
+        self.current_export_worker = None
     
     # === MÉTHODES UTILITAIRES ===
     
+    def _start_analysis(self, analysis_params: Dict):
+        """
+        Lance une analyse en arrière-plan
+        
+        Une seule analyse est active : la précédente est annulée et son
+        résultat sera ignoré s'il arrive malgré tout.
+        
+        Args:
+            analysis_params: Paramètres complets (view_name, dates, filtres)
+        """
+        view_name = analysis_params['view_name']
+        
+        # Annulation de l'analyse précédente si active (sans bloquer l'interface)
+        self._retire_analysis_worker()
+        
+        # Affichage du chargement
+        self.main_window.show_loading(f"Analyse de {view_name}...")
+        
+        # Création et lancement du worker
+        self.current_analysis_worker = AnalysisWorker(
+            self.analysis_engine, 
+            analysis_params
+        )
+        
+        # Connexion des signaux du worker
+        self.current_analysis_worker.finished.connect(self.on_analysis_finished)
+        self.current_analysis_worker.chunk_ready.connect(self.on_analysis_chunk)
+        self.current_analysis_worker.error.connect(self.on_analysis_error)
+        self.current_analysis_worker.progress.connect(self.on_analysis_progress)
+        
+        # Démarrage
+        self.scheduler.submit(self.current_analysis_worker)
+    
+    def _retire_analysis_worker(self):
+        """Annule l'analyse en cours (retirée de la file si elle n'a pas démarré)"""
+        self.scheduler.cancel(self.current_analysis_worker)
+        self.current_analysis_worker = None
+        self._chunks_displayed = 0
+    
+    def _display_cached(self, params: Dict, max_age: Optional[float] = None) -> bool:
+        """
+        Affiche un résultat servi par le cache (exact ou filtré localement)
+        
+        Returns:
+            True si le cache a fourni le résultat
+        """
+        cached = self.result_cache.lookup(params['view_name'], prepare_analysis_filters(params),
+                                          max_age=max_age)
+        if cached is None:
+            return False
+        
+        self._retire_analysis_worker()
+        self.main_window.hide_loading()
+        self.displayed_view = params['view_name']
+        self.displayed_params = params
+        self.main_window.display_data(cached)
+        self.main_window.lbl_status.setText(f"Résultat en cache: {len(cached)} lignes")
+        return True
+    
+    def _cache_result(self, params: Dict, dataframe, ttl: Optional[float] = None):
+        """Enregistre un résultat d'analyse dans le cache local"""
+        view_name = params.get('view_name')
+        if not view_name:
+            return
+        
+        # Un résultat tronqué ne peut pas servir de base au filtrage local
+        max_rows = self.analysis_engine.db_manager.config.get_max_rows()
+        complete = not params.get('limit') and len(dataframe) < max_rows
+        
+        self.result_cache.store(
+            view_name,
+            prepare_analysis_filters(params),
+            dataframe,
+            date_column=self.analysis_engine.get_date_column(view_name),
+            complete=complete,
+            ttl=ttl
+        )
+    
+    def _selected_view_name(self) -> Optional[str]:
+        """Nom réel de la VIEW sélectionnée dans l'interface"""
+        text = self.main_window.combo_views.currentText()
+        view_name = text.split(' (')[0] if ' (' in text else text
+        if not view_name or view_name in ("Aucun rapport disponible", "No reports available"):
+            return None
+        return view_name
+    
     def refresh_views(self):
         """Actualisation de la liste des VIEWs disponibles"""
+        if self.analysis_engine is None:
+            if self.startup_worker is None and self._startup_factories is not None:
+                # Connexion initiale échouée : nouvelle tentative
+                self.start_background_startup(*self._startup_factories)
+            return
+        
         try:
             # Annulation de la découverte précédente si active
-            if self.current_discovery_worker and self.current_discovery_worker.isRunning():
-                self.current_discovery_worker.terminate()
+            self.scheduler.cancel(self.current_discovery_worker)
             
             # Affichage du chargement
             self.main_window.show_loading("Découverte des rapports...")
@@ -319,7 +755,7 @@ class MainController(QObject):
             self.current_discovery_worker.error.connect(self.on_views_discovery_error)
             
             # Démarrage
-            self.current_discovery_worker.start()
+            self.scheduler.submit(self.current_discovery_worker)
             
         except Exception as e:
             logger.error(f"❌ Erreur actualisation VIEWs: {e}")
@@ -330,19 +766,10 @@ class MainController(QObject):
         """Nettoyage avant fermeture de l'application"""
         logger.info("🧹 Controller cleanup")
         
-        # Arrêt des workers actifs
-        workers = [
-            self.current_analysis_worker,
-            self.current_discovery_worker,
-            self.current_info_worker
-        ]
+        self.filter_debounce_timer.stop()
         
-        for worker in workers:
-            if worker and worker.isRunning():
-                if hasattr(worker, 'cancel'):
-                    worker.cancel()
-                worker.terminate()
-                worker.wait(1000)  # Attente max 1 seconde
+        # Annulation des tâches et attente de celles en cours (max 1 seconde)
+        self.scheduler.shutdown(1000)
         
         logger.info("✅ Cleanup completed")
     
@@ -352,5 +779,7 @@ class MainController(QObject):
             'connected': self.is_connected,
             'views_count': len(self.available_views),
             'current_view': self.main_window.combo_views.currentText(),
-            'has_data': not self.main_window.current_data.empty
+            'has_data': self.main_window.has_data(),
+            'saved_queries': (self.analysis_engine.get_in_flight_stats()['saved_queries']
+                              if self.analysis_engine else 0)
         }
@@ -0,0 +1,79 @@
+"""
+Politique de préchargement spéculatif des analyses
+Budget borné : le préchargement ne doit jamais retarder le travail demandé
+"""
+
+import logging
+import time
+from typing import Hashable, Set
+
+logger = logging.getLogger(__name__)
+
+class PrefetchPolicy:
+    """
+    Décide si une analyse peut être préchargée
+
+    Un préchargement n'est lancé que si le budget le permet : nombre de
+    préchargements simultanés limité (une connexion au plus par défaut),
+    file de l'ordonnanceur vide et intervalle minimal entre deux lancements.
+    """
+
+    def __init__(self, max_concurrent: int = 1, max_queue_depth: int = 0,
+                 min_interval: float = 1.0, ttl: float = 120.0, enabled: bool = True):
+        """
+        Args:
+            max_concurrent: Préchargements simultanés autorisés
+            max_queue_depth: Profondeur de file au-delà de laquelle on s'abstient
+            min_interval: Délai minimal entre deux lancements (secondes)
+            ttl: Durée de validité d'un résultat préchargé (secondes)
+            enabled: Activation du préchargement
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue_depth = max_queue_depth
+        self.min_interval = min_interval
+        self.ttl = ttl
+        self.enabled = enabled
+
+        self._in_flight: Set[Hashable] = set()
+        self._last_start = 0.0
+        self.stats = {'started': 0, 'skipped': 0, 'adopted': 0}
+
+    def allow(self, key: Hashable, queue_depth: int) -> bool:
+        """
+        Indique si le préchargement identifié par key peut démarrer
+
+        Args:
+            key: Identifiant de l'analyse (VIEW et filtres)
+            queue_depth: Tâches en attente dans l'ordonnanceur
+        """
+        if not self.enabled or key in self._in_flight:
+            return False
+
+        reason = None
+        if len(self._in_flight) >= self.max_concurrent:
+            reason = "concurrency"
+        elif queue_depth > self.max_queue_depth:
+            reason = "queue depth"
+        elif time.monotonic() - self._last_start < self.min_interval:
+            reason = "rate limit"
+
+        if reason:
+            self.stats['skipped'] += 1
+            logger.debug(f"⏭️ Prefetch skipped ({reason}): {key}")
+            return False
+        return True
+
+    def started(self, key: Hashable):
+        """Enregistre le lancement d'un préchargement"""
+        self._in_flight.add(key)
+        self._last_start = time.monotonic()
+        self.stats['started'] += 1
+
+    def finished(self, key: Hashable):
+        """Libère le budget d'un préchargement terminé, annulé ou adopté"""
+        self._in_flight.discard(key)
+
+    def adopted(self, key: Hashable):
+        """Préchargement repris par une demande explicite de l'utilisateur"""
+        self.stats['adopted'] += 1
+        self.finished(key)
@@ -4,6 +4,7 @@ Interface entre l'interface utilisateur et le système de gestion des VIEWs
 """
 
 import logging
+import time
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
 from PySide6.QtCore import QObject, Signal, QThread, QTimer
@@ -11,11 +12,19 @@ from PySide6.QtWidgets import QMessageBox, QProgressDialog, QApplication
 
 from app.models.view_manager import ViewManager
 from app.models.database_manager import DatabaseManager
-from view_builder import ViewBuilder, ViewDefinition, ModuleType
+from app.models.refresh_scheduler import MaterializedViewRefreshScheduler, RefreshOutcome
+from app.models.refresh_orchestrator import RefreshOrchestrator, RefreshReport
+from app.models.rollup_manager import RollupManager
+from app.models.view_metadata_store import ViewMetadataStore
+from app.utils.task_scheduler import ScheduledTask, TaskPriority, TaskScheduler
+from app.models.view_builder import ViewBuilder, ViewDefinition, ModuleType
 from app.utils.view_exceptions import *
 
 logger = logging.getLogger(__name__)
 
+# Recensement des VIEWs matérialisées renouvelé au-delà de cet âge (secondes)
+MATVIEW_REDISCOVERY_SECONDS = 600
+
 class ViewCreationWorker(QThread):
     """Worker thread pour la création de VIEWs en arrière-plan"""
     
@@ -30,32 +39,26 @@ class ViewCreationWorker(QThread):
         self.view_manager = view_manager
         self.views_to_create = views_to_create
         self.results = {'success': [], 'errors': []}
+        self._cancelled = False
+    
+    def cancel(self):
+        """Annulation : la transaction en cours est annulée, aucune VIEW n'est créée"""
+        self._cancelled = True
     
     def run(self):
-        """Processus de création des VIEWs"""
+        """Processus de création des VIEWs (une transaction, un point de sauvegarde par VIEW)"""
         try:
-            total_views = len(self.views_to_create)
-            
-            for i, view_def in enumerate(self.views_to_create):
-                try:
-                    # Mise à jour de la progression
-                    progress = int((i / total_views) * 100)
-                    self.progress_updated.emit(progress)
-                    
-                    # Création de la VIEW
-                    success = self.view_manager.create_view(view_def, force_recreate=True)
-                    
-                    if success:
-                        view_name = f"{view_def.module.value}_{view_def.name}"
-                        self.results['success'].append(view_name)
-                        self.view_created.emit(view_name)
-                        logger.info(f"VIEW {view_name} créée avec succès")
-                    
-                except Exception as e:
-                    error_msg = f"Erreur lors de la création de {view_def.name}: {str(e)}"
-                    self.results['errors'].append(error_msg)
-                    self.error_occurred.emit(error_msg)
-                    logger.error(error_msg)
+            self.results = self.view_manager.create_views_bulk(
+                self.views_to_create,
+                force_recreate=True,
+                progress_callback=self._on_progress,
+                is_cancelled=lambda: self._cancelled
+            )
+            
+            for error_msg in self.results['errors']:
+                self.error_occurred.emit(error_msg)
+            for view_name in self.results['success']:
+                self.view_created.emit(view_name)
             
             # Progression finale
             self.progress_updated.emit(100)
@@ -63,10 +66,128 @@ class ViewCreationWorker(QThread):
             # Émission des résultats finaux
             self.creation_completed.emit(self.results)
             
+        except ViewCreationCancelled as e:
+            logger.info(str(e))
+            self.creation_completed.emit(self.results)
         except Exception as e:
             error_msg = f"Erreur critique dans le processus de création: {str(e)}"
             self.error_occurred.emit(error_msg)
             logger.error(error_msg)
+    
+    def _on_progress(self, done: int, total: int, view_name: str):
+        self.progress_updated.emit(int(done / total * 100) if total else 100)
+
+class MatviewRefreshWorker(ScheduledTask):
+    """Rafraîchissement d'une VIEW matérialisée (pool de l'ordonnanceur de tâches)"""
+    
+    # Signaux
+    refresh_finished = Signal(object)  # RefreshOutcome
+    
+    def __init__(self, scheduler: MaterializedViewRefreshScheduler, view_name: str,
+                 metadata: Optional[ViewMetadataStore] = None):
+        super().__init__(key=('matview_refresh', view_name), priority=TaskPriority.MAINTENANCE)
+        self.scheduler = scheduler
+        self.view_name = view_name
+        self.metadata = metadata
+    
+    def run(self):
+        """Rafraîchissement (durée mesurée par l'ordonnanceur)"""
+        outcome = self.scheduler.refresh(self.view_name)
+        if outcome.success and self.metadata is not None:
+            try:
+                self.metadata.record_refresh(self.view_name)
+            except Exception as e:
+                logger.warning(f"Date de rafraîchissement non enregistrée pour {self.view_name}: {e}")
+        self.refresh_finished.emit(outcome)
+
+class MatviewDiscoveryWorker(ScheduledTask):
+    """Recensement des VIEWs matérialisées (requêtes catalogue hors du thread de l'interface)"""
+    
+    # Signaux
+    discovery_finished = Signal(bool)  # Recensement réussi
+    
+    def __init__(self, scheduler: MaterializedViewRefreshScheduler):
+        super().__init__(key=('matview_discovery',), priority=TaskPriority.MAINTENANCE)
+        self.scheduler = scheduler
+    
+    def run(self):
+        try:
+            self.scheduler.discover()
+            self.discovery_finished.emit(True)
+        except Exception as e:
+            logger.error(f"Erreur lors du recensement des VIEWs matérialisées: {e}")
+            self.discovery_finished.emit(False)
+
+class RollupRefreshWorker(ScheduledTask):
+    """Mise à jour des tables de cumul (pool de l'ordonnanceur de tâches)"""
+    
+    # Signaux
+    rollups_refreshed = Signal(list)  # RollupRefreshResult
+    
+    def __init__(self, rollups: RollupManager):
+        super().__init__(key=('rollup_refresh',), priority=TaskPriority.MAINTENANCE)
+        self.rollups = rollups
+    
+    def run(self):
+        """Mise à jour incrémentale de toutes les VIEWs en mode cumul"""
+        try:
+            results = self.rollups.refresh_all()
+        except Exception as e:
+            logger.error(f"Erreur lors de la mise à jour des cumuls: {e}")
+            results = []
+        self.rollups_refreshed.emit(results)
+
+class OrderedRefreshWorker(ScheduledTask):
+    """Rafraîchissement ordonné des VIEWs matérialisées (pool de l'ordonnanceur de tâches)"""
+    
+    # Signaux
+    refresh_completed = Signal(object)  # RefreshReport
+    error_occurred = Signal(str)  # Message d'erreur
+    
+    def __init__(self, orchestrator: RefreshOrchestrator, targets: Optional[List[str]] = None,
+                 metadata: Optional[ViewMetadataStore] = None):
+        super().__init__(key=('ordered_refresh',), priority=TaskPriority.MAINTENANCE)
+        self.orchestrator = orchestrator
+        self.targets = targets
+        self.metadata = metadata
+    
+    def run(self):
+        """Passe complète (graphe, ordre topologique, branches en parallèle)"""
+        try:
+            report = self.orchestrator.refresh(self.targets)
+            if self.metadata is not None:
+                for result in report.results.values():
+                    if result.status == 'refreshed':
+                        self.metadata.record_refresh(result.view_name)
+            self.refresh_completed.emit(report)
+        except Exception as e:
+            error_msg = f"Erreur lors du rafraîchissement ordonné: {str(e)}"
+            self.error_occurred.emit(error_msg)
+            logger.error(error_msg)
+
+class ExactRowCountWorker(ScheduledTask):
+    """Comptage exact des lignes après l'affichage des estimations (pool de l'ordonnanceur de tâches)"""
+    
+    # Signaux
+    row_count_ready = Signal(str, int)  # Nom de VIEW, nombre de lignes exact
+    counts_finished = Signal()  # Fin des comptages (annulés ou non)
+    
+    def __init__(self, view_manager: ViewManager, view_names: List[str]):
+        super().__init__(key=('exact_row_counts',), priority=TaskPriority.INFO)
+        self.view_manager = view_manager
+        self.view_names = view_names
+    
+    def run(self):
+        """Comptages successifs (une seule connexion occupée), arrêt après le comptage en cours si annulé"""
+        for view_name in self.view_names:
+            if self.is_cancelled:
+                break
+            try:
+                count = self.view_manager.count_exact_rows(view_name)
+                self.row_count_ready.emit(view_name, count)
+            except Exception as e:
+                logger.warning(f"Comptage exact impossible pour {view_name}: {e}")
+        self.counts_finished.emit()
 
 class ViewKpiController(QObject):
     """
@@ -80,33 +201,202 @@ class ViewKpiController(QObject):
     view_schema_loaded = Signal(str, dict)  # Nom de VIEW et schéma
     operation_completed = Signal(str, bool, str)  # Opération, succès, message
     error_occurred = Signal(str)  # Message d'erreur
+    matview_refreshed = Signal(str, bool, float)  # Nom de VIEW, succès, durée (s)
+    row_count_updated = Signal(str, int, bool)  # Nom de VIEW, nombre de lignes, exact
+    ordered_refresh_completed = Signal(object)  # RefreshReport
+    rollups_refreshed = Signal(list)  # RollupRefreshResult des VIEWs en mode cumul
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, task_scheduler: Optional[TaskScheduler] = None):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            task_scheduler: Ordonnanceur de tâches partagé de l'application
+                (un pool propre, limité aux rafraîchissements simultanés, sinon)
+        """
         super().__init__()
         self.db_manager = db_manager
         self.view_manager = ViewManager(db_manager)
-        self.view_builder = ViewBuilder()
+        self.view_builder = ViewBuilder(db_manager)
         
         # Cache pour optimiser les performances
         self._views_cache = {}
         self._schema_cache = {}
         
-        # Timer pour rafraîchissement automatique
+        # Rafraîchissement des VIEWs matérialisées, cadence propre à chaque VIEW
+        self.refresh_scheduler = MaterializedViewRefreshScheduler(
+            db_manager, view_filter=self.view_manager._is_kpi_view
+        )
+        self.task_scheduler = task_scheduler or TaskScheduler(
+            max_threads=self.refresh_scheduler.max_concurrent, parent=self
+        )
+        self._refresh_tasks: Dict[str, MatviewRefreshWorker] = {}  # Conservées jusqu'à leur fin
+        self._discovery_task: Optional[MatviewDiscoveryWorker] = None
+        # Tables de cumul : une passe à la fois, au plus une par intervalle de base
+        self._rollup_task: Optional[RollupRefreshWorker] = None
+        self._rollups_started_at: Optional[float] = None
+        self.refresh_orchestrator = RefreshOrchestrator(db_manager, self.refresh_scheduler)
+        self.ordered_refresh_worker: Optional[OrderedRefreshWorker] = None
+        self.count_worker: Optional[ExactRowCountWorker] = None
+        
+        # Timer de vérification des échéances de rafraîchissement
         self.refresh_timer = QTimer()
-        self.refresh_timer.timeout.connect(self.refresh_views_list)
+        self.refresh_timer.timeout.connect(self._on_refresh_tick)
         
         logger.info("ViewKpiController initialisé")
     
-    def start_auto_refresh(self, interval_minutes: int = 5):
-        """Démarre le rafraîchissement automatique des VIEWs"""
-        self.refresh_timer.start(interval_minutes * 60 * 1000)  # Conversion en millisecondes
-        logger.info(f"Rafraîchissement automatique démarré ({interval_minutes} min)")
+    def start_auto_refresh(self, interval_minutes: int = 5, check_seconds: int = 30):
+        """
+        Démarre le rafraîchissement automatique des VIEWs matérialisées
+        
+        Args:
+            interval_minutes: Intervalle de base d'une VIEW peu coûteuse (allongé selon son coût)
+            check_seconds: Période de vérification des échéances
+        """
+        self.refresh_scheduler.base_interval = interval_minutes * 60
+        self._submit_discovery()
+        
+        self.refresh_timer.start(check_seconds * 1000)  # Conversion en millisecondes
+        logger.info(f"Rafraîchissement automatique démarré (base {interval_minutes} min, "
+                    f"vérification toutes les {check_seconds} s)")
     
     def stop_auto_refresh(self):
-        """Arrête le rafraîchissement automatique"""
+        """Arrête le rafraîchissement automatique (les rafraîchissements en cours se terminent)"""
         self.refresh_timer.stop()
         logger.info("Rafraîchissement automatique arrêté")
     
+    def get_refresh_states(self) -> List[Dict[str, Any]]:
+        """Cadence, durées et prochaine échéance de chaque VIEW matérialisée"""
+        return self.refresh_scheduler.get_states()
+    
+    def refresh_materialized_views(self, targets: Optional[List[str]] = None, max_workers: int = 2):
+        """
+        Rafraîchit les VIEWs matérialisées dans l'ordre de leurs dépendances
+        
+        Args:
+            targets: VIEWs à rafraîchir avec leurs dépendances (toutes si None)
+            max_workers: Rafraîchissements simultanés au maximum
+        """
+        if self.ordered_refresh_worker is not None:
+            self.error_occurred.emit("Un rafraîchissement ordonné est déjà en cours")
+            return
+        
+        self.refresh_orchestrator.max_workers = max(1, max_workers)
+        self.ordered_refresh_worker = OrderedRefreshWorker(self.refresh_orchestrator, targets,
+                                                           self.view_manager.metadata)
+        self.ordered_refresh_worker.refresh_completed.connect(self._on_ordered_refresh_completed)
+        self.ordered_refresh_worker.error_occurred.connect(self._on_ordered_refresh_failed)
+        self.task_scheduler.submit(self.ordered_refresh_worker)
+    
+    def _on_ordered_refresh_failed(self, error_msg: str):
+        """Callback d'échec de passe ordonnée"""
+        self.ordered_refresh_worker = None
+        self.error_occurred.emit(error_msg)
+    
+    def _on_ordered_refresh_completed(self, report: RefreshReport):
+        """Callback de fin de passe ordonnée : caches périmés et bilan"""
+        self.ordered_refresh_worker = None
+        for result in report.results.values():
+            if result.status == 'refreshed':
+                self._views_cache.pop(result.view_name, None)
+                self.view_manager.row_counts.invalidate(result.view_name)
+        
+        logger.info(report.format())
+        refreshed = sum(1 for r in report.results.values() if r.status == 'refreshed')
+        message = (f"{refreshed}/{len(report.results)} VIEWs matérialisées rafraîchies en "
+                   f"{report.wall_time:.1f}s (chemin critique {report.critical_path_seconds:.1f}s)")
+        self.operation_completed.emit("refresh_materialized_views", report.success, message)
+        self.ordered_refresh_completed.emit(report)
+    
+    def _on_refresh_tick(self):
+        """Lance les rafraîchissements arrivés à échéance, dans la limite de concurrence"""
+        try:
+            # Recensement périmé : relu en tâche de fond, échéances relancées à son terme
+            age = self.refresh_scheduler.discovery_age()
+            if age is None or age > MATVIEW_REDISCOVERY_SECONDS:
+                self._submit_discovery()
+            
+            self._submit_due_refreshes()
+            self._submit_rollup_refresh()
+                
+        except Exception as e:
+            logger.error(f"Erreur lors de la planification des rafraîchissements: {e}")
+    
+    def _submit_discovery(self):
+        """Recensement des VIEWs matérialisées dans le pool (un seul à la fois)"""
+        if self._discovery_task is not None:
+            return
+        self._discovery_task = MatviewDiscoveryWorker(self.refresh_scheduler)
+        self._discovery_task.discovery_finished.connect(self._on_discovery_finished)
+        self.task_scheduler.submit(self._discovery_task)
+    
+    def _on_discovery_finished(self, success: bool):
+        self._discovery_task = None
+        if success:
+            self._submit_due_refreshes()
+    
+    def _submit_due_refreshes(self):
+        """Soumet les VIEWs recensées arrivées à échéance (état en mémoire, sans requête)"""
+        for view_name in self.refresh_scheduler.acquire_due():
+            task = MatviewRefreshWorker(self.refresh_scheduler, view_name, self.view_manager.metadata)
+            task.refresh_finished.connect(self._on_matview_refreshed)
+            self._refresh_tasks[view_name] = task
+            self.task_scheduler.submit(task)
+    
+    def _submit_rollup_refresh(self):
+        """Lance la mise à jour des tables de cumul si l'intervalle de base est écoulé"""
+        if self._rollup_task is not None:
+            return
+        now = time.monotonic()
+        if (self._rollups_started_at is not None
+                and now - self._rollups_started_at < self.refresh_scheduler.base_interval):
+            return
+        
+        self._rollups_started_at = now
+        self._rollup_task = RollupRefreshWorker(self.view_manager.rollups)
+        self._rollup_task.rollups_refreshed.connect(self._on_rollups_refreshed)
+        self.task_scheduler.submit(self._rollup_task)
+    
+    def _on_rollups_refreshed(self, results: list):
+        """Callback de fin de mise à jour des cumuls : caches périmés"""
+        self._rollup_task = None
+        for result in results:
+            self._views_cache.pop(result.view_name, None)
+            self.view_manager.row_counts.invalidate(result.view_name)
+        self.rollups_refreshed.emit(results)
+    
+    def _start_exact_counts(self, view_names: List[str]):
+        """Lance le comptage exact des VIEWs dont le nombre de lignes n'est qu'estimé"""
+        self.task_scheduler.cancel(self.count_worker)
+        self.count_worker = None
+        if not view_names:
+            return
+        
+        self.count_worker = ExactRowCountWorker(self.view_manager, view_names)
+        self.count_worker.row_count_ready.connect(self._on_exact_row_count)
+        self.count_worker.counts_finished.connect(self._release_count_worker)
+        self.task_scheduler.submit(self.count_worker)
+    
+    def _release_count_worker(self):
+        """Libération de la tâche de comptage terminée (si elle n'a pas été remplacée)"""
+        if self.sender() is self.count_worker:
+            self.count_worker = None
+    
+    def _on_exact_row_count(self, view_name: str, count: int):
+        """Callback d'un comptage exact : mise à jour du cache et de l'UI"""
+        view = self._views_cache.get(view_name)
+        if view is not None:
+            view.update({'row_count': count, 'row_count_exact': True, 'row_count_source': 'exact'})
+        self.row_count_updated.emit(view_name, count, True)
+    
+    def _on_matview_refreshed(self, outcome: RefreshOutcome):
+        """Callback de fin de rafraîchissement d'une VIEW matérialisée"""
+        self._refresh_tasks.pop(outcome.view_name, None)
+        if outcome.success:
+            # Les données ont changé : métadonnées et comptage en cache périmés
+            self._views_cache.pop(outcome.view_name, None)
+            self.view_manager.row_counts.invalidate(outcome.view_name)
+        self.matview_refreshed.emit(outcome.view_name, outcome.success, outcome.duration)
+    
     def refresh_views_list(self, module_filter: Optional[ModuleType] = None):
         """
         Rafraîchit la liste des VIEWs KPI disponibles
@@ -120,6 +410,10 @@ class ViewKpiController(QObject):
             self.views_refreshed.emit(views_list)
             logger.info(f"Liste des VIEWs rafraîchie: {len(views_list)} VIEWs trouvées")
             
+            # Nombres de lignes estimés : comptages exacts en arrière-plan
+            self._start_exact_counts([view['name'] for view in views_list
+                                      if not view.get('row_count_exact')])
+            
         except Exception as e:
             error_msg = f"Erreur lors du rafraîchissement des VIEWs: {str(e)}"
             self.error_occurred.emit(error_msg)
@@ -153,12 +447,13 @@ class ViewKpiController(QObject):
             view_name: Nom de la VIEW
         """
         try:
-            # Vérification du cache
-            if view_name in self._schema_cache:
-                schema = self._schema_cache[view_name]
-            else:
+            # Vérification du cache (clé : nom complet, quel que soit le nom demandé)
+            key = self._schema_key(view_name)
+            schema = self._schema_cache.get(key)
+            if schema is None:
                 schema = self.view_manager.get_view_schema(view_name)
-                self._schema_cache[view_name] = schema
+                if schema['columns']:
+                    self._schema_cache[key] = schema
             
             self.view_schema_loaded.emit(view_name, schema)
             logger.info(f"Schéma chargé pour {view_name}: {len(schema['columns'])} colonnes")
@@ -227,7 +522,7 @@ class ViewKpiController(QObject):
             self.creation_worker.view_created.connect(self._on_view_created)
             self.creation_worker.error_occurred.connect(self._on_creation_error)
             self.creation_worker.creation_completed.connect(self._on_creation_completed)
-            self.progress_dialog.canceled.connect(self.creation_worker.terminate)
+            self.progress_dialog.canceled.connect(self.creation_worker.cancel)
             
             # Démarrage du processus
             self.creation_worker.start()
@@ -239,21 +534,16 @@ class ViewKpiController(QObject):
     
     def _create_views_direct(self, views_to_create: List[ViewDefinition]):
         """Crée les VIEWs directement sans progression"""
-        success_count = 0
-        error_count = 0
-        
-        for view_def in views_to_create:
-            try:
-                success = self.view_manager.create_view(view_def, force_recreate=True)
-                if success:
-                    success_count += 1
-                    logger.info(f"VIEW {view_def.name} créée")
-                else:
-                    error_count += 1
-                    
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Erreur création {view_def.name}: {e}")
+        try:
+            results = self.view_manager.create_views_bulk(views_to_create, force_recreate=True)
+            success_count = len(results['success'])
+            error_count = len(results['errors'])
+            for view_name in results['success']:
+                self._on_view_created(view_name)
+        except Exception as e:
+            success_count = 0
+            error_count = len(views_to_create)
+            logger.error(f"Erreur lors de la création groupée: {e}")
         
         # Rapport final
         message = f"Création terminée: {success_count} succès, {error_count} erreurs"
@@ -263,7 +553,7 @@ class ViewKpiController(QObject):
         """Callback quand une VIEW est créée avec succès"""
         # Mise à jour du cache
         self._views_cache.pop(view_name, None)
-        self._schema_cache.pop(view_name, None)
+        self._schema_cache.pop(self._schema_key(view_name), None)
     
     def _on_creation_error(self, error_message: str):
         """Callback quand une erreur survient lors de la création"""
@@ -325,13 +615,14 @@ class ViewKpiController(QObject):
                 if reply != QMessageBox.Yes:
                     return
             
-            # Suppression
+            # Suppression (clé de cache résolue tant que la VIEW est connue)
+            schema_key = self._schema_key(view_name)
             success = self.view_manager.delete_view(view_name)
             
             if success:
                 # Nettoyage du cache
                 self._views_cache.pop(view_name, None)
-                self._schema_cache.pop(view_name, None)
+                self._schema_cache.pop(schema_key, None)
                 
                 message = f"VIEW '{view_name}' supprimée avec succès"
                 self.operation_completed.emit("delete_view", True, message)
@@ -446,4 +737,9 @@ class ViewKpiController(QObject):
         """Nettoie le cache"""
         self._views_cache.clear()
         self._schema_cache.clear()
+        self.view_manager.invalidate_schema()
         logger.info("Cache nettoyé")
+    
+    def _schema_key(self, view_name: str) -> str:
+        """Clé du cache des schémas : nom complet de la VIEW"""
+        return self.view_manager._normalize_view_name(view_name)
@@ -5,22 +5,48 @@ Moteur d'analyse - Orchestration des requêtes et traitement des données
 from sqlalchemy import text, select, and_, or_
 import pandas as pd
 import logging
-from typing import Dict, List, Optional, Any
+import re
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from datetime import datetime
 
 from models.database_manager import DatabaseManager
-from utils.exceptions import DataProcessingError, InvalidFilterError
+from utils.exceptions import DataProcessingError, InvalidFilterError, AnalysisCancelledError
+from utils.single_flight import SingleFlight
 
 logger = logging.getLogger(__name__)
 
+# Fonctions d'agrégation acceptées (clé de la demande -> fonction SQL)
+AGGREGATE_FUNCTIONS = {'sum': 'SUM', 'count': 'COUNT', 'avg': 'AVG'}
+AGGREGATION_KEYS = {'group_by', 'order_by', *AGGREGATE_FUNCTIONS}
+
+# Tri : une colonne, sens facultatif
+ORDER_BY_PATTERN = re.compile(r'^\s*(\w+)(?:\s+(ASC|DESC))?\s*$', re.IGNORECASE)
+
+# Valeurs de filtre transmises en paramètres liés
+FILTER_VALUE_TYPES = (str, int, float, bool)
+
 class AnalysisEngine:
     """Moteur d'analyse et de construction de requêtes dynamiques"""
     
-    def __init__(self, db_manager: DatabaseManager):
-        """Initialisation avec gestionnaire de base de données"""
+    def __init__(self, db_manager: DatabaseManager, views: Optional[List[Dict]] = None):
+        """
+        Initialisation avec gestionnaire de base de données
+        
+        Args:
+            db_manager: Gestionnaire de base de données connecté
+            views: VIEWs déjà découvertes (évite une seconde découverte)
+        """
         self.db_manager = db_manager
         self.available_views = []
-        self._load_available_views()
+        self._date_columns: Dict[str, Optional[str]] = {}  # Colonne de date détectée par VIEW
+        self._view_columns: Dict[str, List[str]] = {}  # Colonnes lues dans le catalogue par VIEW
+        # Requêtes identiques simultanées : une seule exécution partagée
+        self._in_flight = SingleFlight(retry_on=(AnalysisCancelledError,))
+        
+        if views is None:
+            self._load_available_views()
+        else:
+            self.set_available_views(views)
     
     def _load_available_views(self) -> None:
         """Charge la liste des VIEWs disponibles"""
@@ -36,7 +62,10 @@ class AnalysisEngine:
         return self.available_views
     
     def run_analysis(self, view_name: str, filters: Dict = None, 
-                    aggregations: Dict = None, limit: int = None) -> pd.DataFrame:
+                    aggregations: Dict = None, limit: int = None,
+                    on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+                    chunk_size: int = 2000,
+                    is_cancelled: Optional[Callable[[], bool]] = None) -> pd.DataFrame:
         """
         Exécute une analyse sur une VIEW avec filtres optionnels
         
@@ -45,10 +74,32 @@ class AnalysisEngine:
             filters: Dictionnaire de filtres (ex: {'date_start': '2024-01-01'})
             aggregations: Agrégations à appliquer (ex: {'group_by': ['column1']})
             limit: Limite du nombre de lignes
+            on_chunk: Rappel appelé pour chaque bloc reçu (lecture progressive)
+            chunk_size: Nombre de lignes par bloc en lecture progressive
+            is_cancelled: Fonction indiquant l'abandon de la lecture progressive
         
         Returns:
-            DataFrame pandas avec les résultats
+            DataFrame pandas avec les résultats (partagé entre appels simultanés identiques)
         """
+        key = ('analysis', view_name, _freeze(filters), _freeze(aggregations), limit)
+        executed = []
+        
+        def execute():
+            executed.append(True)
+            return self._execute_analysis(view_name, filters, aggregations, limit,
+                                          on_chunk, chunk_size, is_cancelled)
+        
+        result_df = self._in_flight.do(key, execute)
+        
+        # Résultat partagé : transmis en un seul bloc au demandeur progressif
+        if on_chunk is not None and not executed:
+            on_chunk(result_df)
+        return result_df
+    
+    def _execute_analysis(self, view_name: str, filters: Dict, aggregations: Dict, limit: int,
+                          on_chunk: Optional[Callable[[pd.DataFrame], None]], chunk_size: int,
+                          is_cancelled: Optional[Callable[[], bool]]) -> pd.DataFrame:
+        """Exécution effective d'une analyse (voir run_analysis)"""
         try:
             logger.info(f"🔍 Analyse de la VIEW: {view_name}")
             
@@ -56,19 +107,134 @@ class AnalysisEngine:
             if not self._validate_view_exists(view_name):
                 raise InvalidFilterError(f"VIEW {view_name} non trouvée")
             
-            # Construction requête
+            # Lecture progressive : limite de sécurité appliquée côté serveur
+            if on_chunk is not None:
+                max_rows = self.db_manager.config.get_max_rows()
+                limit = min(limit, max_rows) if limit else max_rows
+            
+            # Construction requête (identifiants vérifiés, valeurs liées)
+            self.validate_analysis_request(view_name, filters, aggregations, limit)
             query = self._build_query(view_name, filters, aggregations, limit)
             
             # Exécution
-            result_df = self.db_manager.execute_query(query)
+            if on_chunk is not None:
+                result_df = self._fetch_in_chunks(query, on_chunk, chunk_size, is_cancelled)
+            else:
+                result_df = self.db_manager.execute_query(query)
             
             logger.info(f"✅ Analyse terminée: {len(result_df)} lignes")
             return result_df
             
+        except (AnalysisCancelledError, InvalidFilterError):
+            raise
         except Exception as e:
             logger.error(f"❌ Erreur analyse {view_name}: {e}")
             raise DataProcessingError(f"Erreur lors de l'analyse: {e}")
     
+    def _fetch_in_chunks(self, query, on_chunk: Callable[[pd.DataFrame], None],
+                         chunk_size: int, is_cancelled: Optional[Callable[[], bool]]) -> pd.DataFrame:
+        """Lit le résultat par blocs en les transmettant au fil de l'eau"""
+        chunks = []
+        for chunk in self.db_manager.stream_query(query, chunk_size):
+            if is_cancelled and is_cancelled():
+                logger.info("🛑 Chunked fetch interrupted")
+                raise AnalysisCancelledError("Analyse annulée")
+            chunks.append(chunk)
+            on_chunk(chunk)
+        
+        if not chunks:
+            return pd.DataFrame()
+        return pd.concat(chunks, ignore_index=True) if len(chunks) > 1 else chunks[0]
+    
+    def build_analysis_query(self, view_name: str, filters: Dict = None,
+                             aggregations: Dict = None):
+        """
+        Construit la requête complète d'une analyse, sans limite de lignes
+        
+        Utilisé par les exports qui relisent l'intégralité du résultat.
+        """
+        if not self._validate_view_exists(view_name):
+            raise InvalidFilterError(f"VIEW {view_name} non trouvée")
+        self.validate_analysis_request(view_name, filters, aggregations)
+        return self._build_query(view_name, filters, aggregations)
+    
+    def iter_analysis(self, view_name: str, filters: Dict = None,
+                      aggregations: Dict = None, chunk_size: int = 10000):
+        """
+        Exécute une analyse complète et la restitue par blocs (curseur côté serveur)
+        
+        Yields:
+            DataFrames successifs de chunk_size lignes au plus
+        """
+        query = self.build_analysis_query(view_name, filters, aggregations)
+        logger.info(f"🌊 Streaming analysis of {view_name} (chunks of {chunk_size})")
+        yield from self.db_manager.stream_query(query, chunk_size)
+    
+    def get_view_columns(self, view_name: str) -> List[str]:
+        """Colonnes d'une VIEW lues dans le catalogue (mises en cache)"""
+        if view_name not in self._view_columns:
+            structure = self.db_manager.get_view_structure(view_name)
+            self._view_columns[view_name] = [col['name'] for col in structure.get('columns', [])]
+        return self._view_columns[view_name]
+    
+    def validate_analysis_request(self, view_name: str, filters: Dict = None,
+                                  aggregations: Dict = None, limit: Any = None) -> None:
+        """
+        Vérifie une demande d'analyse avant de construire la requête
+        
+        Les noms de colonnes (filtres filter_<colonne>, groupement, agrégations,
+        tri) doivent appartenir à la VIEW ; les valeurs de filtre sont des
+        scalaires, les bornes de dates des dates ISO, la limite un entier positif.
+        
+        Raises:
+            InvalidFilterError: Demande refusée
+        """
+        if limit is not None and (isinstance(limit, bool) or not isinstance(limit, int) or limit <= 0):
+            raise InvalidFilterError(f"Limite invalide: {limit!r}")
+        if filters is not None and not isinstance(filters, dict):
+            raise InvalidFilterError("Les filtres doivent être un objet")
+        if aggregations is not None and not isinstance(aggregations, dict):
+            raise InvalidFilterError("Les agrégations doivent être un objet")
+        if not filters and not aggregations:
+            return
+        
+        columns = set(self.get_view_columns(view_name))
+        
+        for key, value in (filters or {}).items():
+            if value is None:
+                continue
+            if key in ('date_start', 'date_end'):
+                try:
+                    datetime.fromisoformat(str(value))
+                except ValueError:
+                    raise InvalidFilterError(f"Date invalide pour {key}: {value!r}")
+            elif key.startswith('filter_'):
+                if key[len('filter_'):] not in columns:
+                    raise InvalidFilterError(f"Colonne de filtre inconnue: {key[len('filter_'):]}")
+                if not isinstance(value, FILTER_VALUE_TYPES):
+                    raise InvalidFilterError(f"Valeur de filtre invalide pour {key}")
+            else:
+                raise InvalidFilterError(f"Filtre inconnu: {key}")
+        
+        aggregations = aggregations or {}
+        unknown = set(aggregations) - AGGREGATION_KEYS
+        if unknown:
+            raise InvalidFilterError(f"Agrégation inconnue: {', '.join(sorted(map(str, unknown)))}")
+        aliases = set()
+        for key in ('group_by', *AGGREGATE_FUNCTIONS):
+            names = aggregations.get(key, [])
+            if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                raise InvalidFilterError(f"'{key}' doit être une liste de colonnes")
+            missing = [name for name in names if name not in columns]
+            if missing:
+                raise InvalidFilterError(f"Colonnes inconnues dans '{key}': {', '.join(missing)}")
+            if key in AGGREGATE_FUNCTIONS:
+                aliases.update(f"{key}_{name}" for name in names)
+        if 'order_by' in aggregations:
+            match = ORDER_BY_PATTERN.match(str(aggregations['order_by']))
+            if not match or match.group(1) not in columns | aliases:
+                raise InvalidFilterError(f"Tri invalide: {aggregations['order_by']!r}")
+    
     def _validate_view_exists(self, view_name: str) -> bool:
         """Valide que la VIEW existe dans la liste disponible"""
         return any(view['name'] == view_name for view in self.available_views)
@@ -88,9 +254,10 @@ class AnalysisEngine:
         
         query = f"SELECT {select_clause} FROM {view_name}"
         
-        # Application des filtres
+        # Application des filtres (valeurs en paramètres liés)
+        params: Dict[str, Any] = {}
         if filters:
-            where_clause = self._build_where_clause(view_name, filters)
+            where_clause, params = self._build_where_clause(view_name, filters)
             if where_clause:
                 query += f" WHERE {where_clause}"
         
@@ -104,14 +271,25 @@ class AnalysisEngine:
         
         # Limitation
         if limit:
-            query += f" LIMIT {limit}"
+            query += f" LIMIT {int(limit)}"
         
         logger.debug(f"🔧 Requête construite: {query}")
-        return text(query)
+        return text(query).bindparams(**params) if params else text(query)
     
-    def _build_where_clause(self, view_name: str, filters: Dict) -> str:
-        """Construit la clause WHERE à partir des filtres"""
+    def _build_where_clause(self, view_name: str, filters: Dict) -> Tuple[str, Dict[str, Any]]:
+        """
+        Construit la clause WHERE à partir des filtres
+        
+        Returns:
+            Tuple (conditions avec paramètres :nom, valeurs des paramètres)
+        """
         conditions = []
+        params: Dict[str, Any] = {}
+        
+        def bind(value) -> str:
+            name = f"p{len(params)}"
+            params[name] = value
+            return f":{name}"
         
         for key, value in filters.items():
             if value is None:
@@ -121,7 +299,7 @@ class AnalysisEngine:
                 # Filtre date de début (trouve la colonne de date dynamiquement)
                 date_column = self._find_date_column(view_name)
                 if date_column:
-                    conditions.append(f"{date_column} >= '{value}'")
+                    conditions.append(f"{date_column} >= {bind(value)}")
                 else:
                     logger.warning(f"⚠️ Filtre date_start ignoré: aucune colonne de date trouvée dans {view_name}")
             
@@ -129,7 +307,7 @@ class AnalysisEngine:
                 # Filtre date de fin
                 date_column = self._find_date_column(view_name)
                 if date_column:
-                    conditions.append(f"{date_column} <= '{value}'")
+                    conditions.append(f"{date_column} <= {bind(value)}")
                 else:
                     logger.warning(f"⚠️ Filtre date_end ignoré: aucune colonne de date trouvée dans {view_name}")
             
@@ -137,16 +315,23 @@ class AnalysisEngine:
                 # Filtres génériques
                 column_name = key.replace('filter_', '')
                 if isinstance(value, str):
-                    conditions.append(f"{column_name} ILIKE '%{value}%'")
+                    conditions.append(f"{column_name} ILIKE {bind(f'%{value}%')}")
                 else:
-                    conditions.append(f"{column_name} = {value}")
+                    conditions.append(f"{column_name} = {bind(value)}")
         
-        return " AND ".join(conditions)
+        return " AND ".join(conditions), params
+    
+    def get_date_column(self, view_name: str) -> Optional[str]:
+        """Retourne la colonne de date déjà détectée pour une VIEW (sans requête)"""
+        return self._date_columns.get(view_name)
     
     def _find_date_column(self, view_name: str = None) -> Optional[str]:
         """Trouve la première colonne de type date dans la VIEW"""
         if not view_name:
             return None
+        
+        if view_name in self._date_columns:
+            return self._date_columns[view_name]
             
         try:
             # Récupération de la structure de la VIEW
@@ -178,10 +363,11 @@ class AnalysisEngine:
             
             if date_columns:
                 logger.info(f"📅 Colonnes date détectées dans {view_name}: {date_columns}")
-                return date_columns[0]  # Retourne la première colonne de date trouvée
+                self._date_columns[view_name] = date_columns[0]  # Première colonne de date trouvée
             else:
                 logger.warning(f"⚠️ Aucune colonne de date trouvée dans {view_name}")
-                return None
+                self._date_columns[view_name] = None
+            return self._date_columns[view_name]
                 
         except Exception as e:
             logger.error(f"❌ Erreur détection colonne date pour {view_name}: {e}")
@@ -220,6 +406,15 @@ class AnalysisEngine:
     
     def get_view_info(self, view_name: str) -> Dict:
         """Retourne les informations détaillées d'une VIEW"""
+        return self._in_flight.do(('view_info', view_name),
+                                  lambda: self._load_view_info(view_name))
+    
+    def get_in_flight_stats(self) -> Dict[str, int]:
+        """Requêtes réellement exécutées et requêtes évitées par regroupement"""
+        return self._in_flight.get_stats()
+    
+    def _load_view_info(self, view_name: str) -> Dict:
+        """Lecture de la structure et d'un échantillon d'une VIEW"""
         try:
             structure = self.db_manager.get_view_structure(view_name)
             sample = self.get_view_sample(view_name, 5)
@@ -233,7 +428,24 @@ class AnalysisEngine:
             logger.error(f"❌ Erreur info VIEW {view_name}: {e}")
             return {'error': str(e)}
     
+    def set_available_views(self, views: List[Dict]) -> None:
+        """Remplace la liste des VIEWs par une découverte faite ailleurs"""
+        self._date_columns.clear()
+        self._view_columns.clear()
+        self.available_views = views
+        logger.info(f"📊 {len(self.available_views)} VIEWs chargées")
+    
     def refresh_views(self) -> int:
         """Actualise la liste des VIEWs disponibles"""
+        self._date_columns.clear()
+        self._view_columns.clear()
         self._load_available_views()
         return len(self.available_views)
+
+def _freeze(value):
+    """Représentation hachable et stable de filtres ou d'agrégations"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(_freeze(v) for v in value)
+    return str(value) if value is not None else None
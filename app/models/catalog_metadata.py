@@ -0,0 +1,235 @@
+"""
+Métadonnées des tables lues dans le catalogue PostgreSQL
+Chargement à la demande, cache partagé invalidé quand le catalogue change
+"""
+
+import logging
+import threading
+import time
+import weakref
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional
+
+from app.models.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Tables du schéma et leur commentaire (une requête, sans les colonnes)
+TABLES_SQL = """
+SELECT c.relname AS table_name, obj_description(c.oid, 'pg_class') AS comment
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND c.relkind IN ('r', 'p') AND NOT c.relispartition
+  AND c.relname !~ '^rollup_kpi_'   -- tables de cumul des VIEWs KPI
+ORDER BY c.relname
+"""
+
+# Colonnes d'une table : type de base, commentaire, appartenance à une clé (non agrégeable)
+FIELDS_SQL = """
+SELECT
+    a.attname AS column_name,
+    CASE WHEN t.typtype = 'd' THEN bt.typname ELSE t.typname END AS type_name,
+    col_description(c.oid, a.attnum) AS comment,
+    EXISTS (
+        SELECT 1 FROM pg_constraint k
+        WHERE k.conrelid = c.oid AND k.contype IN ('p', 'f') AND a.attnum = ANY (k.conkey)
+    ) AS is_key
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+JOIN pg_type t ON t.oid = a.atttypid
+LEFT JOIN pg_type bt ON bt.oid = t.typbasetype   -- type de base d'un domaine
+WHERE n.nspname = %s AND c.relname = %s
+ORDER BY a.attnum
+"""
+
+# Empreinte du catalogue : change à chaque CREATE / DROP / ALTER d'une relation du schéma
+FINGERPRINT_SQL = """
+SELECT md5(coalesce(string_agg(c.oid::text || ':' || c.xmin::text, ',' ORDER BY c.oid), '')) AS fingerprint
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND c.relkind IN ('r', 'p')
+"""
+
+INTEGER_TYPES = {'int2', 'int4', 'int8'}
+NUMERIC_TYPES = {'numeric', 'float4', 'float8', 'money'}
+DATE_TYPES = {'date', 'timestamp', 'timestamptz'}
+
+def simplify_type(type_name: str) -> str:
+    """Type simplifié du constructeur de vues (integer, numeric, date, boolean, text)"""
+    if type_name in INTEGER_TYPES:
+        return 'integer'
+    if type_name in NUMERIC_TYPES:
+        return 'numeric'
+    if type_name in DATE_TYPES:
+        return 'date'
+    if type_name == 'bool':
+        return 'boolean'
+    return 'text'
+
+class CatalogMetadataService:
+    """
+    Métadonnées des tables d'un schéma, lues dans pg_catalog
+
+    La liste des tables est lue en une requête ; les colonnes d'une table ne
+    sont lues qu'à sa première ouverture. L'empreinte du catalogue est
+    vérifiée au plus une fois par check_interval : si une table a été créée,
+    supprimée ou modifiée, tout le cache est oublié.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, check_interval: float = 60.0):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            check_interval: Intervalle minimal entre deux vérifications de l'empreinte (secondes)
+        """
+        self.db_manager = db_manager
+        self.check_interval = check_interval
+
+        self._lock = threading.RLock()
+        self._tables: Optional[Dict[str, str]] = None       # nom -> libellé
+        self._fields: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self._fingerprint: Optional[str] = None
+        self._checked_at: Optional[float] = None
+
+    @property
+    def schema(self) -> str:
+        return self.db_manager.config.get_schema()
+
+    def list_tables(self) -> Dict[str, str]:
+        """
+        Tables du schéma
+
+        Returns:
+            Libellé d'affichage par nom de table (trié par nom)
+        """
+        with self._lock:
+            self._check_catalog()
+            if self._tables is None:
+                rows = self.db_manager.execute_query(TABLES_SQL, (self.schema,), fetch_results=True)
+                self._tables = {row['table_name']: self._table_label(row) for row in rows}
+                logger.info(f"📊 Catalog lists {len(self._tables)} tables")
+            return dict(self._tables)
+
+    def table_fields(self, table_name: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Champs d'une table (lus à la première demande)
+
+        Returns:
+            Pour chaque colonne : type simplifié, libellé, agrégeable
+        """
+        with self._lock:
+            self._check_catalog()
+            fields = self._fields.get(table_name)
+            if fields is None:
+                rows = self.db_manager.execute_query(FIELDS_SQL, (self.schema, table_name), fetch_results=True)
+                fields = {row['column_name']: self._field_info(row) for row in rows}
+                self._fields[table_name] = fields
+            return fields
+
+    def invalidate(self):
+        """Oublie tables et champs (rechargés au prochain accès)"""
+        with self._lock:
+            self._tables = None
+            self._fields.clear()
+            self._checked_at = None
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _check_catalog(self):
+        """Compare l'empreinte du catalogue (verrou détenu, au plus une fois par intervalle)"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        rows = self.db_manager.execute_query(FINGERPRINT_SQL, (self.schema,), fetch_results=True)
+        fingerprint = rows[0]['fingerprint'] if rows else None
+        if self._fingerprint is not None and fingerprint != self._fingerprint:
+            logger.info("🔄 Catalog changed, table metadata reloaded")
+            self._tables = None
+            self._fields.clear()
+        self._fingerprint = fingerprint
+        self._checked_at = now
+
+    def _table_label(self, row: Dict[str, Any]) -> str:
+        return row['comment'] or f"📊 {row['table_name'].replace('_', ' ').title()}"
+
+    def _field_info(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        field_type = simplify_type(row['type_name'])
+        return {
+            'type': field_type,
+            'display': row['comment'] or row['column_name'].replace('_', ' ').title(),
+            # Identifiants et clés étrangères : numériques mais pas des mesures
+            'aggregable': field_type in ('integer', 'numeric') and not row['is_key']
+        }
+
+class LazyTableEntry(Mapping):
+    """Métadonnées d'une table ; les champs ne sont lus qu'au premier accès à 'fields'"""
+
+    def __init__(self, service: CatalogMetadataService, table_name: str, display_name: str):
+        self._service = service
+        self._table_name = table_name
+        self._display_name = display_name
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'display_name':
+            return self._display_name
+        if key == 'fields':
+            return self._service.table_fields(self._table_name)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(('display_name', 'fields'))
+
+    def __len__(self) -> int:
+        return 2
+
+class LazyTablesMetadata(Mapping):
+    """
+    Métadonnées des tables au format de ViewBuilder.tables_metadata
+
+    Rien n'est lu à la construction. Si le catalogue est inaccessible, les
+    métadonnées de repli sont utilisées sans nouvelle tentative pendant
+    check_interval du service.
+    """
+
+    def __init__(self, service: CatalogMetadataService, fallback: Optional[Dict[str, Dict]] = None):
+        self._service = service
+        self._fallback = fallback or {}
+        self._unavailable_until: Optional[float] = None
+
+    def _entries(self) -> Mapping:
+        if self._unavailable_until is not None and time.monotonic() < self._unavailable_until:
+            return self._fallback
+        try:
+            entries = {name: LazyTableEntry(self._service, name, label)
+                       for name, label in self._service.list_tables().items()}
+        except Exception as e:
+            if self._unavailable_until is None:
+                logger.warning(f"⚠️ Catalog unavailable, using built-in table metadata: {e}")
+            self._unavailable_until = time.monotonic() + self._service.check_interval
+            return self._fallback
+        if self._unavailable_until is not None:
+            logger.info("✅ Catalog available again")
+            self._unavailable_until = None
+        return entries
+
+    def __getitem__(self, table_name: str) -> Mapping:
+        return self._entries()[table_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._entries())
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+_services: "weakref.WeakKeyDictionary[DatabaseManager, CatalogMetadataService]" = weakref.WeakKeyDictionary()
+_services_lock = threading.Lock()
+
+def get_catalog_service(db_manager: DatabaseManager) -> CatalogMetadataService:
+    """Service de métadonnées partagé par tous les utilisateurs d'une même connexion"""
+    with _services_lock:
+        service = _services.get(db_manager)
+        if service is None:
+            service = CatalogMetadataService(db_manager)
+            _services[db_manager] = service
+        return service
@@ -7,7 +7,8 @@ from sqlalchemy import create_engine, MetaData, inspect, text
 from sqlalchemy.exc import SQLAlchemyError
 import pandas as pd
 import logging
-from typing import List, Dict, Optional
+from contextlib import contextmanager
+from typing import List, Dict, Optional, Iterator, BinaryIO, Sequence
 
 from config.database import DatabaseConfig
 from utils.exceptions import DatabaseConnectionError, ViewNotFoundError, QueryExecutionError
@@ -119,9 +120,34 @@ class DatabaseManager:
             logger.error(f"❌ Erreur structure VIEW {view_name}: {e}")
             raise ViewNotFoundError(f"Impossible d'accéder à la VIEW {view_name}: {e}")
     
-    def execute_query(self, query, params: Dict = None) -> pd.DataFrame:
-        """Exécution sécurisée avec gestion erreurs et timeout"""
+    def execute_query(self, query, params=None, fetch_results: Optional[bool] = None):
+        """
+        Exécution sécurisée avec gestion erreurs et timeout
+        
+        Args:
+            query: Requête (texte SQL ou TextClause)
+            params: Paramètres nommés (dict) ou positionnels %s (tuple, liste)
+            fetch_results: None : DataFrame (plafonné à MAX_QUERY_ROWS) ;
+                True : liste de dictionnaires, valeurs du pilote (NULL -> None, entiers
+                conservés), sans plafond : lectures de métadonnées et du catalogue ;
+                False : instruction exécutée et validée, sans résultat (DDL, REFRESH)
+        
+        Returns:
+            DataFrame, liste de dictionnaires ou None selon fetch_results
+        """
         try:
+            if fetch_results is False:
+                with self.engine.begin() as conn:
+                    self._execute(conn, query, params)
+                logger.info("📈 Statement executed")
+                return None
+            
+            if fetch_results:
+                with self.engine.connect() as conn:
+                    rows = [dict(row) for row in self._execute(conn, query, params).mappings()]
+                logger.debug(f"📈 Query executed: {len(rows)} rows returned")
+                return rows
+            
             with self.engine.connect() as conn:
                 # Configuration timeout
                 conn = conn.execution_options(
@@ -129,9 +155,9 @@ class DatabaseManager:
                     compiled_cache={}
                 )
                 
-                # Exécution requête
+                # Exécution requête (texte SQL : paramètres transmis au pilote, %s ou %(nom)s)
                 if params:
-                    df = pd.read_sql(query, conn, params=params)
+                    df = pd.read_sql(query, conn, params=tuple(params) if isinstance(params, list) else params)
                 else:
                     df = pd.read_sql(query, conn)
                 
@@ -151,6 +177,147 @@ class DatabaseManager:
             logger.error(f"❌ Erreur inattendue: {e}")
             raise QueryExecutionError(f"Erreur inattendue: {e}")
     
+    @staticmethod
+    def _execute(conn, query, params=None):
+        """Texte SQL : paramètres transmis au pilote (%s ou %(nom)s) ; TextClause : paramètres nommés"""
+        if isinstance(query, str):
+            if params is None:
+                return conn.exec_driver_sql(query)
+            return conn.exec_driver_sql(query, tuple(params) if isinstance(params, list) else params)
+        return conn.execute(query, params or {})
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Transaction explicite : validée en sortie normale, annulée sur exception
+        
+        La connexion fournie accepte exec_driver_sql() et begin_nested()
+        (points de sauvegarde pour isoler l'échec d'une instruction).
+        
+        Yields:
+            Connexion SQLAlchemy dans la transaction
+        """
+        try:
+            with self.engine.begin() as conn:
+                yield conn
+        except SQLAlchemyError as e:
+            logger.error(f"❌ Transaction failed: {e}")
+            raise QueryExecutionError(f"Erreur lors de la transaction: {e}")
+    
+    def explain(self, query: str, params=None, setup: Sequence[str] = (),
+                teardown: Sequence[str] = ()) -> List[Dict]:
+        """
+        Plan estimé d'une requête SELECT, sans l'exécuter
+        
+        EXPLAIN (FORMAT JSON) dans une transaction toujours annulée : aucune
+        DDL, aucun verrou conservé, rien à nettoyer en cas d'erreur.
+        
+        Args:
+            query: Requête SELECT (texte SQL)
+            params: Paramètres positionnels %s (tuple, liste) ou nommés (dict)
+            setup: Instructions exécutées avant EXPLAIN dans la même transaction
+                (index temporaire ou hypothétique), annulées avec elle
+            teardown: Instructions exécutées après l'annulation, même en cas d'erreur
+                (état de session hors transaction, ex. index hypothétiques)
+        
+        Returns:
+            Sortie JSON de EXPLAIN ([{"Plan": {...}}])
+        """
+        sql = str(query).strip().rstrip(';')
+        try:
+            with self.engine.connect() as conn:
+                transaction = conn.begin()
+                try:
+                    for statement in setup:
+                        conn.exec_driver_sql(statement)
+                    result = conn.exec_driver_sql(
+                        f"EXPLAIN (FORMAT JSON) {sql}",
+                        tuple(params) if isinstance(params, list) else params
+                    )
+                    return result.scalar()
+                finally:
+                    transaction.rollback()
+                    self._reset_session(conn, teardown)
+        except SQLAlchemyError as e:
+            logger.warning(f"⚠️ Query planning failed: {e}")
+            raise QueryExecutionError(f"Requête invalide: {e}")
+    
+    def _reset_session(self, conn, teardown: Sequence[str]) -> None:
+        """Nettoyage de session ; en cas d'échec la connexion est retirée du pool"""
+        try:
+            for statement in teardown:
+                conn.exec_driver_sql(statement)
+            conn.rollback()
+        except SQLAlchemyError as e:
+            logger.warning(f"⚠️ Session cleanup failed, connection discarded: {e}")
+            conn.invalidate()
+    
+    def execute_autocommit(self, statement: str) -> None:
+        """
+        Instruction hors transaction (CREATE / DROP INDEX CONCURRENTLY, VACUUM)
+        
+        Args:
+            statement: Instruction SQL sans paramètres
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn.execution_options(isolation_level="AUTOCOMMIT").exec_driver_sql(statement)
+            logger.info("📈 Statement executed (autocommit)")
+        except SQLAlchemyError as e:
+            logger.error(f"❌ Error executing statement: {e}")
+            raise QueryExecutionError(f"Erreur lors de l'exécution: {e}")
+    
+    def _render_query(self, query, cursor) -> str:
+        """Texte SQL d'une requête, paramètres liés échappés par le pilote (COPY n'en accepte pas)"""
+        if isinstance(query, str):
+            return query
+        compiled = query.compile(dialect=self.engine.dialect)
+        if not compiled.params:
+            return str(compiled)
+        rendered = cursor.mogrify(str(compiled), compiled.params)
+        return rendered.decode() if isinstance(rendered, bytes) else rendered
+    
+    def stream_query(self, query, chunk_size: int = 10000) -> Iterator[pd.DataFrame]:
+        """
+        Exécution avec curseur côté serveur, résultats livrés par blocs
+        
+        Aucune limite de lignes n'est appliquée : la mémoire utilisée reste
+        proportionnelle à chunk_size quel que soit le volume du résultat.
+        
+        Args:
+            query: Requête SQL (texte ou TextClause)
+            chunk_size: Nombre de lignes par bloc
+        """
+        try:
+            with self.engine.connect() as conn:
+                conn = conn.execution_options(stream_results=True, max_row_buffer=chunk_size)
+                for chunk in pd.read_sql(query, conn, chunksize=chunk_size):
+                    yield chunk
+        except SQLAlchemyError as e:
+            logger.error(f"❌ Error streaming query: {e}")
+            raise QueryExecutionError(f"Erreur lors de l'exécution: {e}")
+    
+    def copy_query_to_csv(self, query, output: BinaryIO) -> None:
+        """
+        Export CSV direct par COPY ... TO STDOUT (format et en-têtes produits par PostgreSQL)
+        
+        Args:
+            query: Requête SELECT (texte ou TextClause)
+            output: Fichier binaire recevant le flux CSV
+        """
+        raw_conn = self.engine.raw_connection()
+        try:
+            with raw_conn.cursor() as cursor:
+                sql = self._render_query(query, cursor).strip().rstrip(';')
+                cursor.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, HEADER true)", output)
+            raw_conn.commit()
+        except Exception:
+            # Connexion dans un état incertain après un COPY interrompu : retirée du pool
+            raw_conn.invalidate()
+            raise
+        finally:
+            raw_conn.close()
+    
     def test_view_access(self, view_name: str) -> bool:
         """Test d'accès à une VIEW spécifique"""
         try:
@@ -0,0 +1,215 @@
+"""
+Export en flux des résultats d'analyse complets
+CSV (COPY ... TO STDOUT), Parquet et XLSX écrits bloc par bloc à mémoire constante
+"""
+
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+from utils.exceptions import ExportError
+
+logger = logging.getLogger(__name__)
+
+# Formats d'export supportés : extension -> libellé du filtre de fichier
+EXPORT_FORMATS = {
+    'csv': "CSV (*.csv)",
+    'parquet': "Parquet (*.parquet)",
+    'xlsx': "Excel (*.xlsx)"
+}
+
+# Limite de lignes d'une feuille Excel (en-tête compris)
+XLSX_MAX_ROWS = 1_048_576
+
+ProgressCallback = Callable[[int, float], None]
+CancelCheck = Callable[[], bool]
+
+class ExportCancelled(Exception):
+    """Export interrompu à la demande de l'utilisateur"""
+    pass
+
+class _ProgressTracker:
+    """Comptage des lignes écrites et calcul du débit"""
+
+    def __init__(self, on_progress: Optional[ProgressCallback], is_cancelled: Optional[CancelCheck],
+                 min_interval: float = 0.25):
+        self.on_progress = on_progress
+        self.is_cancelled = is_cancelled or (lambda: False)
+        self.min_interval = min_interval
+        self.rows = 0
+        self.started = time.monotonic()
+        self._last_report = 0.0
+
+    def add(self, rows: int, force: bool = False):
+        self.rows += rows
+        if self.is_cancelled():
+            raise ExportCancelled()
+
+        now = time.monotonic()
+        if self.on_progress and (force or now - self._last_report >= self.min_interval):
+            self._last_report = now
+            self.on_progress(self.rows, self.throughput)
+
+    @property
+    def throughput(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+class _CopyOutputWriter:
+    """Fichier de destination du COPY comptant les lignes reçues"""
+
+    def __init__(self, handle, tracker: _ProgressTracker):
+        self.handle = handle
+        self.tracker = tracker
+        self._header_skipped = False
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.handle.write(data)
+
+        # Comptage approximatif : une ligne CSV par saut de ligne (hors en-tête)
+        rows = data.count(b'\n')
+        if rows and not self._header_skipped:
+            rows -= 1
+            self._header_skipped = True
+        self.tracker.add(rows)
+        return len(data)
+
+class StreamingExporter:
+    """
+    Exporteur de résultats complets
+    Relance l'analyse côté serveur sans la limite MAX_QUERY_ROWS de l'affichage
+    """
+
+    def __init__(self, analysis_engine, chunk_size: int = 50000):
+        self.analysis_engine = analysis_engine
+        self.chunk_size = chunk_size
+
+    def export(self, view_name: str, filters: Dict, path: str, fmt: str,
+               on_progress: Optional[ProgressCallback] = None,
+               is_cancelled: Optional[CancelCheck] = None) -> int:
+        """
+        Exporte le résultat complet d'une analyse
+
+        Le fichier est écrit sous un nom temporaire puis renommé : un export
+        annulé ou en erreur ne laisse pas de fichier partiel.
+
+        Args:
+            view_name: VIEW analysée
+            filters: Filtres de l'analyse
+            path: Fichier de destination
+            fmt: 'csv', 'parquet' ou 'xlsx'
+            on_progress: Rappel (lignes écrites, lignes/s)
+            is_cancelled: Fonction indiquant une demande d'annulation
+
+        Returns:
+            Nombre de lignes exportées
+
+        Raises:
+            ExportCancelled: Si l'export a été annulé
+            ExportError: En cas d'erreur d'export
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ExportError(f"Format d'export non supporté: {fmt}")
+
+        tracker = _ProgressTracker(on_progress, is_cancelled)
+        part_path = f"{path}.part"
+        logger.info(f"📤 Export {view_name} -> {path} ({fmt})")
+
+        try:
+            if fmt == 'csv':
+                self._export_csv(view_name, filters, part_path, tracker)
+            elif fmt == 'parquet':
+                self._export_parquet(view_name, filters, part_path, tracker)
+            else:
+                self._export_xlsx(view_name, filters, part_path, tracker)
+
+            os.replace(part_path, path)
+            tracker.add(0, force=True)
+            logger.info(f"✅ Export completed: {tracker.rows} rows ({tracker.throughput:.0f} rows/s)")
+            return tracker.rows
+
+        except ExportCancelled:
+            logger.info(f"🛑 Export cancelled after {tracker.rows} rows")
+            raise
+        except ExportError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Export error: {e}")
+            raise ExportError(f"Erreur lors de l'export: {e}")
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+    # === FORMATS ===
+
+    def _export_csv(self, view_name: str, filters: Dict, path: str, tracker: _ProgressTracker):
+        """CSV produit directement par PostgreSQL (COPY ... TO STDOUT)"""
+        query = self.analysis_engine.build_analysis_query(view_name, filters)
+        with open(path, 'wb') as handle:
+            self.analysis_engine.db_manager.copy_query_to_csv(query, _CopyOutputWriter(handle, tracker))
+
+    def _export_parquet(self, view_name: str, filters: Dict, path: str, tracker: _ProgressTracker):
+        """Parquet écrit par groupes de lignes (un par bloc lu)"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ExportError("Le module 'pyarrow' est requis pour l'export Parquet")
+
+        writer = None
+        try:
+            for chunk in self._iter_chunks(view_name, filters):
+                table = pa.Table.from_pandas(chunk, preserve_index=False,
+                                             schema=writer.schema if writer else None)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                tracker.add(len(chunk))
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _export_xlsx(self, view_name: str, filters: Dict, path: str, tracker: _ProgressTracker):
+        """XLSX en mode écriture seule (lignes transmises au fichier au fil de l'eau)"""
+        try:
+            from openpyxl import Workbook
+        except ImportError:
+            raise ExportError("Le module 'openpyxl' est requis pour l'export Excel")
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(title=view_name[:31])
+        header_written = False
+
+        for chunk in self._iter_chunks(view_name, filters):
+            if not header_written:
+                sheet.append([str(col) for col in chunk.columns])
+                header_written = True
+
+            if tracker.rows + len(chunk) + 1 > XLSX_MAX_ROWS:
+                raise ExportError(
+                    f"Le résultat dépasse la limite Excel de {XLSX_MAX_ROWS - 1} lignes, "
+                    "utilisez CSV ou Parquet"
+                )
+
+            for row in _excel_rows(chunk):
+                sheet.append(row)
+            tracker.add(len(chunk))
+
+        workbook.save(path)
+
+    def _iter_chunks(self, view_name: str, filters: Dict):
+        return self.analysis_engine.iter_analysis(view_name, filters, chunk_size=self.chunk_size)
+
+def _excel_rows(chunk: pd.DataFrame):
+    """Lignes compatibles openpyxl (valeurs nulles -> None, dates sans fuseau)"""
+    for col in chunk.columns:
+        if isinstance(chunk[col].dtype, pd.DatetimeTZDtype):
+            chunk[col] = chunk[col].dt.tz_localize(None)
+
+    for row in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+        yield list(row)
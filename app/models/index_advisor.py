@@ -0,0 +1,282 @@
+"""
+Conseiller d'index pour les VIEWs KPI générées
+Propositions B-tree, BRIN ou trigramme, coût mesuré avant / après, création CONCURRENTLY
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.models.database_manager import DatabaseManager
+from .query_plan import QueryPlan
+from .view_builder import DATE_GROUPINGS, ViewBuilder, ViewDefinition
+
+logger = logging.getLogger(__name__)
+
+# Index valides d'une table : méthode, colonne et classe d'opérateurs de tête
+# (mêmes index que pg_indexes, sous forme structurée plutôt que le texte de indexdef)
+INDEXES_SQL = """
+SELECT i.relname AS index_name, am.amname AS method,
+       a.attname AS leading_column, opc.opcname AS opclass
+FROM pg_index x
+JOIN pg_class t ON t.oid = x.indrelid
+JOIN pg_namespace n ON n.oid = t.relnamespace
+JOIN pg_class i ON i.oid = x.indexrelid
+JOIN pg_am am ON am.oid = i.relam
+LEFT JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = x.indkey[0]
+LEFT JOIN pg_opclass opc ON opc.oid = x.indclass[0]
+WHERE n.nspname = %s AND t.relname = %s AND x.indisvalid
+"""
+
+# Volume de la table et corrélation entre ordre physique et valeurs de la colonne
+COLUMN_STATS_SQL = """
+SELECT c.reltuples::bigint AS row_estimate, s.correlation
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_stats s ON s.schemaname = n.nspname AND s.tablename = c.relname AND s.attname = %s
+WHERE n.nspname = %s AND c.relname = %s
+"""
+
+EXTENSIONS_SQL = "SELECT extname FROM pg_extension WHERE extname IN ('hypopg', 'pg_trgm')"
+
+# Condition de jointure simple : table.colonne = table.colonne
+JOIN_CONDITION = re.compile(r"^\s*(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)\s*$")
+
+TRIGRAM_OPCLASSES = {'gin_trgm_ops', 'gist_trgm_ops'}
+
+@dataclass
+class IndexProposal:
+    """Index proposé et son effet estimé sur la requête de la VIEW"""
+    table: str
+    column: str
+    method: str                          # 'btree', 'brin' ou 'gin'
+    reason: str
+    schema: str = 'public'
+    opclass: Optional[str] = None        # 'gin_trgm_ops' pour les filtres ILIKE
+    requires_extension: Optional[str] = None
+    cost_before: Optional[float] = None
+    cost_after: Optional[float] = None
+    measured_with: Optional[str] = None  # 'hypopg', 'temporary' ou None (non mesuré)
+    notes: List[str] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        suffix = {'btree': 'idx', 'brin': 'brin', 'gin': 'trgm'}[self.method]
+        return f"{self.table}_{self.column}_{suffix}"[:63]
+
+    @property
+    def improvement(self) -> Optional[float]:
+        """Réduction relative du coût estimé (0.4 = 40 % moins cher)"""
+        if self.cost_before is None or self.cost_after is None or self.cost_before <= 0:
+            return None
+        return 1.0 - self.cost_after / self.cost_before
+
+    def create_sql(self, concurrently: bool = True) -> str:
+        """Instruction de création (CONCURRENTLY : les écritures ne sont pas bloquées)"""
+        keyword = " CONCURRENTLY" if concurrently else ""
+        column = f"{self.column} {self.opclass}" if self.opclass else self.column
+        return (f"CREATE INDEX{keyword} IF NOT EXISTS {self.name} "
+                f"ON {self.schema}.{self.table} USING {self.method} ({column})")
+
+class IndexAdvisor:
+    """
+    Conseiller d'index pour une définition de VIEW
+
+    Les colonnes filtrées (bornes de dates, valeurs min / max, ILIKE), la
+    colonne de groupement temporel et la colonne de jointure de la table
+    secondaire sont comparées aux index existants. Chaque index manquant
+    est proposé (BRIN pour une grande table dont l'ordre physique suit la
+    colonne, trigramme pour ILIKE, B-tree sinon) puis mesuré : EXPLAIN de
+    la requête avec un index hypothétique (hypopg) ou, pour une table
+    modeste, un index temporaire créé dans une transaction annulée.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, view_builder: Optional[ViewBuilder] = None,
+                 brin_min_rows: int = 1000000, brin_min_correlation: float = 0.9,
+                 temporary_max_rows: int = 1000000, min_improvement: float = 0.1):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            view_builder: Constructeur des requêtes de VIEW
+            brin_min_rows: Volume à partir duquel un BRIN est préféré pour une colonne corrélée
+            brin_min_correlation: Corrélation minimale (valeur absolue) pour un BRIN
+            temporary_max_rows: Volume maximal pour mesurer avec un index temporaire réel
+            min_improvement: Réduction de coût à partir de laquelle un index est recommandé
+        """
+        self.db_manager = db_manager
+        self.view_builder = view_builder or ViewBuilder()
+        self.brin_min_rows = brin_min_rows
+        self.brin_min_correlation = brin_min_correlation
+        self.temporary_max_rows = temporary_max_rows
+        self.min_improvement = min_improvement
+
+    @property
+    def schema(self) -> str:
+        return self.db_manager.config.get_schema()
+
+    def advise(self, view_def: ViewDefinition) -> List[IndexProposal]:
+        """
+        Index proposés pour une VIEW, mesurés
+
+        Returns:
+            Propositions, les plus efficaces d'abord
+        """
+        proposals = self.candidates(view_def)
+        if proposals:
+            self.measure(view_def, proposals)
+        return sorted(proposals, key=lambda p: p.improvement if p.improvement is not None else -1.0,
+                      reverse=True)
+
+    def is_recommended(self, proposal: IndexProposal) -> bool:
+        """Index mesuré et suffisamment utile"""
+        return proposal.improvement is not None and proposal.improvement >= self.min_improvement
+
+    def candidates(self, view_def: ViewDefinition) -> List[IndexProposal]:
+        """Index manquants pour les filtres, le groupement et la jointure de la VIEW"""
+        table = view_def.main_table
+        wanted: List[Tuple[str, str, str]] = []    # (table, colonne, usage)
+        filters = {name: value for name, value in view_def.filters.items() if value}
+
+        if 'date_start' in filters or 'date_end' in filters:
+            wanted.append((table, view_def.x_field, 'range'))
+        if 'contains_text' in filters:
+            wanted.append((table, view_def.x_field, 'trigram'))
+        if ('min_value' in filters or 'max_value' in filters) and view_def.y_fields:
+            wanted.append((table, view_def.y_fields[0], 'range'))
+        if view_def.grouping in DATE_GROUPINGS and not any(usage == 'range' and column == view_def.x_field
+                                                           for _, column, usage in wanted):
+            wanted.append((table, view_def.x_field, 'grouping'))
+        join = self._join_column(view_def)
+        if join:
+            wanted.append((join[0], join[1], 'join'))
+
+        extensions = self._extensions()
+        indexes: Dict[str, List[Dict]] = {}
+        proposals: List[IndexProposal] = []
+        seen: Set[Tuple[str, str, str]] = set()
+        for table_name, column, usage in wanted:
+            if table_name not in indexes:
+                indexes[table_name] = self.db_manager.execute_query(
+                    INDEXES_SQL, (self.schema, table_name), fetch_results=True)
+            if self._is_covered(indexes[table_name], column, usage):
+                continue
+            proposal = self._propose(table_name, column, usage, extensions)
+            key = (proposal.table, proposal.column, proposal.method)
+            if key not in seen:
+                seen.add(key)
+                proposals.append(proposal)
+        return proposals
+
+    def measure(self, view_def: ViewDefinition, proposals: List[IndexProposal]):
+        """Coût estimé de la requête sans puis avec chaque index (rien n'est conservé)"""
+        query = self.view_builder.build_select_query(view_def)
+        cost_before = QueryPlan.from_explain(self.db_manager.explain(query)).total_cost
+        hypopg = 'hypopg' in self._extensions()
+
+        for proposal in proposals:
+            proposal.cost_before = cost_before
+            if proposal.requires_extension:
+                proposal.notes.append(f"Extension {proposal.requires_extension} requise : non mesuré")
+                continue
+            try:
+                if hypopg and proposal.method != 'gin':
+                    # Index hypothétique : visible du planificateur de cette session seulement
+                    definition = proposal.create_sql(concurrently=False).replace("'", "''")
+                    setup = ["SELECT hypopg_reset()", f"SELECT * FROM hypopg_create_index('{definition}')"]
+                    explain_output = self.db_manager.explain(query, setup=setup, teardown=["SELECT hypopg_reset()"])
+                    proposal.measured_with = 'hypopg'
+                elif self._row_estimate(proposal) <= self.temporary_max_rows:
+                    # Index réel dans une transaction annulée (écritures bloquées le temps de la mesure)
+                    explain_output = self.db_manager.explain(query, setup=[proposal.create_sql(concurrently=False)])
+                    proposal.measured_with = 'temporary'
+                else:
+                    proposal.notes.append("Table volumineuse sans hypopg : non mesuré")
+                    continue
+                proposal.cost_after = QueryPlan.from_explain(explain_output).total_cost
+            except Exception as e:
+                proposal.notes.append(f"Mesure impossible: {e}")
+                logger.warning(f"⚠️ Index {proposal.name} could not be measured: {e}")
+
+    def create_index(self, proposal: IndexProposal):
+        """
+        Construit l'index approuvé sans bloquer les écritures (CREATE INDEX CONCURRENTLY)
+
+        Un index laissé invalide par un échec est supprimé.
+        """
+        if proposal.requires_extension:
+            self.db_manager.execute_autocommit(f"CREATE EXTENSION IF NOT EXISTS {proposal.requires_extension}")
+        try:
+            self.db_manager.execute_autocommit(proposal.create_sql(concurrently=True))
+        except Exception:
+            self.db_manager.execute_autocommit(
+                f"DROP INDEX CONCURRENTLY IF EXISTS {proposal.schema}.{proposal.name}")
+            raise
+        logger.info(f"✅ Index {proposal.name} created on {proposal.table}({proposal.column})")
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _propose(self, table: str, column: str, usage: str, extensions: Set[str]) -> IndexProposal:
+        if usage == 'trigram':
+            return IndexProposal(
+                table, column, 'gin', f"Filtre ILIKE '%...%' sur {column}", self.schema,
+                opclass='gin_trgm_ops',
+                requires_extension=None if 'pg_trgm' in extensions else 'pg_trgm'
+            )
+
+        reasons = {
+            'range': f"Filtre par bornes sur {column}",
+            'grouping': f"Groupement temporel sur {column}",
+            'join': f"Jointure sur {table}.{column}"
+        }
+        method = 'btree'
+        if usage in ('range', 'grouping'):
+            rows = self.db_manager.execute_query(COLUMN_STATS_SQL, (column, self.schema, table),
+                                                 fetch_results=True)
+            stats = rows[0] if rows else {}
+            row_estimate = stats.get('row_estimate') or 0
+            correlation = stats.get('correlation')
+            # Grande table remplie dans l'ordre de la colonne (dates d'intervention) : BRIN compact
+            if (row_estimate >= self.brin_min_rows and correlation is not None
+                    and abs(correlation) >= self.brin_min_correlation):
+                method = 'brin'
+        return IndexProposal(table, column, method, reasons[usage], self.schema)
+
+    def _is_covered(self, indexes: List[Dict], column: str, usage: str) -> bool:
+        """Un index existant a déjà la colonne en tête (avec la bonne classe pour ILIKE)"""
+        for index in indexes:
+            if index['leading_column'] != column:
+                continue
+            if usage == 'trigram':
+                if index['opclass'] in TRIGRAM_OPCLASSES:
+                    return True
+            elif index['method'] in ('btree', 'brin'):
+                return True
+        return False
+
+    def _join_column(self, view_def: ViewDefinition) -> Optional[Tuple[str, str]]:
+        """Colonne de la table secondaire dans une condition de jointure simple"""
+        if not view_def.secondary_table or not view_def.join_condition:
+            return None
+        match = JOIN_CONDITION.match(view_def.join_condition)
+        if not match:
+            return None
+        left_table, left_column, right_table, right_column = match.groups()
+        if right_table == view_def.secondary_table:
+            return right_table, right_column
+        if left_table == view_def.secondary_table:
+            return left_table, left_column
+        return None
+
+    def _row_estimate(self, proposal: IndexProposal) -> int:
+        rows = self.db_manager.execute_query(COLUMN_STATS_SQL, (proposal.column, self.schema, proposal.table),
+                                             fetch_results=True)
+        return int(rows[0]['row_estimate'] or 0) if rows else 0
+
+    def _extensions(self) -> Set[str]:
+        try:
+            rows = self.db_manager.execute_query(EXTENSIONS_SQL, fetch_results=True)
+            return {row['extname'] for row in rows}
+        except Exception as e:
+            logger.warning(f"⚠️ Extensions could not be listed: {e}")
+            return set()
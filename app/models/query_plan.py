@@ -0,0 +1,144 @@
+"""
+Plans d'exécution estimés (EXPLAIN sans exécution)
+Coût et volume prévus d'une requête, avertissements avant enregistrement d'une VIEW
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+# Nœuds qui lisent toute une relation
+FULL_SCAN_NODES = {'Seq Scan', 'Parallel Seq Scan'}
+
+# Nœuds qui lisent une relation en passant par un index ; un Bitmap Index Scan
+# (sans relation) est rattaché au Bitmap Heap Scan qui lit la table
+INDEX_SCAN_NODES = {'Index Scan', 'Index Only Scan', 'Bitmap Heap Scan'}
+
+@dataclass
+class QueryPlan:
+    """Estimations du planificateur pour une requête"""
+    total_cost: float
+    startup_cost: float
+    plan_rows: int
+    plan_width: int
+    node_type: str
+    root: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_explain(cls, explain_output: Any) -> 'QueryPlan':
+        """
+        Construit le plan depuis la sortie de EXPLAIN (FORMAT JSON)
+
+        Args:
+            explain_output: Texte JSON ou liste déjà décodée ([{"Plan": {...}}])
+        """
+        if isinstance(explain_output, str):
+            explain_output = json.loads(explain_output)
+        if isinstance(explain_output, list):
+            explain_output = explain_output[0]
+        root = explain_output['Plan']
+        return cls(
+            total_cost=float(root.get('Total Cost', 0.0)),
+            startup_cost=float(root.get('Startup Cost', 0.0)),
+            plan_rows=int(root.get('Plan Rows', 0)),
+            plan_width=int(root.get('Plan Width', 0)),
+            node_type=root.get('Node Type', ''),
+            root=root
+        )
+
+    def nodes(self) -> Iterator[Dict[str, Any]]:
+        """Parcours de tous les nœuds du plan"""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(node.get('Plans', ()))
+
+    def full_scans(self) -> List[str]:
+        """Relations lues intégralement (parcours séquentiels)"""
+        return sorted({node.get('Relation Name', '?') for node in self.nodes()
+                       if node.get('Node Type') in FULL_SCAN_NODES})
+
+    def access_paths(self) -> List[Dict[str, Any]]:
+        """
+        Accès aux relations (parcours séquentiels et par index)
+
+        Returns:
+            Pour chaque nœud de lecture : type, relation, index, lignes et coût estimés
+        """
+        paths = []
+        for node in self.nodes():
+            node_type = node.get('Node Type')
+            if node_type in FULL_SCAN_NODES or node_type in INDEX_SCAN_NODES:
+                paths.append({
+                    'node_type': node_type,
+                    'relation': node.get('Relation Name', '?'),
+                    'index': node.get('Index Name') or _bitmap_indexes(node),
+                    'rows': int(node.get('Plan Rows', 0)),
+                    'cost': float(node.get('Total Cost', 0.0)),
+                    'full_scan': node_type in FULL_SCAN_NODES
+                })
+        return sorted(paths, key=lambda path: path['cost'], reverse=True)
+
+    @property
+    def estimated_bytes(self) -> int:
+        """Volume prévu du résultat"""
+        return self.plan_rows * self.plan_width
+
+def _bitmap_indexes(node: Dict[str, Any]) -> Optional[str]:
+    """Index lus sous un Bitmap Heap Scan (y compris sous BitmapAnd / BitmapOr)"""
+    names = []
+    stack = list(node.get('Plans', ()))
+    while stack:
+        child = stack.pop(0)
+        if child.get('Node Type') == 'Bitmap Index Scan':
+            names.append(child.get('Index Name', '?'))
+        else:
+            stack.extend(child.get('Plans', ()))
+    return ", ".join(names) or None
+
+@dataclass
+class PlanValidation:
+    """Résultat de la validation d'une requête par le planificateur"""
+    valid: bool
+    plan: Optional[QueryPlan] = None
+    error: Optional[str] = None
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def total_cost(self) -> Optional[float]:
+        return self.plan.total_cost if self.plan else None
+
+    @property
+    def plan_rows(self) -> Optional[int]:
+        return self.plan.plan_rows if self.plan else None
+
+def assess_plan(plan: QueryPlan, max_cost: float, max_rows: int,
+                max_scan_cost: Optional[float] = None) -> List[str]:
+    """
+    Avertissements sur une définition coûteuse
+
+    Args:
+        plan: Plan estimé de la requête
+        max_cost: Coût au-delà duquel la requête est jugée coûteuse
+        max_rows: Nombre de lignes prévu au-delà duquel le résultat est jugé volumineux
+        max_scan_cost: Coût au-delà duquel un parcours séquentiel est signalé
+            (même si la requête reste sous max_cost)
+
+    Returns:
+        Messages d'avertissement (liste vide si rien à signaler)
+    """
+    warnings = []
+    if plan.total_cost > max_cost:
+        warnings.append(f"Coût estimé élevé: {plan.total_cost:,.0f} (seuil {max_cost:,.0f})")
+        scans = plan.full_scans()
+        if scans:
+            warnings.append(f"Parcours séquentiels: {', '.join(scans)}")
+    elif max_scan_cost is not None:
+        for path in plan.access_paths():
+            if path['full_scan'] and path['cost'] > max_scan_cost:
+                warnings.append(f"Parcours séquentiel de {path['relation']}: "
+                                f"coût {path['cost']:,.0f} (seuil {max_scan_cost:,.0f})")
+    if plan.plan_rows > max_rows:
+        warnings.append(f"Résultat volumineux: ~{plan.plan_rows:,} lignes (seuil {max_rows:,})")
+    return warnings
@@ -0,0 +1,273 @@
+"""
+Rafraîchissement ordonné des VIEWs matérialisées
+Graphe de dépendances (pg_depend / pg_rewrite), ordre topologique, branches en parallèle
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.models.database_manager import DatabaseManager
+from .refresh_scheduler import MaterializedViewRefreshScheduler
+
+logger = logging.getLogger(__name__)
+
+# Relations lues par la règle de chaque VIEW (simple ou matérialisée) du schéma
+DEPENDENCIES_SQL = """
+SELECT DISTINCT
+    dependent.relname AS view_name,
+    dependent.relkind AS view_kind,
+    source.relname AS source_name,
+    source.relkind AS source_kind
+FROM pg_rewrite r
+JOIN pg_depend d ON d.classid = 'pg_rewrite'::regclass AND d.objid = r.oid
+JOIN pg_class dependent ON dependent.oid = r.ev_class
+JOIN pg_class source ON source.oid = d.refobjid
+JOIN pg_namespace dn ON dn.oid = dependent.relnamespace
+JOIN pg_namespace sn ON sn.oid = source.relnamespace
+WHERE dn.nspname = %s AND sn.nspname = %s
+  AND dependent.relkind IN ('v', 'm')
+  AND d.refclassid = 'pg_class'::regclass
+  AND d.refobjid <> r.ev_class
+"""
+
+# Attente d'une VIEW déjà en cours de rafraîchissement par l'ordonnanceur (secondes)
+BUSY_POLL_SECONDS = 0.2
+
+@dataclass
+class ViewRefreshResult:
+    """Rafraîchissement d'une VIEW au sein d'une passe ordonnée"""
+    view_name: str
+    status: str                     # 'refreshed', 'failed', 'skipped' ou 'cycle'
+    duration: float = 0.0
+    started: float = 0.0            # Décalage depuis le début de la passe (secondes)
+    concurrent: bool = False
+    depends_on: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+@dataclass
+class RefreshReport:
+    """Bilan d'une passe de rafraîchissement ordonnée"""
+    results: Dict[str, ViewRefreshResult]
+    order: List[str]                # Ordre de fin des rafraîchissements
+    wall_time: float
+    critical_path: List[str]
+    critical_path_seconds: float
+    max_workers: int
+
+    @property
+    def success(self) -> bool:
+        return all(r.status == 'refreshed' for r in self.results.values())
+
+    @property
+    def total_refresh_seconds(self) -> float:
+        """Somme des durées (temps d'une passe séquentielle)"""
+        return sum(r.duration for r in self.results.values())
+
+    def format(self) -> str:
+        """Rapport texte : durée de chaque VIEW et chemin critique"""
+        lines = [
+            f"Rafraîchissement de {len(self.results)} VIEWs matérialisées en {self.wall_time:.2f}s "
+            f"({self.max_workers} en parallèle, {self.total_refresh_seconds:.2f}s cumulées)",
+            f"Chemin critique ({self.critical_path_seconds:.2f}s): "
+            + (" → ".join(self.critical_path) or "-")
+        ]
+        for result in sorted(self.results.values(), key=lambda r: (r.started, r.view_name)):
+            line = f"  {result.view_name:<40} {result.status:<9} {result.duration:7.2f}s"
+            if result.error:
+                line += f"  {result.error}"
+            lines.append(line)
+        return "\n".join(lines)
+
+class RefreshOrchestrator:
+    """
+    Rafraîchit les VIEWs matérialisées dans l'ordre de leurs dépendances
+
+    Le graphe est lu dans pg_depend / pg_rewrite ; une VIEW simple
+    intermédiaire est traversée (une VIEW matérialisée lue au travers d'une
+    VIEW simple reste une dépendance). Une VIEW n'est rafraîchie qu'après
+    toutes celles dont elle dépend (algorithme de Kahn) ; les branches
+    indépendantes avancent en parallèle dans la limite de max_workers.
+    Les rafraîchissements passent par l'ordonnanceur, qui mesure les
+    durées et choisit CONCURRENTLY quand c'est possible.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, scheduler: MaterializedViewRefreshScheduler,
+                 max_workers: int = 2):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            scheduler: Ordonnanceur des VIEWs matérialisées (VIEWs gérées et mesures)
+            max_workers: Rafraîchissements simultanés au maximum
+        """
+        self.db_manager = db_manager
+        self.scheduler = scheduler
+        self.max_workers = max(1, max_workers)
+
+    def load_graph(self) -> Dict[str, Set[str]]:
+        """
+        Dépendances entre VIEWs matérialisées gérées
+
+        Returns:
+            Pour chaque VIEW matérialisée, les VIEWs matérialisées à rafraîchir avant elle
+        """
+        if self.scheduler.discovery_age() is None:
+            self.scheduler.discover()
+        managed = set(self.scheduler.managed_views())
+
+        schema = self.db_manager.config.get_schema()
+        rows = self.db_manager.execute_query(DEPENDENCIES_SQL, (schema, schema), fetch_results=True)
+
+        sources: Dict[str, Set[str]] = {}
+        plain_views: Set[str] = set()
+        for row in rows:
+            sources.setdefault(row['view_name'], set()).add(row['source_name'])
+            if row['view_kind'] == 'v':
+                plain_views.add(row['view_name'])
+
+        return {name: self._materialized_sources(name, sources, plain_views, managed)
+                for name in managed}
+
+    def refresh(self, targets: Optional[Iterable[str]] = None) -> RefreshReport:
+        """
+        Passe de rafraîchissement ordonnée
+
+        Args:
+            targets: VIEWs à rafraîchir, avec les VIEWs matérialisées dont elles
+                dépendent (toutes les VIEWs gérées si None)
+
+        Returns:
+            Bilan : durée de chaque VIEW, temps total et chemin critique
+        """
+        graph = self.load_graph()
+        if targets is not None:
+            graph = self._with_upstream(graph, targets)
+
+        dependents: Dict[str, Set[str]] = {name: set() for name in graph}
+        for name, deps in graph.items():
+            for dep in deps:
+                dependents[dep].add(name)
+        pending = {name: len(deps) for name, deps in graph.items()}
+
+        results: Dict[str, ViewRefreshResult] = {}
+        order: List[str] = []
+        started_at = time.perf_counter()
+        ready = sorted(name for name, count in pending.items() if count == 0)
+
+        logger.info(f"🔄 Ordered refresh of {len(graph)} materialized views ({self.max_workers} workers)")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="matview-refresh") as executor:
+            running = {}
+            while ready or running:
+                while ready:
+                    name = ready.pop(0)
+                    running[executor.submit(self._refresh_one, name, started_at)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    result = future.result()
+                    result.depends_on = sorted(graph[name])
+                    results[name] = result
+                    order.append(name)
+
+                    for child in sorted(dependents[name]):
+                        if result.status != 'refreshed':
+                            self._skip(child, name, graph, dependents, results)
+                            continue
+                        pending[child] -= 1
+                        if pending[child] == 0 and child not in results:
+                            ready.append(child)
+
+        # Restent les VIEWs d'un cycle (impossible en principe dans PostgreSQL)
+        for name in graph:
+            if name not in results:
+                results[name] = ViewRefreshResult(name, 'cycle', depends_on=sorted(graph[name]),
+                                                  error="Dépendance circulaire")
+
+        path, length = self._critical_path(graph, results, order)
+        report = RefreshReport(results, order, time.perf_counter() - started_at,
+                               path, length, self.max_workers)
+        logger.info(f"✅ Ordered refresh done in {report.wall_time:.2f}s, "
+                    f"critical path {report.critical_path_seconds:.2f}s")
+        return report
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _materialized_sources(self, name: str, sources: Dict[str, Set[str]],
+                              plain_views: Set[str], managed: Set[str]) -> Set[str]:
+        """VIEWs matérialisées gérées lues par une VIEW, au travers des VIEWs simples"""
+        found: Set[str] = set()
+        seen: Set[str] = set()
+        stack = list(sources.get(name, ()))
+        while stack:
+            source = stack.pop()
+            if source in seen or source == name:
+                continue
+            seen.add(source)
+            if source in managed:
+                found.add(source)
+            elif source in plain_views:
+                stack.extend(sources.get(source, ()))
+        return found
+
+    def _with_upstream(self, graph: Dict[str, Set[str]], targets: Iterable[str]) -> Dict[str, Set[str]]:
+        """Sous-graphe des cibles et de leurs dépendances (directes et indirectes)"""
+        selected: Set[str] = set()
+        stack = [name.lower() for name in targets]
+        unknown = [name for name in stack if name not in graph]
+        if unknown:
+            logger.warning(f"⚠️ Not managed materialized views ignored: {', '.join(unknown)}")
+        stack = [name for name in stack if name in graph]
+        while stack:
+            name = stack.pop()
+            if name not in selected:
+                selected.add(name)
+                stack.extend(graph[name])
+        return {name: graph[name] & selected for name in selected}
+
+    def _refresh_one(self, view_name: str, started_at: float) -> ViewRefreshResult:
+        """Rafraîchit une VIEW (attend la fin d'un rafraîchissement planifié en cours)"""
+        while not self.scheduler.try_acquire(view_name):
+            time.sleep(BUSY_POLL_SECONDS)
+        offset = time.perf_counter() - started_at
+        outcome = self.scheduler.refresh(view_name)
+        return ViewRefreshResult(
+            view_name, 'refreshed' if outcome.success else 'failed',
+            outcome.duration, offset, outcome.concurrent, error=outcome.error
+        )
+
+    def _skip(self, name: str, failed: str, graph: Dict[str, Set[str]],
+              dependents: Dict[str, Set[str]], results: Dict[str, ViewRefreshResult]):
+        """Une dépendance a échoué : la VIEW et ses descendantes ne sont pas rafraîchies"""
+        stack = [name]
+        while stack:
+            current = stack.pop()
+            if current in results:
+                continue
+            results[current] = ViewRefreshResult(current, 'skipped', depends_on=sorted(graph[current]),
+                                                 error=f"Dépendance {failed} non rafraîchie")
+            stack.extend(dependents[current])
+
+    def _critical_path(self, graph: Dict[str, Set[str]], results: Dict[str, ViewRefreshResult],
+                       order: List[str]) -> tuple:
+        """Plus long chemin du graphe pondéré par les durées mesurées"""
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        # L'ordre de fin est un ordre topologique des VIEWs traitées
+        for name in order:
+            best = max(graph[name], key=lambda dep: finish.get(dep, 0.0), default=None)
+            finish[name] = finish.get(best, 0.0) + results[name].duration
+            previous[name] = best
+
+        if not finish:
+            return [], 0.0
+        end = max(finish, key=finish.get)
+        path = []
+        current: Optional[str] = end
+        while current is not None:
+            path.append(current)
+            current = previous.get(current)
+        return list(reversed(path)), finish[end]
@@ -0,0 +1,308 @@
+"""
+Planification du rafraîchissement des VIEWs matérialisées KPI
+Cadence propre à chaque VIEW selon son coût de rafraîchissement mesuré
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from app.models.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# VIEWs matérialisées du schéma et présence d'un index unique (requis par CONCURRENTLY)
+MATVIEWS_SQL = """
+SELECT
+    m.schemaname AS schema_name,
+    m.matviewname AS view_name,
+    m.ispopulated AS is_populated,
+    EXISTS (
+        SELECT 1 FROM pg_index i
+        WHERE i.indrelid = c.oid
+          AND i.indisunique
+          AND i.indpred IS NULL
+          AND i.indexprs IS NULL
+    ) AS has_unique_index
+FROM pg_matviews m
+JOIN pg_namespace n ON n.nspname = m.schemaname
+JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = m.matviewname
+WHERE m.schemaname = %s
+"""
+
+# Refus de REFRESH ... CONCURRENTLY : pas d'index unique utilisable (55000),
+# VIEW jamais remplie (0A000). Toute autre erreur n'entraîne pas de repli.
+CONCURRENT_REFUSED_SQLSTATES = {'55000', '0A000'}
+
+def _sqlstate(error: BaseException) -> Optional[str]:
+    """Code SQLSTATE de l'erreur PostgreSQL d'origine (chaîne des exceptions)"""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        for candidate in (error, getattr(error, 'orig', None)):
+            code = getattr(candidate, 'pgcode', None) or getattr(candidate, 'sqlstate', None)
+            if code:
+                return code
+        error = error.__cause__ or error.__context__
+    return None
+
+@dataclass
+class MatviewRefreshState:
+    """État de rafraîchissement d'une VIEW matérialisée"""
+    name: str
+    schema: str
+    populated: bool = True
+    has_unique_index: bool = False
+    last_refresh: Optional[float] = None       # time.monotonic() du dernier rafraîchissement
+    last_refreshed_at: Optional[datetime] = None
+    avg_duration: Optional[float] = None       # Moyenne mobile exponentielle (secondes)
+    last_duration: Optional[float] = None
+    refresh_count: int = 0
+    failures: int = 0
+    in_progress: bool = False
+    last_error: Optional[str] = None
+
+    @property
+    def qualified_name(self) -> str:
+        return f'"{self.schema}"."{self.name}"'
+
+@dataclass
+class RefreshOutcome:
+    """Résultat d'un rafraîchissement"""
+    view_name: str
+    success: bool
+    duration: float
+    concurrent: bool
+    error: Optional[str] = None
+
+class MaterializedViewRefreshScheduler:
+    """
+    Ordonnanceur des REFRESH MATERIALIZED VIEW
+
+    Chaque VIEW a sa propre cadence : intervalle de base augmenté d'un
+    multiple de sa durée moyenne de rafraîchissement, borné, et allongé
+    après des échecs successifs. Les VIEWs les plus en retard passent en
+    premier et le nombre de rafraîchissements simultanés est plafonné.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, base_interval: float = 300.0,
+                 min_interval: float = 60.0, max_interval: float = 6 * 3600.0,
+                 cost_factor: float = 20.0, max_concurrent: int = 2, smoothing: float = 0.3,
+                 view_filter: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            base_interval: Intervalle de rafraîchissement d'une VIEW peu coûteuse (secondes)
+            min_interval: Intervalle minimal (secondes)
+            max_interval: Intervalle maximal (secondes)
+            cost_factor: Secondes d'intervalle ajoutées par seconde de rafraîchissement
+            max_concurrent: Rafraîchissements simultanés autorisés
+            smoothing: Poids de la dernière mesure dans la moyenne des durées
+            view_filter: Sélection des VIEWs gérées (toutes si None)
+        """
+        self.db_manager = db_manager
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.cost_factor = cost_factor
+        self.max_concurrent = max_concurrent
+        self.smoothing = smoothing
+        self.view_filter = view_filter
+
+        self._lock = threading.Lock()
+        self._states: Dict[str, MatviewRefreshState] = {}
+        self._discovered_at: Optional[float] = None
+
+    def discover(self) -> int:
+        """
+        Recense les VIEWs matérialisées (une requête catalogue)
+
+        Les VIEWs déjà suivies conservent leurs mesures ; une VIEW jamais
+        remplie est à rafraîchir immédiatement, les autres après un intervalle.
+
+        Returns:
+            Nombre de VIEWs suivies
+        """
+        rows = self.db_manager.execute_query(
+            MATVIEWS_SQL, (self.db_manager.config.get_schema(),), fetch_results=True
+        )
+        now = time.monotonic()
+
+        with self._lock:
+            found = {}
+            for row in rows:
+                name = row['view_name']
+                if self.view_filter and not self.view_filter(name):
+                    continue
+                state = self._states.get(name) or MatviewRefreshState(name, row['schema_name'])
+                state.populated = bool(row['is_populated'])
+                state.has_unique_index = bool(row['has_unique_index'])
+                if state.last_refresh is None and state.populated:
+                    state.last_refresh = now
+                found[name] = state
+            self._states = found
+            self._discovered_at = now
+
+        logger.info(f"🗓️ {len(found)} materialized views scheduled for refresh")
+        return len(found)
+
+    def discovery_age(self) -> Optional[float]:
+        """Âge du dernier recensement (secondes), None si jamais fait"""
+        return None if self._discovered_at is None else time.monotonic() - self._discovered_at
+
+    def interval_for(self, state: MatviewRefreshState) -> float:
+        """Intervalle entre deux rafraîchissements d'une VIEW (secondes)"""
+        cost = state.avg_duration or 0.0
+        interval = self.base_interval + self.cost_factor * cost
+        if state.failures:
+            interval *= 2 ** min(state.failures, 4)
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def staleness(self, state: MatviewRefreshState, now: Optional[float] = None) -> float:
+        """Retard relatif : 1.0 quand la VIEW arrive à échéance"""
+        if state.last_refresh is None:
+            return float('inf')
+        now = time.monotonic() if now is None else now
+        return (now - state.last_refresh) / self.interval_for(state)
+
+    def acquire_due(self, now: Optional[float] = None) -> List[str]:
+        """
+        Réserve les VIEWs à rafraîchir dans la limite des places libres
+
+        Les VIEWs retournées sont marquées en cours ; refresh() les libère.
+
+        Returns:
+            Noms des VIEWs, les plus en retard d'abord
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            running = sum(1 for s in self._states.values() if s.in_progress)
+            free_slots = self.max_concurrent - running
+            if free_slots <= 0:
+                return []
+
+            due = [s for s in self._states.values()
+                   if not s.in_progress and self.staleness(s, now) >= 1.0]
+            due.sort(key=lambda s: self.staleness(s, now), reverse=True)
+
+            selected = due[:free_slots]
+            for state in selected:
+                state.in_progress = True
+            return [state.name for state in selected]
+
+    def try_acquire(self, view_name: str) -> bool:
+        """
+        Réserve une VIEW précise (passe ordonnée), hors échéance
+
+        Returns:
+            False si la VIEW est déjà en cours de rafraîchissement
+        """
+        with self._lock:
+            state = self._states.get(view_name)
+            if state is None:
+                return True
+            if state.in_progress:
+                return False
+            state.in_progress = True
+            return True
+
+    def managed_views(self) -> List[str]:
+        """VIEWs matérialisées suivies"""
+        with self._lock:
+            return sorted(self._states)
+
+    def refresh(self, view_name: str) -> RefreshOutcome:
+        """
+        Rafraîchit une VIEW réservée par acquire_due (exécuté dans un worker)
+
+        CONCURRENTLY est utilisé si la VIEW est remplie et possède un index
+        unique ; s'il est refusé par PostgreSQL (index ou remplissage), le
+        rafraîchissement est refait sans, jusqu'au prochain recensement qui
+        relit le catalogue. Une autre erreur (connexion, verrou, annulation)
+        est un échec ordinaire.
+        """
+        with self._lock:
+            state = self._states.get(view_name)
+            if state is None:
+                return RefreshOutcome(view_name, False, 0.0, False, "VIEW non suivie")
+            state.in_progress = True
+            concurrent = state.populated and state.has_unique_index
+
+        started = time.perf_counter()
+        error = None
+        try:
+            try:
+                self._execute_refresh(state, concurrent)
+            except Exception as e:
+                sqlstate = _sqlstate(e)
+                if not concurrent or sqlstate not in CONCURRENT_REFUSED_SQLSTATES:
+                    raise
+                logger.warning(f"⚠️ Concurrent refresh of {view_name} refused, retrying without: {e}")
+                concurrent = False
+                with self._lock:
+                    if sqlstate == '0A000':
+                        state.populated = False
+                    else:
+                        state.has_unique_index = False
+                self._execute_refresh(state, concurrent)
+        except Exception as e:
+            error = str(e)
+
+        duration = time.perf_counter() - started
+        with self._lock:
+            state.in_progress = False
+            if error is None:
+                state.last_refresh = time.monotonic()
+                state.last_refreshed_at = datetime.now()
+                state.last_duration = duration
+                state.avg_duration = duration if state.avg_duration is None else (
+                    self.smoothing * duration + (1 - self.smoothing) * state.avg_duration)
+                state.refresh_count += 1
+                state.failures = 0
+                state.populated = True
+                state.last_error = None
+            else:
+                # Échec : nouvelle tentative après un intervalle allongé
+                state.failures += 1
+                state.last_refresh = time.monotonic()
+                state.last_error = error
+
+        if error is None:
+            logger.info(f"🔄 Materialized view {view_name} refreshed in {duration:.2f}s "
+                        f"({'concurrently' if concurrent else 'locking'}), "
+                        f"next in {self.interval_for(state):.0f}s")
+        else:
+            logger.error(f"❌ Refresh of {view_name} failed: {error}")
+        return RefreshOutcome(view_name, error is None, duration, concurrent, error)
+
+    def get_states(self) -> List[Dict]:
+        """État de chaque VIEW suivie (cadence, durées, prochaine échéance)"""
+        now = time.monotonic()
+        with self._lock:
+            states = []
+            for state in self._states.values():
+                interval = self.interval_for(state)
+                states.append({
+                    'name': state.name,
+                    'interval': interval,
+                    'avg_duration': state.avg_duration,
+                    'last_duration': state.last_duration,
+                    'last_refreshed_at': state.last_refreshed_at,
+                    'next_refresh_in': (0.0 if state.last_refresh is None
+                                        else max(0.0, state.last_refresh + interval - now)),
+                    'refresh_count': state.refresh_count,
+                    'failures': state.failures,
+                    'concurrent': state.populated and state.has_unique_index,
+                    'in_progress': state.in_progress,
+                    'last_error': state.last_error
+                })
+            return states
+
+    def _execute_refresh(self, state: MatviewRefreshState, concurrent: bool):
+        keyword = " CONCURRENTLY" if concurrent else ""
+        self.db_manager.execute_query(
+            f"REFRESH MATERIALIZED VIEW{keyword} {state.qualified_name}", fetch_results=False
+        )
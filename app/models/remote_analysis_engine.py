@@ -0,0 +1,255 @@
+"""
+Moteur d'analyse distant - Analyses exécutées par le service de requêtes partagé
+Alternative à la connexion directe (variable REPORTING_SERVICE_URL)
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from urllib.error import HTTPError, URLError
+from urllib.parse import quote, urlparse
+from urllib.request import Request, urlopen
+
+import pandas as pd
+
+from utils.exceptions import (AnalysisCancelledError, DatabaseConnectionError, DataProcessingError,
+                              ExportError, QueryExecutionError, ViewNotFoundError)
+from utils.single_flight import SingleFlight
+from .analysis_engine import _freeze
+
+logger = logging.getLogger(__name__)
+
+# === FORMAT D'ÉCHANGE DES RÉSULTATS ===
+
+def encode_dataframe(df: pd.DataFrame, **metadata) -> str:
+    """
+    Sérialise un résultat pour le client distant
+
+    Args:
+        df: Résultat d'analyse
+        **metadata: Champs ajoutés à la réponse (origine, colonne de date...)
+
+    Returns:
+        Document JSON {"dtypes", "result": {"columns", "data"}, ...metadata}
+    """
+    header = json.dumps({
+        **metadata,
+        'dtypes': {str(col): str(dtype) for col, dtype in df.dtypes.items()}
+    })
+    # Le résultat est inséré tel que produit par pandas (pas de second encodage)
+    result = df.to_json(orient='split', date_format='iso', index=False)
+    return f'{header[:-1]}, "result": {result}}}'
+
+def decode_dataframe(payload: Dict) -> pd.DataFrame:
+    """Reconstruit le DataFrame d'une réponse encode_dataframe (dates retypées)"""
+    result = payload.get('result') or {}
+    df = pd.DataFrame(result.get('data') or [], columns=result.get('columns') or [])
+    for col, dtype in (payload.get('dtypes') or {}).items():
+        if col in df.columns and dtype.startswith('datetime64'):
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+class ServiceClient:
+    """Client HTTP minimal du service de requêtes"""
+
+    def __init__(self, base_url: str, timeout: float = 300.0):
+        """
+        Args:
+            base_url: Adresse du service (ex: http://reporting-host:8765)
+            timeout: Délai maximal d'une requête (secondes)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def get(self, path: str) -> Dict:
+        return self._request('GET', path)
+
+    def post(self, path: str, body: Dict) -> Dict:
+        return self._request('POST', path, body)
+
+    def _request(self, method: str, path: str, body: Optional[Dict] = None) -> Dict:
+        """Requête JSON ; les erreurs du service sont traduites en exceptions du module"""
+        data = json.dumps(body, default=str).encode('utf-8') if body is not None else None
+        request = Request(f"{self.base_url}{path}", data=data, method=method,
+                          headers={'Content-Type': 'application/json'})
+        try:
+            with urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read().decode('utf-8'))
+        except HTTPError as e:
+            message = _error_message(e)
+            if e.code == 404:
+                raise ViewNotFoundError(message)
+            raise QueryExecutionError(f"Service de requêtes ({e.code}): {message}")
+        except URLError as e:
+            raise DatabaseConnectionError(f"Service de requêtes injoignable ({self.base_url}): {e.reason}")
+
+class _RemoteConfig:
+    """Configuration exposée par le service (limite de lignes, schéma)"""
+
+    def __init__(self, health: Dict):
+        self._max_rows = int(health.get('max_rows') or 10000)
+        self._schema = (health.get('connection') or {}).get('schema', 'public')
+
+    def get_max_rows(self) -> int:
+        return self._max_rows
+
+    def get_schema(self) -> str:
+        return self._schema
+
+class RemoteDatabaseManager:
+    """
+    Source de données servie par le service de requêtes
+
+    Couvre la découverte des VIEWs et leur structure ; les opérations qui
+    exigent une connexion directe (constructeur de VIEWs, COPY) sont refusées.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 300.0):
+        """Connexion au service (état vérifié immédiatement, comme DatabaseManager)"""
+        self.client = ServiceClient(base_url, timeout)
+        health = self.client.get('/health')
+        self.config = _RemoteConfig(health)
+        self._connection = health.get('connection') or {}
+        self._discovered = False
+        logger.info(f"✅ Query service connected: {self.client.base_url}")
+
+    def test_connection(self) -> bool:
+        try:
+            self.client.get('/health')
+            return True
+        except DatabaseConnectionError:
+            return False
+
+    def get_available_views(self) -> List[Dict]:
+        """VIEWs du service (la première découverte réutilise la sienne, les suivantes la relancent)"""
+        path = '/views?refresh=1' if self._discovered else '/views'
+        views = self.client.get(path)['views']
+        self._discovered = True
+        logger.info(f"📊 Found {len(views)} business VIEWs on query service")
+        return views
+
+    def get_view_structure(self, view_name: str) -> Dict:
+        info = self.client.get(f"/views/{quote(view_name, safe='')}")
+        if 'error' in info:
+            raise ViewNotFoundError(info['error'])
+        return info['structure']
+
+    def get_connection_info(self) -> Dict:
+        """Informations de connexion du service (base interrogée par le service)"""
+        url = urlparse(self.client.base_url)
+        return {
+            'host': url.hostname,
+            'port': url.port,
+            'database': self._connection.get('database'),
+            'username': self._connection.get('username'),
+            'schema': self.config.get_schema(),
+            'service': self.client.base_url
+        }
+
+    def get_tables_metadata(self) -> List[Dict]:
+        raise QueryExecutionError("Métadonnées des tables indisponibles via le service de requêtes")
+
+    def execute_query(self, query, params: Dict = None) -> pd.DataFrame:
+        raise QueryExecutionError("Requêtes SQL directes indisponibles via le service de requêtes")
+
+class RemoteAnalysisEngine:
+    """Moteur d'analyse dont les requêtes sont exécutées par le service partagé"""
+
+    def __init__(self, db_manager: RemoteDatabaseManager, views: Optional[List[Dict]] = None):
+        """
+        Args:
+            db_manager: Source de données du service
+            views: VIEWs déjà découvertes (évite une seconde découverte)
+        """
+        self.db_manager = db_manager
+        self.client = db_manager.client
+        self.available_views = []
+        self._date_columns: Dict[str, Optional[str]] = {}
+        # Requêtes identiques simultanées du poste : une seule requête au service
+        self._in_flight = SingleFlight(retry_on=(AnalysisCancelledError,))
+
+        if views is None:
+            self.refresh_views()
+        else:
+            self.set_available_views(views)
+
+    def get_available_analyses(self) -> List[Dict]:
+        return self.available_views
+
+    def set_available_views(self, views: List[Dict]) -> None:
+        self._date_columns.clear()
+        self.available_views = views
+        logger.info(f"📊 {len(self.available_views)} VIEWs chargées")
+
+    def refresh_views(self) -> int:
+        self.set_available_views(self.db_manager.get_available_views())
+        return len(self.available_views)
+
+    def run_analysis(self, view_name: str, filters: Dict = None,
+                     aggregations: Dict = None, limit: int = None,
+                     on_chunk: Optional[Callable[[pd.DataFrame], None]] = None,
+                     chunk_size: int = 2000,
+                     is_cancelled: Optional[Callable[[], bool]] = None) -> pd.DataFrame:
+        """
+        Exécute une analyse sur le service (même interface que AnalysisEngine.run_analysis)
+
+        Le résultat arrive en une seule réponse : on_chunk est appelé une fois.
+        """
+        key = ('analysis', view_name, _freeze(filters), _freeze(aggregations), limit)
+        result_df = self._in_flight.do(key, lambda: self._fetch_analysis(view_name, filters, aggregations, limit))
+
+        if on_chunk is not None and not result_df.empty:
+            if is_cancelled and is_cancelled():
+                raise AnalysisCancelledError("Analyse annulée")
+            on_chunk(result_df)
+        return result_df
+
+    def get_view_info(self, view_name: str) -> Dict:
+        try:
+            return self._in_flight.do(('view_info', view_name),
+                                      lambda: self.client.get(f"/views/{quote(view_name, safe='')}"))
+        except Exception as e:
+            logger.error(f"❌ Erreur info VIEW {view_name}: {e}")
+            return {'error': str(e)}
+
+    def get_date_column(self, view_name: str) -> Optional[str]:
+        return self._date_columns.get(view_name)
+
+    def get_in_flight_stats(self) -> Dict[str, int]:
+        return self._in_flight.get_stats()
+
+    def build_analysis_query(self, view_name: str, filters: Dict = None, aggregations: Dict = None):
+        raise ExportError("Export CSV par COPY indisponible via le service de requêtes (utiliser Parquet ou XLSX)")
+
+    def iter_analysis(self, view_name: str, filters: Dict = None,
+                      aggregations: Dict = None, chunk_size: int = 10000):
+        """Résultat du service découpé en blocs (limité à MAX_QUERY_ROWS par le service)"""
+        df = self.run_analysis(view_name, filters, aggregations)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+    def _fetch_analysis(self, view_name: str, filters: Dict, aggregations: Dict, limit: int) -> pd.DataFrame:
+        try:
+            logger.info(f"🔍 Analyse de la VIEW via le service: {view_name}")
+            payload = self.client.post('/analysis', {
+                'view': view_name,
+                'filters': filters or {},
+                'aggregations': aggregations,
+                'limit': limit
+            })
+            self._date_columns[view_name] = payload.get('date_column')
+            result_df = decode_dataframe(payload)
+            logger.info(f"✅ Analyse terminée: {len(result_df)} lignes ({payload.get('source')})")
+            return result_df
+        except (ViewNotFoundError, DatabaseConnectionError):
+            raise
+        except Exception as e:
+            logger.error(f"❌ Erreur analyse {view_name}: {e}")
+            raise DataProcessingError(f"Erreur lors de l'analyse: {e}")
+
+def _error_message(error: HTTPError) -> str:
+    """Message d'erreur renvoyé par le service"""
+    try:
+        return json.loads(error.read().decode('utf-8')).get('error', str(error))
+    except Exception:
+        return str(error)
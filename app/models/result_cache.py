@@ -0,0 +1,221 @@
+"""
+Cache des résultats d'analyse
+Réutilisation locale des résultats déjà chargés (sous-plages de dates)
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+# pandas n'est chargé qu'avec les premiers résultats (démarrage de l'application)
+if TYPE_CHECKING:
+    import pandas as pd
+    from .result_schema import ResultSchema
+
+logger = logging.getLogger(__name__)
+
+# Clés de filtres traitées comme une plage de dates
+DATE_FILTER_KEYS = ('date_start', 'date_end')
+
+@dataclass
+class CachedResult:
+    """Résultat d'analyse conservé avec le contexte de sa requête"""
+    view_name: str
+    filters: Dict[str, Any]
+    dataframe: 'pd.DataFrame'
+    date_column: Optional[str] = None
+    complete: bool = True  # False si le résultat a été tronqué par la limite de lignes
+    created_at: datetime = field(default_factory=datetime.now)
+    schema: Optional['ResultSchema'] = None  # Index temporel construit au premier filtrage local
+    expires_at: Optional[datetime] = None  # Expiration (résultats préchargés)
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and datetime.now() >= self.expires_at
+
+    def covers(self, date_start, date_end) -> bool:
+        """Indique si la plage demandée est incluse dans celle du résultat"""
+        cached_start = _to_timestamp(self.filters.get('date_start'))
+        cached_end = _to_timestamp(self.filters.get('date_end'))
+
+        if cached_start is not None and (date_start is None or date_start < cached_start):
+            return False
+        if cached_end is not None and (date_end is None or date_end > cached_end):
+            return False
+        return True
+
+class ResultCache:
+    """
+    Cache LRU des résultats d'analyse
+    Permet de servir localement une plage de dates incluse dans un résultat déjà chargé
+    """
+
+    def __init__(self, max_entries: int = 20):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CachedResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.local_hits = 0
+        self.misses = 0
+
+    def store(self, view_name: str, filters: Dict[str, Any], dataframe: 'pd.DataFrame',
+              date_column: Optional[str] = None, complete: bool = True,
+              ttl: Optional[float] = None) -> None:
+        """
+        Enregistre un résultat d'analyse
+
+        Args:
+            view_name: Nom de la VIEW interrogée
+            filters: Filtres utilisés pour la requête
+            dataframe: Résultat de la requête
+            date_column: Colonne sur laquelle le filtre de dates a été appliqué
+            complete: False si le résultat a été tronqué
+            ttl: Durée de validité en secondes (None : jusqu'à invalidation)
+        """
+        key = self._make_key(view_name, filters)
+        entry = CachedResult(view_name, dict(filters or {}), dataframe, date_column, complete)
+        if ttl is not None:
+            entry.expires_at = entry.created_at + timedelta(seconds=ttl)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def lookup(self, view_name: str, filters: Dict[str, Any],
+               max_age: Optional[float] = None) -> Optional['pd.DataFrame']:
+        """
+        Recherche un résultat utilisable pour la requête
+
+        Args:
+            view_name: Nom de la VIEW
+            filters: Filtres de la requête
+            max_age: Âge maximal accepté en secondes (None : sans limite)
+
+        Returns:
+            DataFrame (filtré localement si nécessaire) ou None si la base doit être interrogée
+        """
+        filters = filters or {}
+        key = self._make_key(view_name, filters)
+
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(key)
+            if entry is not None and _is_fresh(entry, max_age):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.dataframe
+
+            candidate = self._find_covering_entry(view_name, filters, max_age)
+            if candidate is None:
+                self.misses += 1
+                return None
+            self.local_hits += 1
+
+        return self._filter_locally(candidate, filters)
+
+    def contains(self, view_name: str, filters: Dict[str, Any],
+                 max_age: Optional[float] = None) -> bool:
+        """Indique si la requête peut être servie par le cache (sans compter d'accès)"""
+        filters = filters or {}
+        with self._lock:
+            self._purge_expired()
+            entry = self._entries.get(self._make_key(view_name, filters))
+            if entry is not None and _is_fresh(entry, max_age):
+                return True
+            return self._find_covering_entry(view_name, filters, max_age) is not None
+
+    def invalidate(self, view_name: Optional[str] = None) -> None:
+        """Invalide le cache (une VIEW ou l'ensemble)"""
+        with self._lock:
+            if view_name is None:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if e.view_name == view_name]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques d'utilisation du cache"""
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'local_hits': self.local_hits,
+            'misses': self.misses
+        }
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _purge_expired(self) -> None:
+        """Suppression des entrées expirées (verrou détenu par l'appelant)"""
+        for key in [k for k, e in self._entries.items() if e.expired]:
+            del self._entries[key]
+
+    def _find_covering_entry(self, view_name: str, filters: Dict[str, Any],
+                             max_age: Optional[float] = None) -> Optional[CachedResult]:
+        """Cherche un résultat complet dont la plage de dates couvre la demande"""
+        other_filters = _non_date_filters(filters)
+        date_start = _to_timestamp(filters.get('date_start'))
+        date_end = _to_timestamp(filters.get('date_end'))
+
+        for entry in reversed(self._entries.values()):
+            if entry.view_name != view_name or not entry.complete or not entry.date_column:
+                continue
+            if not _is_fresh(entry, max_age):
+                continue
+            if _non_date_filters(entry.filters) != other_filters:
+                continue
+            if entry.covers(date_start, date_end):
+                return entry
+        return None
+
+    def _filter_locally(self, entry: CachedResult, filters: Dict[str, Any]) -> Optional['pd.DataFrame']:
+        """Applique la plage de dates au résultat en cache (mêmes bornes que le SQL)"""
+        if entry.date_column not in entry.dataframe.columns:
+            return None
+
+        from .result_schema import infer_result_schema
+
+        try:
+            if entry.schema is None:
+                entry.dataframe, entry.schema = infer_result_schema(entry.dataframe)
+            df = entry.dataframe
+
+            result = entry.schema.slice_time_range(
+                df,
+                _to_timestamp(filters.get('date_start')),
+                _to_timestamp(filters.get('date_end')),
+                column=entry.date_column
+            )
+            logger.info(f"⚡ Local filtering on {entry.view_name}: {len(result)}/{len(df)} rows")
+            return result
+        except Exception as e:
+            logger.warning(f"⚠️ Local filtering impossible for {entry.view_name}: {e}")
+            return None
+
+    def _make_key(self, view_name: str, filters: Dict[str, Any]) -> Tuple:
+        """Clé de cache stable à partir du nom de VIEW et des filtres"""
+        return (view_name, tuple(sorted((k, str(v)) for k, v in (filters or {}).items())))
+
+def _is_fresh(entry: CachedResult, max_age: Optional[float]) -> bool:
+    """Résultat plus récent que max_age secondes"""
+    if max_age is None:
+        return True
+    return (datetime.now() - entry.created_at).total_seconds() <= max_age
+
+def _non_date_filters(filters: Dict[str, Any]) -> Dict[str, str]:
+    """Filtres hors plage de dates (doivent être identiques pour réutiliser un résultat)"""
+    return {k: str(v) for k, v in filters.items() if k not in DATE_FILTER_KEYS and v is not None}
+
+def _to_timestamp(value) -> Optional['pd.Timestamp']:
+    """Conversion d'une borne de date (str, date, datetime) en Timestamp"""
+    if value is None or value == '':
+        return None
+    import pandas as pd
+    try:
+        return pd.Timestamp(value)
+    except (ValueError, TypeError):
+        return None
@@ -0,0 +1,179 @@
+"""
+Inférence du schéma des résultats d'analyse
+Rôle des colonnes (axe temporel, mesure, dimension) et index temporel trié
+"""
+
+import logging
+import warnings
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Nombre de valeurs testées pour reconnaître une colonne texte contenant des dates
+DATE_SAMPLE_SIZE = 20
+
+class ColumnRole(Enum):
+    """Rôle d'une colonne dans un résultat d'analyse"""
+    TIME = "time"
+    MEASURE = "measure"
+    DIMENSION = "dimension"
+
+@dataclass
+class ResultSchema:
+    """Schéma typé d'un résultat, calculé une seule fois à la réception des données"""
+    roles: Dict[str, ColumnRole]
+    time_axis: Optional[str] = None
+    signature: Tuple = ()
+    _time_indexes: Dict[str, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict, repr=False)
+
+    @property
+    def time_columns(self) -> List[str]:
+        return [col for col, role in self.roles.items() if role == ColumnRole.TIME]
+
+    @property
+    def measures(self) -> List[str]:
+        return [col for col, role in self.roles.items() if role == ColumnRole.MEASURE]
+
+    @property
+    def dimensions(self) -> List[str]:
+        return [col for col, role in self.roles.items() if role == ColumnRole.DIMENSION]
+
+    def time_index(self, df: pd.DataFrame, column: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Index temporel trié d'une colonne (construit au premier appel)
+
+        Returns:
+            Tuple (valeurs triées en int64 ns, positions des lignes correspondantes)
+        """
+        column = column or self.time_axis
+        if column not in self._time_indexes:
+            self._time_indexes[column] = _build_time_index(df[column])
+        return self._time_indexes[column]
+
+    def slice_time_range(self, df: pd.DataFrame, start=None, end=None,
+                         column: Optional[str] = None) -> pd.DataFrame:
+        """
+        Lignes dont la date est comprise entre start et end (bornes incluses)
+
+        Recherche dichotomique dans l'index trié : O(log n) + taille du résultat.
+        L'ordre d'origine des lignes est conservé.
+        """
+        sorted_values, positions = self.time_index(df, column)
+        lo = 0 if start is None else np.searchsorted(sorted_values, _to_ns(start), side='left')
+        hi = len(sorted_values) if end is None else np.searchsorted(sorted_values, _to_ns(end), side='right')
+        return df.iloc[np.sort(positions[lo:hi])]
+
+    def slice_date_range(self, df: pd.DataFrame, start_date=None, end_date=None,
+                         column: Optional[str] = None) -> pd.DataFrame:
+        """Comme slice_time_range, avec des jours complets (le jour de fin est inclus)"""
+        end = None
+        if end_date is not None:
+            end = pd.Timestamp(end_date).normalize() + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+        start = pd.Timestamp(start_date).normalize() if start_date is not None else None
+        return self.slice_time_range(df, start, end, column)
+
+    def conform(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Applique le typage du schéma à un bloc de lignes reçu après coup
+
+        Les colonnes temporelles reconnues sur le premier bloc sont converties
+        de la même façon ; les index temporels existants sont invalidés.
+        """
+        result = chunk.copy()
+        for col in self.time_columns:
+            if col in result.columns and not pd.api.types.is_datetime64_any_dtype(result[col]):
+                result[col] = pd.to_datetime(result[col], errors='coerce')
+        self._time_indexes.clear()
+        return result
+
+def infer_result_schema(df: pd.DataFrame) -> Tuple[pd.DataFrame, ResultSchema]:
+    """
+    Détermine le rôle des colonnes et convertit les colonnes temporelles en datetime64
+
+    Args:
+        df: Résultat brut de la requête
+
+    Returns:
+        Tuple (copie du DataFrame avec colonnes temporelles typées, schéma)
+    """
+    result = df.copy()
+    roles: Dict[str, ColumnRole] = {}
+
+    for col in result.columns:
+        series = result[col]
+
+        if pd.api.types.is_datetime64_any_dtype(series):
+            roles[col] = ColumnRole.TIME
+        elif pd.api.types.is_bool_dtype(series):
+            roles[col] = ColumnRole.DIMENSION
+        elif pd.api.types.is_numeric_dtype(series):
+            roles[col] = ColumnRole.DIMENSION if _is_identifier(col) else ColumnRole.MEASURE
+        elif (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)) \
+                and _looks_like_dates(series):
+            result[col] = pd.to_datetime(series, errors='coerce')
+            roles[col] = ColumnRole.TIME
+        else:
+            roles[col] = ColumnRole.DIMENSION
+
+    time_columns = [col for col, role in roles.items() if role == ColumnRole.TIME]
+    schema = ResultSchema(
+        roles=roles,
+        time_axis=time_columns[0] if time_columns else None,
+        signature=tuple((str(col), str(dtype)) for col, dtype in result.dtypes.items())
+    )
+
+    # Index de l'axe temporel construit dès la réception des données
+    if schema.time_axis:
+        schema.time_index(result)
+
+    logger.info(f"🧬 Result schema: time={schema.time_axis}, "
+                f"{len(schema.measures)} measures, {len(schema.dimensions)} dimensions")
+    return result, schema
+
+def _looks_like_dates(series: pd.Series) -> bool:
+    """Teste un échantillon de valeurs non nulles d'une colonne texte"""
+    sample = series.dropna().head(DATE_SAMPLE_SIZE)
+    if sample.empty:
+        return False
+
+    # Les nombres sous forme de texte ne sont pas des dates
+    if all(isinstance(v, (int, float, np.number)) for v in sample):
+        return False
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)  # Format non déductible : analyse valeur par valeur
+            parsed = pd.to_datetime(sample, errors='coerce')
+    except (TypeError, ValueError):
+        return False
+    return bool(parsed.notna().all())
+
+def _is_identifier(column_name: str) -> bool:
+    """Colonnes numériques d'identifiants (ne sont pas des mesures)"""
+    name = str(column_name).lower()
+    return name == 'id' or name.startswith('id_') or name.endswith('_id')
+
+def _build_time_index(series: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Trie les valeurs non nulles d'une colonne temporelle"""
+    values = pd.to_datetime(series, errors='coerce')
+    if getattr(values.dt, 'tz', None) is not None:
+        values = values.dt.tz_convert(None)
+
+    mask = values.notna().to_numpy()
+    positions = np.flatnonzero(mask)
+    raw = values.to_numpy(dtype='datetime64[ns]')[mask].view('int64')
+
+    order = np.argsort(raw, kind='stable')
+    return raw[order], positions[order]
+
+def _to_ns(value) -> int:
+    """Conversion d'une borne en nanosecondes (même échelle que l'index)"""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(None)
+    return ts.value
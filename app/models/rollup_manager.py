@@ -0,0 +1,106 @@
+"""
+Cumuls journaliers des KPI temporels
+Table d'agrégats par jour, maintenue par incréments, regroupée par semaine, mois, trimestre ou année
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+from app.models.database_manager import DatabaseManager
+from .view_builder import ViewBuilder, ViewDefinition, ViewStorage
+from .view_metadata_store import ViewMetadataStore, view_definition
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class RollupRefreshResult:
+    """Mise à jour de la table de cumul d'une VIEW"""
+    view_name: str
+    since: Optional[date]           # Premier jour recalculé (None : reconstruction complète)
+    days: int                       # Jours écrits
+    duration: float
+
+    @property
+    def full(self) -> bool:
+        return self.since is None
+
+class RollupManager:
+    """
+    Maintenance des tables de cumul (mode de stockage ROLLUP)
+
+    Une VIEW en mode cumul lit une table rollup_<vue> d'une ligne par jour
+    (sommes, comptages, minima, maxima) : les semaines, mois, trimestres et
+    années sont recombinés depuis ces quelques lignes, quel que soit le
+    volume de la table source. La mise à jour ne recalcule que les jours
+    postérieurs au dernier jour cumulé, moins une fenêtre de recouvrement
+    pour les saisies tardives.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, view_builder: Optional[ViewBuilder] = None,
+                 metadata: Optional[ViewMetadataStore] = None, lookback_days: int = 3):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            view_builder: Constructeur des requêtes de cumul
+            metadata: Métadonnées des VIEWs (définitions, date de rafraîchissement)
+            lookback_days: Jours déjà cumulés recalculés à chaque mise à jour
+        """
+        self.db_manager = db_manager
+        self.view_builder = view_builder or ViewBuilder()
+        self.metadata = metadata or ViewMetadataStore(db_manager)
+        self.lookback_days = lookback_days
+
+    def refresh(self, view_def: ViewDefinition, view_name: str, full: bool = False) -> RollupRefreshResult:
+        """
+        Met à jour la table de cumul d'une VIEW (une transaction)
+
+        Args:
+            view_def: Définition de la VIEW
+            view_name: Nom complet de la VIEW
+            full: Recalcule tous les jours
+
+        Returns:
+            Premier jour recalculé, jours écrits et durée
+        """
+        table_name = self.view_builder.rollup_table_name(view_name)
+        started = time.perf_counter()
+        with self.db_manager.transaction() as conn:
+            # Mises à jour concurrentes sérialisées ; les lectures ne sont pas bloquées
+            conn.exec_driver_sql(f"LOCK TABLE {table_name} IN SHARE ROW EXCLUSIVE MODE")
+            since = None
+            if not full:
+                last_day = conn.exec_driver_sql(f"SELECT max(day) FROM {table_name}").scalar()
+                if last_day is not None:
+                    since = last_day - timedelta(days=self.lookback_days)
+
+            # Jours recalculés entièrement : une ligne source supprimée disparaît du cumul
+            if since is None:
+                conn.exec_driver_sql(f"DELETE FROM {table_name}")
+            else:
+                conn.exec_driver_sql(f"DELETE FROM {table_name} WHERE day >= DATE '{since.isoformat()}'")
+            result = conn.exec_driver_sql(
+                f"INSERT INTO {table_name}\n{self.view_builder.build_rollup_daily_query(view_def, since)}"
+            )
+            days = max(result.rowcount, 0)
+
+        self.metadata.record_refresh(view_name)
+        outcome = RollupRefreshResult(view_name, since, days, time.perf_counter() - started)
+        logger.info(f"✅ Rollup {table_name} updated from {since or 'the first day'}: "
+                    f"{days} days in {outcome.duration:.2f}s")
+        return outcome
+
+    def refresh_all(self) -> List[RollupRefreshResult]:
+        """Met à jour les tables de cumul de toutes les VIEWs en mode cumul"""
+        rows = self.metadata.list_views() or []
+        results = []
+        for row in rows:
+            if row['storage'] != ViewStorage.ROLLUP.value:
+                continue
+            try:
+                results.append(self.refresh(view_definition(row['definition']), row['view_name']))
+            except Exception as e:
+                logger.error(f"❌ Rollup update failed for {row['view_name']}: {e}")
+        return results
@@ -0,0 +1,167 @@
+"""
+Nombre de lignes des VIEWs KPI sans COUNT(*) systématique
+Comptages connus, statistiques du catalogue ou estimation du planificateur
+"""
+
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from app.models.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+# Estimation des VIEWs matérialisées : statistiques tenues par ANALYZE / autovacuum
+RELTUPLES_SQL = """
+SELECT c.relname AS view_name, c.reltuples::bigint AS estimate
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND c.relkind = 'm'
+"""
+
+@dataclass
+class RowCount:
+    """Nombre de lignes d'une VIEW et sa provenance"""
+    count: Optional[int]
+    exact: bool
+    source: str                 # 'exact', 'statistics', 'planner' ou 'unknown'
+    measured_at: float = 0.0    # time.monotonic()
+
+class RowCountProvider:
+    """
+    Fournit le nombre de lignes des VIEWs à moindre coût
+
+    Ordre de préférence : comptage exact déjà connu, statistiques de pg_class
+    (VIEWs matérialisées, une requête pour toutes), estimation du
+    planificateur (EXPLAIN, sans exécuter la VIEW). Les comptages exacts
+    sont calculés à part, en arrière-plan, par count_exact().
+    """
+
+    def __init__(self, db_manager: DatabaseManager, ttl: float = 600.0):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            ttl: Durée de validité d'un comptage (secondes)
+        """
+        self.db_manager = db_manager
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._counts: Dict[str, RowCount] = {}
+
+    def get_counts(self, view_names: Iterable[str],
+                   materialized: Iterable[str] = ()) -> Dict[str, RowCount]:
+        """
+        Nombre de lignes de chaque VIEW, sans exécuter les VIEWs
+
+        Args:
+            view_names: VIEWs demandées
+            materialized: Celles qui sont matérialisées (statistiques du catalogue)
+
+        Returns:
+            RowCount par nom de VIEW
+        """
+        view_names = list(view_names)
+        materialized = {name.lower() for name in materialized}
+        now = time.monotonic()
+
+        result: Dict[str, RowCount] = {}
+        missing: List[str] = []
+        with self._lock:
+            for name in view_names:
+                cached = self._counts.get(name.lower())
+                if cached is not None and now - cached.measured_at <= self.ttl:
+                    result[name] = cached
+                else:
+                    missing.append(name)
+
+        if any(name.lower() in materialized for name in missing):
+            statistics = self._load_statistics()
+        else:
+            statistics = {}
+
+        for name in missing:
+            estimate = statistics.get(name.lower()) if name.lower() in materialized else None
+            # reltuples vaut -1 (PostgreSQL 14+) ou 0 tant qu'aucun ANALYZE n'a eu lieu
+            if estimate is not None and estimate > 0:
+                count = RowCount(int(estimate), False, 'statistics', now)
+            else:
+                count = self._planner_estimate(name, now)
+            result[name] = count
+            if count.count is not None:
+                self._remember(name, count)
+        return result
+
+    def count_exact(self, view_name: str) -> int:
+        """
+        Comptage exact (exécute la VIEW : réservé au travail d'arrière-plan)
+
+        Returns:
+            Nombre de lignes, également conservé pour les listages suivants
+        """
+        started = time.perf_counter()
+        rows = self.db_manager.execute_query(f"SELECT COUNT(*) AS row_count FROM {view_name}",
+                                             fetch_results=True)
+        count = int(rows[0]['row_count']) if rows else 0
+        self.record_exact(view_name, count)
+        logger.info(f"Comptage exact de {view_name}: {count} lignes "
+                    f"({time.perf_counter() - started:.2f}s)")
+        return count
+
+    def record_exact(self, view_name: str, count: int):
+        """Enregistre un nombre de lignes exact connu par ailleurs (résultat complet lu)"""
+        self._remember(view_name, RowCount(count, True, 'exact', time.monotonic()))
+
+    def cached(self, view_name: str) -> Optional[RowCount]:
+        """Comptage encore valide pour la VIEW (aucune requête)"""
+        with self._lock:
+            cached = self._counts.get(view_name.lower())
+        if cached is None or time.monotonic() - cached.measured_at > self.ttl:
+            return None
+        return cached
+
+    def needs_exact(self, view_name: str) -> bool:
+        """Aucun comptage exact valide pour la VIEW"""
+        with self._lock:
+            cached = self._counts.get(view_name.lower())
+        return cached is None or not cached.exact or time.monotonic() - cached.measured_at > self.ttl
+
+    def invalidate(self, view_name: Optional[str] = None):
+        """Oublie le comptage d'une VIEW (données modifiées) ou de toutes"""
+        with self._lock:
+            if view_name is None:
+                self._counts.clear()
+            else:
+                self._counts.pop(view_name.lower(), None)
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _remember(self, view_name: str, count: RowCount):
+        with self._lock:
+            self._counts[view_name.lower()] = count
+
+    def _load_statistics(self) -> Dict[str, float]:
+        """Estimations de pg_class pour toutes les VIEWs matérialisées du schéma"""
+        try:
+            rows = self.db_manager.execute_query(
+                RELTUPLES_SQL, (self.db_manager.config.get_schema(),), fetch_results=True
+            )
+            return {row['view_name'].lower(): row['estimate'] for row in rows}
+        except Exception as e:
+            logger.warning(f"Statistiques du catalogue indisponibles: {e}")
+            return {}
+
+    def _planner_estimate(self, view_name: str, now: float) -> RowCount:
+        """Nombre de lignes prévu par le planificateur (la VIEW n'est pas exécutée)"""
+        try:
+            rows = self.db_manager.execute_query(f"EXPLAIN (FORMAT JSON) SELECT * FROM {view_name}",
+                                                 fetch_results=True)
+            plan = rows[0]['QUERY PLAN'] if rows else None
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return RowCount(int(plan[0]['Plan']['Plan Rows']), False, 'planner', now)
+        except Exception as e:
+            logger.warning(f"Estimation impossible pour {view_name}: {e}")
+            return RowCount(None, False, 'unknown', now)
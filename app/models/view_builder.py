@@ -5,7 +5,7 @@ Migré depuis views_construct.py pour une meilleure architecture
 
 import logging
 from typing import Dict, List, Optional, Tuple, Any
-from datetime import datetime
+from datetime import date, datetime
 from dataclasses import dataclass
 from enum import Enum
 
@@ -18,6 +18,29 @@ class ModuleType(Enum):
     COMPARISON = "comparison"
     PERFORMANCE = "performance"
 
+class ViewStorage(Enum):
+    """Mode de stockage d'une vue"""
+    VIEW = "view"                                   # Vue simple, recalculée à chaque lecture
+    MATERIALIZED = "materialized"                   # Vue matérialisée, REFRESH bloquant
+    MATERIALIZED_INDEXED = "materialized_indexed"   # Vue matérialisée + index unique (REFRESH CONCURRENTLY)
+    ROLLUP = "rollup"                               # Table d'agrégats journaliers + vue de regroupement
+
+# Regroupements temporels : colonne X tronquée et renommée <x>_grouped
+DATE_GROUPINGS = {
+    'daily': 'day', 'weekly': 'week', 'monthly': 'month',
+    'quarterly': 'quarter', 'yearly': 'year'
+}
+
+# Agrégats journaliers stockés par agrégation : toutes se recombinent par période
+# (AVG recalculée comme somme des sommes / somme des comptages)
+ROLLUP_COMPONENTS = {
+    'SUM': ('sum',), 'COUNT': ('count',), 'AVG': ('sum', 'count'),
+    'MIN': ('min',), 'MAX': ('max',)
+}
+
+# Table de cumul d'une VIEW : rollup_<nom de la VIEW> (hors préfixes des VIEWs KPI)
+ROLLUP_TABLE_PREFIX = "rollup_"
+
 @dataclass
 class ViewDefinition:
     """Définition d'une vue SQL"""
@@ -32,6 +55,17 @@ class ViewDefinition:
     join_condition: Optional[str] = None
     sql: Optional[str] = None
     module_type: ModuleType = ModuleType.AGGREGATION
+    storage: ViewStorage = ViewStorage.VIEW
+    description: str = ''
+    
+    @property
+    def module(self) -> ModuleType:
+        """Alias de module_type (nommage des VIEWs KPI)"""
+        return self.module_type
+    
+    @property
+    def is_materialized(self) -> bool:
+        return self.storage in (ViewStorage.MATERIALIZED, ViewStorage.MATERIALIZED_INDEXED)
 
 class ViewBuilder:
     """
@@ -39,12 +73,25 @@ class ViewBuilder:
     Sépare la logique de construction SQL de l'interface utilisateur
     """
     
-    def __init__(self):
-        """Initialise le constructeur de vues"""
-        self.tables_metadata = self._load_tables_metadata()
+    def __init__(self, db_manager=None):
+        """
+        Initialise le constructeur de vues
+        
+        Args:
+            db_manager: Gestionnaire de base de données ; les tables et leurs champs sont
+                alors lus dans le catalogue à la demande (tables intégrées sans base ou en repli)
+        """
+        if db_manager is not None:
+            from .catalog_metadata import LazyTablesMetadata, get_catalog_service
+            self.tables_metadata = LazyTablesMetadata(get_catalog_service(db_manager),
+                                                      fallback=self._load_tables_metadata())
+        else:
+            self.tables_metadata = self._load_tables_metadata()
+        # Préfixe des VIEWs KPI de chaque module (kpi_temporal_..., kpi_aggregation_...)
+        self.prefixes = {module: f"kpi_{module.value}_" for module in ModuleType}
     
     def _load_tables_metadata(self) -> Dict:
-        """Charge les métadonnées des tables GMAO"""
+        """Métadonnées intégrées des tables GMAO principales (sans base de données)"""
         return {
             "maintenance": {
                 "display_name": "🔧 Maintenance",
@@ -132,94 +179,28 @@ class ViewBuilder:
             if agg and agg not in valid_aggregations:
                 errors.append(f"Agrégation invalide pour {field}: {agg}")
         
+        # L'index unique porte sur la clé de groupement
+        if view_def.storage == ViewStorage.MATERIALIZED_INDEXED and view_def.grouping == 'none':
+            errors.append("Un groupement est requis pour indexer la vue matérialisée")
+        
+        # Le cumul est journalier et ne stocke que des agrégats recombinables
+        if view_def.storage == ViewStorage.ROLLUP:
+            if view_def.grouping not in DATE_GROUPINGS:
+                errors.append("Un groupement temporel est requis pour le cumul journalier")
+            if any(agg not in ROLLUP_COMPONENTS for _, agg in self.measures(view_def)):
+                errors.append("Le cumul journalier requiert une agrégation pour chaque champ Y")
+        
         return len(errors) == 0, errors
     
     def build_sql_query(self, view_def: ViewDefinition) -> str:
-        """Construit la requête SQL pour une vue"""
+        """Construit la requête SQL pour une vue (création selon le mode de stockage)"""
         try:
             # Validation préalable
             is_valid, errors = self.validate_view_definition(view_def)
             if not is_valid:
                 raise ValueError(f"Définition invalide: {', '.join(errors)}")
             
-            # Construction de la requête
-            select_parts = []
-            
-            # Champ X (groupement)
-            x_field = view_def.x_field
-            if view_def.grouping == 'monthly':
-                select_parts.append(f"DATE_TRUNC('month', {x_field}) as {x_field}_grouped")
-            elif view_def.grouping == 'weekly':
-                select_parts.append(f"DATE_TRUNC('week', {x_field}) as {x_field}_grouped")
-            elif view_def.grouping == 'daily':
-                select_parts.append(f"DATE_TRUNC('day', {x_field}) as {x_field}_grouped")
-            else:
-                select_parts.append(f"{x_field}")
-            
-            # Champs Y avec agrégations
-            for i, y_field in enumerate(view_def.y_fields, 1):
-                if y_field:  # Ignorer les champs vides
-                    agg_func = view_def.aggregations.get(f'y{i}', 'SUM')
-                    if agg_func and agg_func != 'NONE':
-                        select_parts.append(f"{agg_func}({y_field}) as {y_field}_{agg_func.lower()}")
-                    else:
-                        select_parts.append(f"{y_field}")
-            
-            # Construction de la clause FROM
-            from_clause = view_def.main_table
-            
-            # Jointure si table secondaire
-            if view_def.secondary_table and view_def.join_condition:
-                from_clause += f" JOIN {view_def.secondary_table} ON {view_def.join_condition}"
-            
-            # Construction de la clause WHERE (filtres)
-            where_conditions = []
-            for filter_name, filter_value in view_def.filters.items():
-                if filter_value:
-                    if filter_name == 'date_start':
-                        where_conditions.append(f"{x_field} >= '{filter_value}'")
-                    elif filter_name == 'date_end':
-                        where_conditions.append(f"{x_field} <= '{filter_value}'")
-                    elif filter_name == 'min_value':
-                        where_conditions.append(f"{view_def.y_fields[0]} >= {filter_value}")
-                    elif filter_name == 'max_value':
-                        where_conditions.append(f"{view_def.y_fields[0]} <= {filter_value}")
-                    elif filter_name == 'contains_text':
-                        where_conditions.append(f"{x_field} ILIKE '%{filter_value}%'")
-            
-            # Construction de la clause GROUP BY
-            group_by_clause = ""
-            if view_def.grouping != 'none':
-                if view_def.grouping in ['monthly', 'weekly', 'daily']:
-                    group_by_clause = f"GROUP BY {x_field}_grouped"
-                else:
-                    group_by_clause = f"GROUP BY {x_field}"
-            
-            # Construction de la clause ORDER BY
-            order_by_clause = ""
-            if view_def.grouping != 'none':
-                if view_def.grouping in ['monthly', 'weekly', 'daily']:
-                    order_by_clause = f"ORDER BY {x_field}_grouped"
-                else:
-                    order_by_clause = f"ORDER BY {x_field}"
-            
-            # Assemblage final
-            sql_parts = [
-                f"CREATE VIEW {view_def.name} AS",
-                f"SELECT {', '.join(select_parts)}",
-                f"FROM {from_clause}"
-            ]
-            
-            if where_conditions:
-                sql_parts.append(f"WHERE {' AND '.join(where_conditions)}")
-            
-            if group_by_clause:
-                sql_parts.append(group_by_clause)
-            
-            if order_by_clause:
-                sql_parts.append(order_by_clause)
-            
-            sql_query = "\n".join(sql_parts) + ";"
+            sql_query = self._build_create_sql(view_def, view_def.name)
             
             # Mettre à jour la définition avec le SQL généré
             view_def.sql = sql_query
@@ -230,6 +211,184 @@ class ViewBuilder:
             logger.error(f"Erreur construction SQL: {e}")
             raise
     
+    def generate_view_sql(self, view_def: ViewDefinition, view_name: Optional[str] = None,
+                          storage: Optional[ViewStorage] = None) -> str:
+        """
+        SQL de création d'une VIEW KPI (nom préfixé par module)
+        
+        Args:
+            view_def: Définition de la vue
+            view_name: Nom de la VIEW créée (nom KPI de la définition par défaut)
+            storage: Mode de stockage (celui de la définition par défaut)
+        
+        Returns:
+            Instructions de création (vue, puis index unique si demandé)
+        """
+        view_name = view_name or self._build_view_name(view_def.name, view_def.module)
+        return self._build_create_sql(view_def, view_name, storage or view_def.storage)
+    
+    def build_select_query(self, view_def: ViewDefinition) -> str:
+        """Requête SELECT d'une vue (sans instruction de création)"""
+        x_field = view_def.x_field
+        select_parts = []
+        
+        # Champ X (groupement)
+        if view_def.grouping in DATE_GROUPINGS:
+            select_parts.append(f"DATE_TRUNC('{DATE_GROUPINGS[view_def.grouping]}', {x_field}) as {x_field}_grouped")
+        else:
+            select_parts.append(f"{x_field}")
+        
+        # Champs Y avec agrégations
+        for i, y_field in enumerate(view_def.y_fields, 1):
+            if y_field:  # Ignorer les champs vides
+                agg_func = view_def.aggregations.get(f'y{i}', 'SUM')
+                if agg_func and agg_func != 'NONE':
+                    select_parts.append(f"{agg_func}({y_field}) as {y_field}_{agg_func.lower()}")
+                else:
+                    select_parts.append(f"{y_field}")
+        
+        from_clause = self.from_clause(view_def)
+        where_conditions = self.where_conditions(view_def)
+        
+        # Clauses GROUP BY et ORDER BY sur la clé de groupement
+        group_key = ", ".join(self.grouping_key_columns(view_def))
+        
+        sql_parts = [
+            f"SELECT {', '.join(select_parts)}",
+            f"FROM {from_clause}"
+        ]
+        
+        if where_conditions:
+            sql_parts.append(f"WHERE {' AND '.join(where_conditions)}")
+        
+        if group_key:
+            sql_parts.append(f"GROUP BY {group_key}")
+            sql_parts.append(f"ORDER BY {group_key}")
+        
+        return "\n".join(sql_parts)
+    
+    def from_clause(self, view_def: ViewDefinition) -> str:
+        """Clause FROM : table principale, jointure si table secondaire"""
+        from_clause = view_def.main_table
+        if view_def.secondary_table and view_def.join_condition:
+            from_clause += f" JOIN {view_def.secondary_table} ON {view_def.join_condition}"
+        return from_clause
+    
+    def where_conditions(self, view_def: ViewDefinition) -> List[str]:
+        """Conditions WHERE issues des filtres de la vue (appliquées aux lignes sources)"""
+        x_field = view_def.x_field
+        where_conditions = []
+        for filter_name, filter_value in view_def.filters.items():
+            if filter_value:
+                if filter_name == 'date_start':
+                    where_conditions.append(f"{x_field} >= '{filter_value}'")
+                elif filter_name == 'date_end':
+                    where_conditions.append(f"{x_field} <= '{filter_value}'")
+                elif filter_name == 'min_value':
+                    where_conditions.append(f"{view_def.y_fields[0]} >= {filter_value}")
+                elif filter_name == 'max_value':
+                    where_conditions.append(f"{view_def.y_fields[0]} <= {filter_value}")
+                elif filter_name == 'contains_text':
+                    where_conditions.append(f"{x_field} ILIKE '%{filter_value}%'")
+        return where_conditions
+    
+    def measures(self, view_def: ViewDefinition) -> List[Tuple[str, str]]:
+        """Champs Y renseignés et leur agrégation ('NONE' si non agrégé)"""
+        return [(y_field, view_def.aggregations.get(f'y{i}', 'SUM') or 'NONE')
+                for i, y_field in enumerate(view_def.y_fields, 1) if y_field]
+    
+    def rollup_table_name(self, view_name: str) -> str:
+        """Table des agrégats journaliers d'une VIEW en mode cumul"""
+        return f"{ROLLUP_TABLE_PREFIX}{view_name.split('.')[-1]}"
+    
+    def build_rollup_daily_query(self, view_def: ViewDefinition, since: Optional[date] = None) -> str:
+        """
+        Agrégats journaliers des lignes sources (remplissage de la table de cumul)
+        
+        Args:
+            view_def: Définition de la vue
+            since: Premier jour recalculé (tous les jours si None)
+        """
+        x_field = view_def.x_field
+        columns = [f"DATE_TRUNC('day', {x_field})::date AS day"]
+        seen = set()
+        for y_field, agg in self.measures(view_def):
+            for component in ROLLUP_COMPONENTS[agg]:
+                column = f"{y_field}_{component}"
+                if column not in seen:
+                    seen.add(column)
+                    columns.append(f"{component.upper()}({y_field}) AS {column}")
+        
+        # Jour NULL exclu : il est la clé primaire de la table de cumul
+        conditions = self.where_conditions(view_def) + [f"{x_field} IS NOT NULL"]
+        if since is not None:
+            conditions.append(f"{x_field} >= DATE '{since.isoformat()}'")
+        
+        return "\n".join([
+            f"SELECT {', '.join(columns)}",
+            f"FROM {self.from_clause(view_def)}",
+            f"WHERE {' AND '.join(conditions)}",
+            "GROUP BY 1"
+        ])
+    
+    def build_rollup_view_query(self, view_def: ViewDefinition, view_name: str) -> str:
+        """Regroupement par période de la table de cumul (colonnes identiques à build_select_query)"""
+        x_field = view_def.x_field
+        select_parts = [f"DATE_TRUNC('{DATE_GROUPINGS[view_def.grouping]}', day) as {x_field}_grouped"]
+        for y_field, agg in self.measures(view_def):
+            alias = f"{y_field}_{agg.lower()}"
+            if agg == 'AVG':
+                select_parts.append(f"SUM({y_field}_sum)::numeric / NULLIF(SUM({y_field}_count), 0) as {alias}")
+            elif agg == 'COUNT':
+                select_parts.append(f"SUM({y_field}_count) as {alias}")
+            else:
+                component = ROLLUP_COMPONENTS[agg][0]
+                select_parts.append(f"{agg}({y_field}_{component}) as {alias}")
+        
+        return "\n".join([
+            f"SELECT {', '.join(select_parts)}",
+            f"FROM {self.rollup_table_name(view_name)}",
+            f"GROUP BY {x_field}_grouped",
+            f"ORDER BY {x_field}_grouped"
+        ])
+    
+    def grouping_key_columns(self, view_def: ViewDefinition) -> List[str]:
+        """Colonnes de la vue formant la clé de groupement (vide sans groupement)"""
+        if view_def.grouping == 'none':
+            return []
+        if view_def.grouping in DATE_GROUPINGS:
+            return [f"{view_def.x_field}_grouped"]
+        return [view_def.x_field]
+    
+    def _build_create_sql(self, view_def: ViewDefinition, view_name: str,
+                          storage: Optional[ViewStorage] = None) -> str:
+        """Instructions CREATE du mode de stockage (index unique ou table de cumul selon le mode)"""
+        storage = storage or view_def.storage
+        
+        if storage == ViewStorage.ROLLUP:
+            table_name = self.rollup_table_name(view_name)
+            return "\n".join([
+                f"CREATE TABLE {table_name} AS\n{self.build_rollup_daily_query(view_def)};",
+                f"ALTER TABLE {table_name} ADD PRIMARY KEY (day);",
+                f"CREATE VIEW {view_name} AS\n{self.build_rollup_view_query(view_def, view_name)};"
+            ])
+        
+        select_sql = self.build_select_query(view_def)
+        if storage == ViewStorage.VIEW:
+            return f"CREATE VIEW {view_name} AS\n{select_sql};"
+        
+        statements = [f"CREATE MATERIALIZED VIEW {view_name} AS\n{select_sql}\nWITH DATA;"]
+        if storage == ViewStorage.MATERIALIZED_INDEXED:
+            key_columns = ", ".join(self.grouping_key_columns(view_def))
+            statements.append(f"CREATE UNIQUE INDEX {view_name}_key_uidx ON {view_name} ({key_columns});")
+        return "\n".join(statements)
+    
+    def _build_view_name(self, name: str, module: ModuleType) -> str:
+        """Nom complet d'une VIEW KPI : préfixe du module suivi du nom court"""
+        name = name.strip().lower()
+        prefix = self.prefixes[module]
+        return name if name.startswith(prefix) else f"{prefix}{name}"
+    
     def get_view_info(self, view_def: ViewDefinition) -> Dict[str, Any]:
         """Génère les informations détaillées d'une vue"""
         try:
@@ -251,6 +410,8 @@ class ViewBuilder:
                 'monthly': 'Par mois',
                 'weekly': 'Par semaine', 
                 'daily': 'Par jour',
+                'quarterly': 'Par trimestre',
+                'yearly': 'Par année',
                 'none': 'Aucun groupement'
             }.get(view_def.grouping, view_def.grouping)
             
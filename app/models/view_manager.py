@@ -3,18 +3,66 @@ Gestionnaire CRUD pour les VIEWs KPI
 Opérations de création, lecture, mise à jour et suppression des VIEWs
 """
 
+import copy
 import logging
-from typing import Dict, List, Optional, Tuple, Any
+import time
+from typing import Callable, Dict, List, Optional, Tuple, Any
 from datetime import datetime
 import json
 from dataclasses import asdict
 
 from app.models.database_manager import DatabaseManager
-from .view_builder import ViewDefinition, ViewBuilder, ModuleType
+from .view_builder import ViewDefinition, ViewBuilder, ModuleType, ViewStorage
+from .view_registry import ViewRegistry
+from .row_count_provider import RowCount, RowCountProvider
+from .query_plan import PlanValidation, QueryPlan, assess_plan
+from .view_metadata_store import ViewMetadataStore, view_definition
+from .rollup_manager import RollupManager
 from app.utils.view_exceptions import *
 
 logger = logging.getLogger(__name__)
 
+# Index unique simple (sans prédicat ni expression) : requis par REFRESH ... CONCURRENTLY
+UNIQUE_INDEX_SQL = """
+SELECT EXISTS (
+    SELECT 1 FROM pg_index i
+    JOIN pg_class c ON c.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname = %s AND c.relname = %s
+      AND i.indisunique AND i.indpred IS NULL AND i.indexprs IS NULL
+) AS has_unique_index
+"""
+
+# Colonnes d'une VIEW : type (avec et sans modificateur), nullabilité, défaut,
+# longueur / précision / échelle (décodées de atttypmod) et commentaire
+VIEW_COLUMNS_SQL = """
+SELECT
+    a.attname AS column_name,
+    format_type(a.atttypid, NULL) AS data_type,
+    format_type(a.atttypid, a.atttypmod) AS full_type,
+    NOT a.attnotnull AS is_nullable,
+    pg_get_expr(ad.adbin, ad.adrelid) AS column_default,
+    CASE WHEN a.atttypid IN ('bpchar'::regtype, 'varchar'::regtype) AND a.atttypmod > 0
+         THEN a.atttypmod - 4 END AS character_maximum_length,
+    CASE WHEN a.atttypid = 'numeric'::regtype AND a.atttypmod > 0
+         THEN ((a.atttypmod - 4) >> 16) & 65535 END AS numeric_precision,
+    CASE WHEN a.atttypid = 'numeric'::regtype AND a.atttypmod > 0
+         THEN (a.atttypmod - 4) & 65535 END AS numeric_scale,
+    col_description(c.oid, a.attnum) AS comment
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+LEFT JOIN pg_attrdef ad ON ad.adrelid = c.oid AND ad.adnum = a.attnum
+WHERE n.nspname = %s AND c.relname = %s
+ORDER BY a.attnum
+"""
+
+def _catalog_int(value: Any) -> Optional[int]:
+    """Entier du catalogue ; NULL (ou NaN après un passage par DataFrame) -> None"""
+    if value is None or value != value:
+        return None
+    return int(value)
+
 class ViewManager:
     """
     Gestionnaire CRUD pour les VIEWs KPI
@@ -23,9 +71,17 @@ class ViewManager:
     
     def __init__(self, db_manager: DatabaseManager):
         self.db_manager = db_manager
-        self.view_builder = ViewBuilder()
-        self._cache = {}  # Cache des métadonnées des VIEWs
-        self._last_refresh = None
+        self.view_builder = ViewBuilder(db_manager)
+        # Index des noms de VIEWs (rempli une fois, tenu à jour, rechargé après TTL)
+        self.registry = ViewRegistry(db_manager, self.view_builder.prefixes)
+        # Nombre de lignes estimé ou connu (pas de COUNT(*) au listage)
+        self.row_counts = RowCountProvider(db_manager)
+        # Métadonnées persistantes (table kpi_view_metadata)
+        self.metadata = ViewMetadataStore(db_manager)
+        # Tables de cumul journalier des VIEWs en mode ROLLUP
+        self.rollups = RollupManager(db_manager, self.view_builder, self.metadata)
+        # Schémas des VIEWs (invalidés à la recréation ou à la suppression)
+        self._schema_cache: Dict[str, Dict[str, Any]] = {}
     
     def create_view(self, view_def: ViewDefinition, force_recreate: bool = False) -> bool:
         """
@@ -51,26 +107,36 @@ class ViewManager:
             view_name = self.view_builder._build_view_name(view_def.name, view_def.module)
             
             # Vérification de l'existence
-            if self._view_exists(view_name) and not force_recreate:
+            exists = self._view_exists(view_name)
+            if exists and not force_recreate:
                 raise ViewAlreadyExistsError(f"La VIEW {view_name} existe déjà")
             
-            # Génération du SQL
-            sql = self.view_builder.generate_view_sql(view_def)
+            # Génération du SQL (vue, vue matérialisée, index unique selon le mode)
+            sql = self.view_builder.generate_view_sql(view_def, view_name)
             
-            # Test de validation du SQL (DRY RUN)
-            if not self._validate_sql_syntax(sql, view_def):
-                raise ViewCreationError(f"SQL invalide pour la VIEW {view_name}")
+            # Validation par le planificateur (transaction annulée, aucune DDL)
+            validation = self.validate_query_plan(view_def)
+            if not validation.valid:
+                raise ViewCreationError(f"SQL invalide pour la VIEW {view_name}: {validation.error}")
+            for warning in validation.warnings:
+                logger.warning(f"VIEW {view_name}: {warning}")
             
-            # Exécution de la création
-            self.db_manager.execute_query(sql, fetch_results=False)
+            # Recréation : suppression de l'ancienne VIEW (de son type) dans la même transaction
+            if exists:
+                sql = f"{self._drop_view_sql(view_name)}\n{sql}"
             
-            # Sauvegarde des métadonnées
-            self._save_view_metadata(view_def)
+            # Création et métadonnées dans une même transaction
+            self.metadata.ensure_table()
+            with self.db_manager.transaction() as conn:
+                conn.exec_driver_sql(sql)
+                self._save_view_metadata(conn, view_def, view_name)
             
-            # Invalidation du cache
-            self._invalidate_cache()
+            # Mise à jour du registre
+            self.registry.add(view_name, materialized=view_def.is_materialized)
+            self.row_counts.invalidate(view_name)
+            self.invalidate_schema(view_name)
             
-            logger.info(f"VIEW {view_name} créée avec succès")
+            logger.info(f"VIEW {view_name} créée avec succès ({view_def.storage.value})")
             return True
             
         except Exception as e:
@@ -79,6 +145,90 @@ class ViewManager:
                 raise
             raise ViewCreationError(f"Erreur de création: {e}")
     
+    def create_views_bulk(self, view_defs: List[ViewDefinition], force_recreate: bool = True,
+                          progress_callback: Optional[Callable[[int, int, str], None]] = None,
+                          is_cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, List[str]]:
+        """
+        Crée plusieurs VIEWs en une seule transaction
+        
+        Toutes les définitions sont validées avant la première DDL, l'existence
+        est vérifiée sur un seul instantané du catalogue et chaque VIEW est
+        créée sous son propre point de sauvegarde : l'échec d'une VIEW
+        n'annule pas les autres.
+        
+        Args:
+            view_defs: Définitions des VIEWs
+            force_recreate: Recrée les VIEWs existantes (ignorées sinon)
+            progress_callback: Appelé après chaque VIEW (traitées, total, nom)
+            is_cancelled: Interrogé avant chaque VIEW ; l'annulation annule toute la transaction
+            
+        Returns:
+            Dict: noms des VIEWs créées ('success') et messages d'erreur ('errors')
+            
+        Raises:
+            ViewCreationCancelled: Si la création a été annulée (aucune VIEW créée)
+        """
+        results: Dict[str, List[str]] = {'success': [], 'errors': []}
+        
+        # Validation de toutes les définitions avant toute DDL
+        planned: List[Tuple[ViewDefinition, str]] = []
+        seen = set()
+        for view_def in view_defs:
+            is_valid, errors = self.view_builder.validate_view_definition(view_def)
+            view_name = self.view_builder._build_view_name(view_def.name, view_def.module)
+            if not is_valid:
+                results['errors'].append(f"{view_name}: définition invalide: {', '.join(errors)}")
+            elif view_name in seen:
+                results['errors'].append(f"{view_name}: définie plusieurs fois")
+            else:
+                seen.add(view_name)
+                planned.append((view_def, view_name))
+        
+        # Un seul instantané du catalogue pour toutes les vérifications d'existence
+        self.registry.load()
+        statements = []
+        for view_def, view_name in planned:
+            exists = self.registry.exists(view_name)
+            if exists and not force_recreate:
+                results['errors'].append(f"{view_name}: la VIEW existe déjà")
+                continue
+            sql = self.view_builder.generate_view_sql(view_def, view_name)
+            if exists:
+                sql = f"{self._drop_view_sql(view_name)}\n{sql}"
+            statements.append((view_def, view_name, sql))
+        
+        # Une transaction, un point de sauvegarde par VIEW (DDL et métadonnées)
+        self.metadata.ensure_table()
+        created: List[Tuple[ViewDefinition, str]] = []
+        total = len(statements)
+        with self.db_manager.transaction() as conn:
+            for done, (view_def, view_name, sql) in enumerate(statements, 1):
+                if is_cancelled and is_cancelled():
+                    raise ViewCreationCancelled(f"Création annulée après {done - 1}/{total} VIEWs")
+                savepoint = conn.begin_nested()
+                try:
+                    conn.exec_driver_sql(sql)
+                    self._save_view_metadata(conn, view_def, view_name)
+                    savepoint.commit()
+                    created.append((view_def, view_name))
+                except Exception as e:
+                    savepoint.rollback()
+                    results['errors'].append(f"{view_name}: {e}")
+                    logger.error(f"Erreur lors de la création de la VIEW {view_name}: {e}")
+                if progress_callback:
+                    progress_callback(done, total, view_name)
+        
+        # Transaction validée : mise à jour du registre et des comptages
+        for view_def, view_name in created:
+            self.registry.add(view_name, materialized=view_def.is_materialized)
+            self.row_counts.invalidate(view_name)
+            self.invalidate_schema(view_name)
+            results['success'].append(view_name)
+        
+        logger.info(f"Création groupée: {len(results['success'])} VIEWs créées, "
+                    f"{len(results['errors'])} erreurs")
+        return results
+    
     def get_view_data(self, view_name: str, limit: Optional[int] = 1000, 
                      filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
@@ -116,7 +266,15 @@ class ViewManager:
                 sql += f" LIMIT {limit}"
             
             # Exécution
+            started = time.perf_counter()
             results = self.db_manager.execute_query(sql, fetch_results=True)
+            self.metadata.record_query_time(full_view_name, (time.perf_counter() - started) * 1000)
+            
+            # Lecture complète sans filtre : le nombre de lignes exact est connu
+            max_rows = self.db_manager.config.get_max_rows()
+            if not filters and (not limit or len(results) < limit) and len(results) < max_rows:
+                self.row_counts.record_exact(full_view_name, len(results))
+                self.metadata.record_row_count(full_view_name, len(results))
             
             logger.info(f"Récupération de {len(results)} lignes de la VIEW {full_view_name}")
             return results
@@ -160,18 +318,19 @@ class ViewManager:
             if not self._view_exists(full_view_name):
                 raise ViewNotFoundError(f"La VIEW {full_view_name} n'existe pas")
             
-            # Construction du SQL de suppression
-            cascade_sql = " CASCADE" if cascade else ""
-            sql = f"DROP VIEW {full_view_name}{cascade_sql};"
+            # Construction du SQL de suppression (l'index d'une vue matérialisée suit)
+            sql = self._drop_view_sql(full_view_name, cascade)
             
-            # Exécution
-            self.db_manager.execute_query(sql, fetch_results=False)
-            
-            # Suppression des métadonnées
-            self._delete_view_metadata(full_view_name)
+            # Suppression de la VIEW et de ses métadonnées dans une même transaction
+            self.metadata.ensure_table()
+            with self.db_manager.transaction() as conn:
+                conn.exec_driver_sql(sql)
+                self._delete_view_metadata(conn, full_view_name)
             
-            # Invalidation du cache
-            self._invalidate_cache()
+            # Mise à jour du registre
+            self.registry.remove(full_view_name)
+            self.row_counts.invalidate(full_view_name)
+            self.invalidate_schema(full_view_name)
             
             logger.info(f"VIEW {full_view_name} supprimée avec succès")
             return True
@@ -193,17 +352,34 @@ class ViewManager:
             List[Dict]: Informations sur les VIEWs KPI
         """
         try:
-            all_views = self.db_manager.get_available_views()
-            
-            # Filtrage des VIEWs KPI
-            kpi_views = []
-            for view_name in all_views:
-                if self._is_kpi_view(view_name):
-                    view_info = self._get_view_info(view_name)
-                    
-                    # Filtrage par module si spécifié
-                    if module is None or view_info.get('module') == module.value:
-                        kpi_views.append(view_info)
+            # Métadonnées des VIEWs présentes : une requête indexée (None si table indisponible)
+            rows = self.metadata.list_views(module)
+            metadata = {row['view_name']: row for row in rows or ()}
+            
+            # VIEWs KPI du registre sans métadonnées (créées hors de l'application)
+            view_names = sorted(set(metadata) | set(self.registry.kpi_views(module)))
+            
+            # Nombres de lignes : comptage récent, dernier comptage enregistré, sinon estimation
+            counts: Dict[str, RowCount] = {}
+            for view_name in view_names:
+                count = self.row_counts.cached(view_name)
+                row = metadata.get(view_name)
+                if count is None and row and row['last_row_count'] is not None:
+                    count = RowCount(int(row['last_row_count']), False, 'metadata')
+                if count is not None:
+                    counts[view_name] = count
+            missing = [name for name in view_names if name not in counts]
+            if missing:
+                counts.update(self.row_counts.get_counts(
+                    missing,
+                    materialized=[name for name in missing if self._is_materialized_view(name)]
+                ))
+            
+            kpi_views = [
+                self._get_view_info(view_name, counts.get(view_name),
+                                    self._metadata_info(metadata[view_name]) if view_name in metadata else {})
+                for view_name in view_names
+            ]
             
             logger.info(f"Trouvé {len(kpi_views)} VIEWs KPI")
             return kpi_views
@@ -216,6 +392,9 @@ class ViewManager:
         """
         Récupère le schéma d'une VIEW (colonnes, types, commentaires)
         
+        Une seule requête pg_catalog (schéma de la VIEW explicite), résultat
+        conservé jusqu'à la recréation ou la suppression de la VIEW.
+        
         Args:
             view_name: Nom de la VIEW
             
@@ -225,30 +404,17 @@ class ViewManager:
         try:
             full_view_name = self._normalize_view_name(view_name)
             
-            # Requête pour obtenir les informations de colonnes
-            sql = """
-            SELECT 
-                column_name,
-                data_type,
-                is_nullable,
-                column_default,
-                character_maximum_length,
-                numeric_precision,
-                numeric_scale
-            FROM information_schema.columns 
-            WHERE table_name = %s 
-            ORDER BY ordinal_position
-            """
+            cached = self._schema_cache.get(full_view_name)
+            if cached is not None:
+                return copy.deepcopy(cached)
             
+            # Types, nullabilité, valeurs par défaut, précision et commentaires en une requête
             columns_info = self.db_manager.execute_query(
-                sql, 
-                (full_view_name.split('.')[-1],),  # Nom sans schéma
+                VIEW_COLUMNS_SQL,
+                (self.db_manager.config.get_schema(), full_view_name.split('.')[-1]),  # Nom sans schéma
                 fetch_results=True
             )
             
-            # Récupération des commentaires
-            comments = self._get_column_comments(full_view_name)
-            
             # Construction du schéma
             schema = {
                 'view_name': full_view_name,
@@ -256,33 +422,73 @@ class ViewManager:
             }
             
             for col_info in columns_info:
+                default, comment = col_info['column_default'], col_info['comment']
                 column = {
                     'name': col_info['column_name'],
                     'type': col_info['data_type'],
-                    'nullable': col_info['is_nullable'] == 'YES',
-                    'default': col_info['column_default'],
-                    'comment': comments.get(col_info['column_name'], '')
+                    'full_type': col_info['full_type'],
+                    'nullable': bool(col_info['is_nullable']),
+                    'default': default if isinstance(default, str) else None,
+                    'comment': comment if isinstance(comment, str) else ''
                 }
                 
-                # Ajout des informations de taille si applicable
-                if col_info['character_maximum_length']:
-                    column['max_length'] = col_info['character_maximum_length']
-                if col_info['numeric_precision']:
-                    column['precision'] = col_info['numeric_precision']
-                if col_info['numeric_scale']:
-                    column['scale'] = col_info['numeric_scale']
+                # Ajout des informations de taille si applicable (NULL pour les autres types)
+                for key, source in (('max_length', 'character_maximum_length'),
+                                    ('precision', 'numeric_precision'),
+                                    ('scale', 'numeric_scale')):
+                    value = _catalog_int(col_info[source])
+                    if value is not None:
+                        column[key] = value
                 
                 schema['columns'].append(column)
             
-            return schema
+            # VIEW introuvable : rien à conserver
+            if schema['columns']:
+                self._schema_cache[full_view_name] = schema
+            return copy.deepcopy(schema)
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération du schéma de {view_name}: {e}")
             raise ViewSchemaError(f"Erreur de schéma: {e}")
     
+    def count_exact_rows(self, view_name: str) -> int:
+        """
+        Comptage exact des lignes d'une VIEW (travail d'arrière-plan), conservé dans les métadonnées
+        
+        Args:
+            view_name: Nom complet de la VIEW
+            
+        Returns:
+            int: Nombre de lignes
+        """
+        count = self.row_counts.count_exact(view_name)
+        self.metadata.record_row_count(view_name, count)
+        return count
+    
+    def validate_query_plan(self, view_def: ViewDefinition) -> PlanValidation:
+        """
+        Valide la requête d'une VIEW auprès du planificateur, sans la créer
+        
+        Args:
+            view_def: Définition de la VIEW
+            
+        Returns:
+            PlanValidation: validité, coût et lignes estimés, avertissements
+        """
+        try:
+            explain_output = self.db_manager.explain(self.view_builder.build_select_query(view_def))
+            plan = QueryPlan.from_explain(explain_output)
+        except Exception as e:
+            logger.warning(f"Validation de la VIEW {view_def.name} échouée: {e}")
+            return PlanValidation(False, error=str(e))
+        
+        config = self.db_manager.config
+        warnings = assess_plan(plan, config.get_plan_cost_warning(), config.get_plan_rows_warning())
+        return PlanValidation(True, plan, warnings=warnings)
+    
     def refresh_view(self, view_name: str) -> bool:
         """
-        Rafraîchit une VIEW matérialisée (si applicable)
+        Rafraîchit une VIEW matérialisée ou la table de cumul d'une VIEW en mode cumul
         
         Args:
             view_name: Nom de la VIEW
@@ -295,13 +501,35 @@ class ViewManager:
             
             # Vérification si c'est une vue matérialisée
             if self._is_materialized_view(full_view_name):
+                # Avec un index unique, les lecteurs ne sont pas bloqués pendant le rafraîchissement
+                if self._has_unique_index(full_view_name):
+                    try:
+                        sql = f"REFRESH MATERIALIZED VIEW CONCURRENTLY {full_view_name};"
+                        self.db_manager.execute_query(sql, fetch_results=False)
+                        self.row_counts.invalidate(full_view_name)
+                        self.metadata.record_refresh(full_view_name)
+                        logger.info(f"VIEW matérialisée {full_view_name} rafraîchie (concurrente)")
+                        return True
+                    except Exception as e:
+                        # Vue jamais remplie ou index inutilisable : rafraîchissement bloquant
+                        logger.warning(f"Rafraîchissement concurrent impossible pour {full_view_name}: {e}")
+                
                 sql = f"REFRESH MATERIALIZED VIEW {full_view_name};"
                 self.db_manager.execute_query(sql, fetch_results=False)
+                self.row_counts.invalidate(full_view_name)
+                self.metadata.record_refresh(full_view_name)
                 logger.info(f"VIEW matérialisée {full_view_name} rafraîchie")
                 return True
-            else:
-                logger.info(f"La VIEW {full_view_name} n'est pas matérialisée, pas de rafraîchissement nécessaire")
+            
+            # Mode cumul : seuls les derniers jours sont recalculés
+            rollup_def = self._rollup_definition(full_view_name)
+            if rollup_def is not None:
+                self.rollups.refresh(rollup_def, full_view_name)
+                self.row_counts.invalidate(full_view_name)
                 return True
+            
+            logger.info(f"La VIEW {full_view_name} n'est pas matérialisée, pas de rafraîchissement nécessaire")
+            return True
                 
         except Exception as e:
             logger.error(f"Erreur lors du rafraîchissement de {view_name}: {e}")
@@ -312,91 +540,69 @@ class ViewManager:
     def _view_exists(self, view_name: str) -> bool:
         """Vérifie si une VIEW existe"""
         try:
-            all_views = self.db_manager.get_available_views()
-            return view_name.lower() in [v.lower() for v in all_views]
-        except:
+            return self.registry.exists(view_name)
+        except Exception as e:
+            logger.error(f"Erreur lors de la vérification de la VIEW {view_name}: {e}")
             return False
     
     def _normalize_view_name(self, view_name: str) -> str:
-        """Normalise le nom d'une VIEW (ajoute le préfixe si nécessaire)"""
-        view_name = view_name.lower()
-        
-        # Si le nom contient déjà un préfixe KPI, on le retourne tel quel
-        for module in ModuleType:
-            prefix = self.view_builder.prefixes[module]
-            if view_name.startswith(prefix):
-                return view_name
-        
-        # Sinon, on assume que c'est un nom court et on cherche le préfixe approprié
-        for module in ModuleType:
-            prefix = self.view_builder.prefixes[module]
-            full_name = f"{prefix}{view_name}"
-            if self._view_exists(full_name):
-                return full_name
+        """Normalise le nom d'une VIEW (nom complet retrouvé à partir du nom court)"""
+        try:
+            full_name = self.registry.resolve(view_name)
+        except Exception as e:
+            logger.error(f"Erreur lors de la résolution du nom {view_name}: {e}")
+            full_name = None
         
         # Si aucun préfixe ne correspond, on retourne le nom original
-        return view_name
+        return full_name or view_name.lower()
     
     def _is_kpi_view(self, view_name: str) -> bool:
         """Vérifie si une VIEW est une VIEW KPI (basé sur le préfixe)"""
         view_name = view_name.lower()
         return any(view_name.startswith(prefix) for prefix in self.view_builder.prefixes.values())
     
-    def _get_view_info(self, view_name: str) -> Dict[str, Any]:
-        """Récupère les informations d'une VIEW"""
+    def _get_view_info(self, view_name: str, row_count: Optional[RowCount] = None,
+                       metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Récupère les informations d'une VIEW
+        
+        Args:
+            view_name: Nom de la VIEW
+            row_count: Nombre de lignes déjà déterminé (estimé si absent)
+            metadata: Métadonnées déjà lues (chargées si None)
+        """
         info = {
             'name': view_name,
             'full_name': view_name,
             'module': self._get_module_from_name(view_name),
             'created_date': None,
             'description': '',
-            'row_count': 0
+            'row_count': 0,
+            'row_count_exact': False,
+            'row_count_source': 'unknown'
         }
         
         # Tentative de récupération des métadonnées sauvegardées
-        metadata = self._load_view_metadata(view_name)
+        if metadata is None:
+            metadata = self._load_view_metadata(view_name)
         if metadata:
             info.update(metadata)
         
-        # Récupération du nombre de lignes
-        try:
-            count_sql = f"SELECT COUNT(*) as row_count FROM {view_name}"
-            result = self.db_manager.execute_query(count_sql, fetch_results=True)
-            if result:
-                info['row_count'] = result[0]['row_count']
-        except:
-            pass  # Ignore les erreurs de comptage
+        # Nombre de lignes : exact s'il est connu, estimé sinon (jamais de COUNT(*) ici)
+        if row_count is None:
+            materialized = [view_name] if self._is_materialized_view(view_name) else []
+            row_count = self.row_counts.get_counts([view_name], materialized)[view_name]
+        if row_count.count is not None:
+            info['row_count'] = row_count.count
+        info['row_count_exact'] = row_count.exact
+        info['row_count_source'] = row_count.source
         
         return info
     
     def _get_module_from_name(self, view_name: str) -> Optional[str]:
         """Détermine le module d'une VIEW basé sur son nom"""
-        view_name = view_name.lower()
-        for module, prefix in self.view_builder.prefixes.items():
-            if view_name.startswith(prefix):
-                return module.value
-        return None
-    
-    def _validate_sql_syntax(self, sql: str, view_def: ViewDefinition) -> bool:
-        """Valide la syntaxe SQL en mode DRY RUN"""
-        try:
-            # Création d'une version temporaire pour tester
-            temp_name = f"temp_validate_{view_def.name}_{int(datetime.now().timestamp())}"
-            test_sql = sql.replace(
-                self.view_builder._build_view_name(view_def.name, view_def.module),
-                temp_name
-            )
-            
-            # Test de création
-            self.db_manager.execute_query(test_sql, fetch_results=False)
-            
-            # Nettoyage
-            cleanup_sql = f"DROP VIEW {temp_name};"
-            self.db_manager.execute_query(cleanup_sql, fetch_results=False)
-            
-            return True
-        except:
-            return False
+        module = self.registry.module_of(view_name)
+        return module.value if module else None
     
     def _build_filter_conditions(self, filters: Dict[str, Any]) -> str:
         """Construit les conditions WHERE à partir des filtres"""
@@ -418,57 +624,85 @@ class ViewManager:
         
         return " AND ".join(conditions)
     
-    def _get_column_comments(self, view_name: str) -> Dict[str, str]:
-        """Récupère les commentaires des colonnes"""
+    def _drop_view_sql(self, view_name: str, cascade: bool = False) -> str:
+        """Instruction DROP adaptée au type de la VIEW (simple ou matérialisée)"""
+        cascade_sql = " CASCADE" if cascade else ""
+        if self._is_materialized_view(view_name):
+            return f"DROP MATERIALIZED VIEW {view_name}{cascade_sql};"
+        # Une VIEW simple peut lire une table de cumul : supprimée avec elle
+        rollup_table = self.view_builder.rollup_table_name(view_name)
+        return f"DROP VIEW {view_name}{cascade_sql};\nDROP TABLE IF EXISTS {rollup_table};"
+    
+    def _has_unique_index(self, view_name: str) -> bool:
+        """Vérifie si une VIEW matérialisée porte un index unique utilisable"""
         try:
-            sql = """
-            SELECT 
-                a.attname as column_name,
-                d.description as comment
-            FROM pg_attribute a
-            LEFT JOIN pg_description d ON a.attrelid = d.objoid AND a.attnum = d.objsubid
-            WHERE a.attrelid = %s::regclass 
-            AND a.attnum > 0 
-            AND NOT a.attisdropped
-            """
-            
-            results = self.db_manager.execute_query(sql, (view_name,), fetch_results=True)
-            return {r['column_name']: r['comment'] or '' for r in results}
-        except:
-            return {}
+            rows = self.db_manager.execute_query(
+                UNIQUE_INDEX_SQL,
+                (self.db_manager.config.get_schema(), view_name.split('.')[-1]),
+                fetch_results=True
+            )
+            return bool(rows and rows[0]['has_unique_index'])
+        except Exception as e:
+            logger.warning(f"Index de {view_name} introuvable: {e}")
+            return False
     
     def _is_materialized_view(self, view_name: str) -> bool:
         """Vérifie si une VIEW est matérialisée"""
         try:
-            sql = """
-            SELECT 1 FROM pg_matviews 
-            WHERE matviewname = %s
-            """
-            result = self.db_manager.execute_query(
-                sql, 
-                (view_name.split('.')[-1],), 
-                fetch_results=True
-            )
-            return len(result) > 0
-        except:
+            return self.registry.is_materialized(view_name.split('.')[-1])
+        except Exception:
             return False
     
-    def _save_view_metadata(self, view_def: ViewDefinition):
-        """Sauvegarde les métadonnées d'une VIEW"""
-        # Pour une implémentation future - sauvegarde dans une table de métadonnées
-        pass
+    def _rollup_definition(self, view_name: str) -> Optional[ViewDefinition]:
+        """Définition d'une VIEW en mode cumul (None pour les autres modes)"""
+        try:
+            row = self.metadata.load(view_name)
+        except Exception as e:
+            logger.warning(f"Métadonnées de {view_name} indisponibles: {e}")
+            return None
+        if not row or row['storage'] != ViewStorage.ROLLUP.value:
+            return None
+        return view_definition(row['definition'])
+    
+    def _save_view_metadata(self, conn, view_def: ViewDefinition, view_name: str):
+        """Sauvegarde les métadonnées d'une VIEW (transaction de sa création)"""
+        self.metadata.save(conn, view_def, view_name)
     
     def _load_view_metadata(self, view_name: str) -> Optional[Dict[str, Any]]:
         """Charge les métadonnées d'une VIEW"""
-        # Pour une implémentation future - chargement depuis une table de métadonnées
-        return None
+        try:
+            row = self.metadata.load(view_name)
+        except Exception as e:
+            logger.warning(f"Métadonnées de {view_name} indisponibles: {e}")
+            return None
+        return self._metadata_info(row) if row else None
+    
+    def _delete_view_metadata(self, conn, view_name: str):
+        """Supprime les métadonnées d'une VIEW (transaction de sa suppression)"""
+        self.metadata.delete(conn, view_name)
+    
+    def _metadata_info(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Informations d'affichage tirées d'une ligne de métadonnées"""
+        return {
+            'module': row['module'],
+            'storage': row['storage'],
+            'description': row['description'] or '',
+            'created_date': row['created_at'],
+            'updated_date': row['updated_at'],
+            'last_refresh': row['last_refresh_at'],
+            'avg_query_ms': row['avg_query_ms'],
+            'query_count': row['query_count'],
+            'definition': row['definition']
+        }
     
-    def _delete_view_metadata(self, view_name: str):
-        """Supprime les métadonnées d'une VIEW"""
-        # Pour une implémentation future - suppression dans une table de métadonnées
-        pass
+    def invalidate_schema(self, view_name: Optional[str] = None):
+        """Oublie le schéma d'une VIEW (nom complet) ou de toutes"""
+        if view_name is None:
+            self._schema_cache.clear()
+        else:
+            self._schema_cache.pop(view_name.lower(), None)
     
     def _invalidate_cache(self):
-        """Invalide le cache des VIEWs"""
-        self._cache.clear()
-        self._last_refresh = None
+        """Invalide le registre des VIEWs (rechargé au prochain accès) et les schémas"""
+        self.registry.invalidate()
+        self.invalidate_schema()
@@ -0,0 +1,203 @@
+"""
+Métadonnées persistantes des VIEWs KPI
+Table kpi_view_metadata : définition, module, dates, dernier rafraîchissement, volumes et temps de lecture
+"""
+
+import json
+import logging
+import threading
+from dataclasses import asdict, fields
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from app.models.database_manager import DatabaseManager
+from .view_builder import ModuleType, ViewDefinition, ViewStorage
+
+logger = logging.getLogger(__name__)
+
+METADATA_TABLE = "kpi_view_metadata"
+
+# Clé primaire sur le nom (recherche par VIEW), index sur le module (filtrage du listage)
+CREATE_TABLE_SQL = f"""
+CREATE TABLE IF NOT EXISTS {{schema}}.{METADATA_TABLE} (
+    view_name        TEXT PRIMARY KEY,
+    module           TEXT NOT NULL,
+    storage          TEXT NOT NULL DEFAULT 'view',
+    definition       JSONB NOT NULL,
+    description      TEXT NOT NULL DEFAULT '',
+    created_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at       TIMESTAMPTZ NOT NULL DEFAULT now(),
+    last_refresh_at  TIMESTAMPTZ,
+    last_row_count   BIGINT,
+    row_count_at     TIMESTAMPTZ,
+    avg_query_ms     DOUBLE PRECISION,
+    query_count      BIGINT NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS {METADATA_TABLE}_module_idx ON {{schema}}.{METADATA_TABLE} (module, view_name);
+"""
+
+UPSERT_SQL = f"""
+INSERT INTO {{schema}}.{METADATA_TABLE} (view_name, module, storage, definition, description)
+VALUES (%s, %s, %s, %s::jsonb, %s)
+ON CONFLICT (view_name) DO UPDATE SET
+    module = EXCLUDED.module,
+    storage = EXCLUDED.storage,
+    definition = EXCLUDED.definition,
+    description = EXCLUDED.description,
+    updated_at = now(),
+    last_row_count = NULL,
+    row_count_at = NULL
+"""
+
+DELETE_SQL = f"DELETE FROM {{schema}}.{METADATA_TABLE} WHERE view_name = %s"
+
+# Listage : une requête sur la table de métadonnées, VIEWs encore présentes dans le catalogue
+SELECT_SQL = f"""
+SELECT m.view_name, m.module, m.storage, m.definition, m.description,
+       m.created_at, m.updated_at, m.last_refresh_at, m.last_row_count, m.row_count_at,
+       m.avg_query_ms, m.query_count, c.relkind = 'm' AS is_materialized
+FROM {{schema}}.{METADATA_TABLE} m
+JOIN pg_namespace n ON n.nspname = %s
+JOIN pg_class c ON c.relnamespace = n.oid AND c.relname = m.view_name AND c.relkind IN ('v', 'm')
+"""
+
+# Temps de lecture : moyenne mobile exponentielle (poids de la dernière mesure)
+QUERY_TIME_SMOOTHING = 0.2
+
+def _json_default(value: Any):
+    return value.value if isinstance(value, Enum) else str(value)
+
+def _records(rows: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Lignes de métadonnées, valeurs manquantes à None (NaN / NaT d'un passage par DataFrame)"""
+    return [{key: None if not isinstance(value, (dict, list)) and pd.isna(value) else value
+             for key, value in row.items()} for row in rows or ()]
+
+def view_definition(definition: Any) -> ViewDefinition:
+    """Définition de VIEW reconstruite depuis la colonne definition (JSONB)"""
+    if isinstance(definition, str):
+        definition = json.loads(definition)
+    known = {f.name for f in fields(ViewDefinition)}
+    values = {name: value for name, value in definition.items() if name in known}
+    values['module_type'] = ModuleType(values.get('module_type', ModuleType.AGGREGATION.value))
+    values['storage'] = ViewStorage(values.get('storage', ViewStorage.VIEW.value))
+    return ViewDefinition(**values)
+
+class ViewMetadataStore:
+    """
+    Accès à la table kpi_view_metadata
+
+    La table est créée au premier usage ; si elle ne peut pas l'être
+    (droits insuffisants), le magasin est désactivé et les appels
+    deviennent sans effet. Les écritures liées à une DDL prennent la
+    connexion de la transaction de cette DDL.
+    """
+
+    def __init__(self, db_manager: DatabaseManager):
+        self.db_manager = db_manager
+        self._lock = threading.Lock()
+        self._available: Optional[bool] = None
+
+    @property
+    def schema(self) -> str:
+        return self.db_manager.config.get_schema()
+
+    def ensure_table(self) -> bool:
+        """
+        Crée la table et ses index si besoin (une fois par processus)
+
+        Returns:
+            True si la table est utilisable
+        """
+        with self._lock:
+            if self._available is None:
+                try:
+                    self.db_manager.execute_query(CREATE_TABLE_SQL.format(schema=self.schema),
+                                                  fetch_results=False)
+                    self._available = True
+                except Exception as e:
+                    logger.warning(f"⚠️ View metadata table unavailable: {e}")
+                    self._available = False
+            return self._available
+
+    def save(self, conn, view_def: ViewDefinition, view_name: str):
+        """
+        Enregistre la définition d'une VIEW (dans la transaction de sa création)
+
+        Args:
+            conn: Connexion de la transaction en cours
+            view_def: Définition de la VIEW
+            view_name: Nom complet de la VIEW
+        """
+        if not self.ensure_table():
+            return
+        definition = json.dumps(asdict(view_def), default=_json_default)
+        conn.exec_driver_sql(
+            UPSERT_SQL.format(schema=self.schema),
+            (view_name, view_def.module.value, view_def.storage.value, definition, view_def.description)
+        )
+
+    def delete(self, conn, view_name: str):
+        """Supprime les métadonnées d'une VIEW (dans la transaction de sa suppression)"""
+        if not self.ensure_table():
+            return
+        conn.exec_driver_sql(DELETE_SQL.format(schema=self.schema), (view_name,))
+
+    def load(self, view_name: str) -> Optional[Dict[str, Any]]:
+        """Métadonnées d'une VIEW (recherche par clé primaire)"""
+        if not self.ensure_table():
+            return None
+        rows = self.db_manager.execute_query(
+            SELECT_SQL.format(schema=self.schema) + " WHERE m.view_name = %s",
+            (self.schema, view_name.lower()), fetch_results=True
+        )
+        rows = _records(rows)
+        return rows[0] if rows else None
+
+    def list_views(self, module: Optional[ModuleType] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Métadonnées des VIEWs KPI présentes, d'un module ou de tous (une requête)
+
+        Returns:
+            Lignes triées par nom, None si la table est indisponible
+        """
+        if not self.ensure_table():
+            return None
+        sql = SELECT_SQL.format(schema=self.schema)
+        params = [self.schema]
+        if module is not None:
+            sql += " WHERE m.module = %s"
+            params.append(module.value)
+        return _records(self.db_manager.execute_query(sql + " ORDER BY m.view_name", params, fetch_results=True))
+
+    def record_refresh(self, view_name: str):
+        """Date du dernier rafraîchissement d'une VIEW matérialisée"""
+        self._update(view_name, "last_refresh_at = now()", ())
+
+    def record_row_count(self, view_name: str, count: int):
+        """Dernier nombre de lignes exact connu"""
+        self._update(view_name, "last_row_count = %s, row_count_at = now()", (count,))
+
+    def record_query_time(self, view_name: str, duration_ms: float):
+        """Temps de lecture d'une VIEW (moyenne mobile)"""
+        self._update(
+            view_name,
+            "avg_query_ms = CASE WHEN avg_query_ms IS NULL THEN %s "
+            "ELSE avg_query_ms * %s + %s * %s END, query_count = query_count + 1",
+            (duration_ms, 1 - QUERY_TIME_SMOOTHING, duration_ms, QUERY_TIME_SMOOTHING)
+        )
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _update(self, view_name: str, assignments: str, params: tuple):
+        """Mise à jour de statistiques (best effort : un échec n'interrompt pas l'appelant)"""
+        if not self.ensure_table():
+            return
+        try:
+            self.db_manager.execute_query(
+                f"UPDATE {self.schema}.{METADATA_TABLE} SET {assignments} WHERE view_name = %s",
+                params + (view_name.lower(),), fetch_results=False
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ View metadata update failed for {view_name}: {e}")
@@ -0,0 +1,166 @@
+"""
+Registre des noms de VIEWs KPI
+Recherche en O(1) sans découverte complète du catalogue à chaque appel
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+from app.models.database_manager import DatabaseManager
+from .view_builder import ModuleType
+
+logger = logging.getLogger(__name__)
+
+# VIEWs et VIEWs matérialisées du schéma (une seule requête catalogue)
+VIEWS_SQL = """
+SELECT c.relname AS view_name, c.relkind = 'm' AS is_materialized
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE n.nspname = %s AND c.relkind IN ('v', 'm')
+"""
+
+@dataclass
+class RegisteredView:
+    """VIEW connue du registre"""
+    name: str
+    materialized: bool = False
+    module: Optional[ModuleType] = None
+
+class ViewRegistry:
+    """
+    Index des VIEWs du schéma
+
+    Rempli par une requête sur pg_class, tenu à jour lors des créations et
+    suppressions faites par l'application, rechargé à l'expiration du TTL
+    (VIEWs créées ou supprimées par ailleurs).
+    Recherche insensible à la casse par nom complet ou par nom court (sans
+    préfixe de module), et index des VIEWs de chaque module.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, prefixes: Dict[ModuleType, str], ttl: float = 300.0):
+        """
+        Args:
+            db_manager: Gestionnaire de base de données
+            prefixes: Préfixe des VIEWs KPI de chaque module
+            ttl: Durée de validité du registre (secondes)
+        """
+        self.db_manager = db_manager
+        self.prefixes = {module: prefix.lower() for module, prefix in prefixes.items()}
+        self.ttl = ttl
+
+        self._lock = threading.RLock()
+        self._views: Dict[str, RegisteredView] = {}      # nom complet en minuscules
+        self._short_names: Dict[str, str] = {}           # nom court -> nom complet
+        self._by_module: Dict[ModuleType, Set[str]] = {module: set() for module in self.prefixes}
+        self._loaded_at: Optional[float] = None
+
+    def load(self) -> int:
+        """
+        Recharge le registre depuis le catalogue
+
+        Returns:
+            Nombre de VIEWs connues
+        """
+        rows = self.db_manager.execute_query(
+            VIEWS_SQL, (self.db_manager.config.get_schema(),), fetch_results=True
+        )
+        with self._lock:
+            self._clear()
+            for row in rows:
+                self._register(row['view_name'], bool(row['is_materialized']))
+            self._loaded_at = time.monotonic()
+            count = len(self._views)
+
+        logger.info(f"Registre des VIEWs chargé: {count} VIEWs")
+        return count
+
+    def invalidate(self):
+        """Force le rechargement au prochain accès"""
+        with self._lock:
+            self._loaded_at = None
+
+    def exists(self, view_name: str) -> bool:
+        """VIEW présente (nom complet, insensible à la casse)"""
+        with self._lock:
+            self._ensure_loaded()
+            return view_name.lower() in self._views
+
+    def resolve(self, view_name: str) -> Optional[str]:
+        """
+        Nom complet d'une VIEW désignée par son nom complet ou son nom court
+
+        Returns:
+            Nom complet en minuscules, None si la VIEW est inconnue
+        """
+        name = view_name.lower()
+        with self._lock:
+            self._ensure_loaded()
+            if name in self._views:
+                return name
+            return self._short_names.get(name)
+
+    def is_materialized(self, view_name: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            view = self._views.get(view_name.lower())
+            return view is not None and view.materialized
+
+    def module_of(self, view_name: str) -> Optional[ModuleType]:
+        """Module d'une VIEW d'après son préfixe"""
+        return self._module_from_name(view_name.lower())
+
+    def kpi_views(self, module: Optional[ModuleType] = None) -> List[str]:
+        """VIEWs KPI connues (d'un module ou de tous), triées par nom"""
+        with self._lock:
+            self._ensure_loaded()
+            if module is not None:
+                return sorted(self._by_module.get(module, ()))
+            return sorted(name for names in self._by_module.values() for name in names)
+
+    def add(self, view_name: str, materialized: bool = False):
+        """Enregistre une VIEW créée par l'application"""
+        with self._lock:
+            self._register(view_name, materialized)
+
+    def remove(self, view_name: str):
+        """Retire une VIEW supprimée par l'application"""
+        name = view_name.lower()
+        with self._lock:
+            view = self._views.pop(name, None)
+            if view is None:
+                return
+            if view.module is not None:
+                self._by_module[view.module].discard(name)
+                short = name[len(self.prefixes[view.module]):]
+                if self._short_names.get(short) == name:
+                    del self._short_names[short]
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _ensure_loaded(self):
+        """Chargement initial ou rechargement après expiration (verrou détenu)"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            self.load()
+
+    def _clear(self):
+        self._views.clear()
+        self._short_names.clear()
+        for names in self._by_module.values():
+            names.clear()
+
+    def _register(self, view_name: str, materialized: bool):
+        name = view_name.lower()
+        module = self._module_from_name(name)
+        self._views[name] = RegisteredView(name, materialized, module)
+        if module is not None:
+            self._by_module[module].add(name)
+            self._short_names.setdefault(name[len(self.prefixes[module]):], name)
+
+    def _module_from_name(self, name: str) -> Optional[ModuleType]:
+        for module, prefix in self.prefixes.items():
+            if name.startswith(prefix):
+                return module
+        return None
@@ -14,8 +14,8 @@ class ViewNotFoundError(ReportingModuleException):
     """VIEW SQL non trouvée"""
     pass
 
-class InvalidFilterError(ReportingModuleException):
-    """Filtre invalide ou malformé"""
+class InvalidFilterError(ReportingModuleException, ValueError):
+    """Filtre invalide ou malformé (refusé avec un statut 400 par le service HTTP)"""
     pass
 
 class DataProcessingError(ReportingModuleException):
@@ -33,3 +33,11 @@ class QueryExecutionError(ReportingModuleException):
 class ConfigurationError(ReportingModuleException):
     """Erreur de configuration de l'application"""
     pass
+
+class ExportError(ReportingModuleException):
+    """Erreur lors de l'export des données"""
+    pass
+
+class AnalysisCancelledError(ReportingModuleException):
+    """Analyse abandonnée à la demande de l'appelant"""
+    pass
@@ -0,0 +1,111 @@
+"""
+Mesure du coût des imports au démarrage (python -X importtime)
+
+Utilisation :
+    python app/utils/import_profiler.py main --top 20
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Ligne produite par -X importtime : "import time: self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Modules qui ne doivent pas être chargés avant l'affichage de la fenêtre
+HEAVY_MODULES = ('pandas', 'numpy', 'sqlalchemy', 'matplotlib')
+
+@dataclass
+class ImportRecord:
+    """Coût d'import d'un module"""
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def cumulative_ms(self) -> float:
+        return self.cumulative_us / 1000
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Analyse la sortie de -X importtime
+
+    Args:
+        output: Sortie d'erreur du processus Python
+
+    Returns:
+        Un enregistrement par module importé, dans l'ordre de la sortie
+    """
+    records = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            records.append(ImportRecord(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return records
+
+def measure_imports(module: str, cwd: Optional[str] = None,
+                    env: Optional[Dict[str, str]] = None) -> List[ImportRecord]:
+    """
+    Importe un module dans un interpréteur neuf et relève le coût de chaque import
+
+    Args:
+        module: Module à importer (ex: 'main')
+        cwd: Répertoire de travail du processus
+        env: Variables d'environnement complémentaires
+    """
+    process_env = dict(os.environ, **(env or {}))
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd, env=process_env, capture_output=True, text=True, check=True
+    )
+    return parse_importtime(completed.stderr)
+
+def total_import_ms(records: List[ImportRecord], module: str) -> float:
+    """Temps cumulé d'import du module demandé (ms)"""
+    for record in records:
+        if record.name == module and record.depth == 0:
+            return record.cumulative_ms
+    return sum(r.cumulative_ms for r in records if r.depth == 0)
+
+def heavy_modules_loaded(records: List[ImportRecord]) -> List[str]:
+    """Modules lourds présents parmi les imports relevés"""
+    loaded = {record.name.split('.')[0] for record in records}
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+def format_report(records: List[ImportRecord], module: str, top: int = 20) -> str:
+    """Rapport texte : temps total, modules lourds, imports les plus coûteux"""
+    lines = [
+        f"Import de '{module}': {total_import_ms(records, module):.0f} ms",
+        f"Modules lourds chargés: {', '.join(heavy_modules_loaded(records)) or 'aucun'}",
+        "",
+        f"{'cumulé (ms)':>12} {'propre (ms)':>12}  module"
+    ]
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(f"{record.cumulative_ms:12.1f} {record.self_us / 1000:12.1f}  "
+                     f"{'  ' * record.depth}{record.name}")
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Coût des imports au démarrage")
+    parser.add_argument("module", nargs="?", default="main", help="Module à importer")
+    parser.add_argument("--top", type=int, default=20, help="Nombre de modules affichés")
+    parser.add_argument("--budget-ms", type=float, help="Échec si le temps d'import dépasse ce budget")
+    args = parser.parse_args(argv)
+
+    records = measure_imports(args.module)
+    print(format_report(records, args.module, args.top))
+
+    if args.budget_ms is not None and total_import_ms(records, args.module) > args.budget_ms:
+        print(f"\n❌ Budget d'import dépassé ({args.budget_ms:.0f} ms)")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
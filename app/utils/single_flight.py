@@ -0,0 +1,97 @@
+"""
+Regroupement des requêtes identiques en cours d'exécution (single-flight)
+Les appels concurrents de même clé partagent une seule exécution
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+class _Flight:
+    """Exécution en cours partagée par le meneur et ses suiveurs"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.followers = 0
+
+class SingleFlight:
+    """
+    Déduplication des appels concurrents identiques
+
+    Le premier appelant d'une clé exécute la fonction ; les appelants
+    arrivés pendant l'exécution attendent et reçoivent le même résultat
+    (ou la même exception). Rien n'est conservé une fois l'appel terminé.
+    """
+
+    def __init__(self, retry_on: Tuple[Type[BaseException], ...] = ()):
+        """
+        Args:
+            retry_on: Exceptions du meneur qui ne concernent que lui
+                (annulation) : les suiveurs relancent alors leur propre appel
+        """
+        self.retry_on = retry_on
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.executions = 0
+        self.saved_queries = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Exécute fn, ou attend l'exécution en cours de même clé
+
+        Args:
+            key: Clé identifiant la requête
+            fn: Fonction à exécuter par le meneur
+
+        Returns:
+            Résultat de fn (objet partagé entre les appelants)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.executions += 1
+            else:
+                flight.followers += 1
+
+        if leader:
+            return self._lead(key, flight, fn)
+
+        flight.done.wait()
+        if flight.error is not None:
+            if isinstance(flight.error, self.retry_on):
+                return self.do(key, fn)
+            raise flight.error
+
+        with self._lock:
+            self.saved_queries += 1
+        logger.debug(f"🛬 Shared in-flight result: {key}")
+        return flight.result
+
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques : exécutions réelles et requêtes évitées"""
+        with self._lock:
+            return {
+                'executions': self.executions,
+                'saved_queries': self.saved_queries,
+                'in_flight': len(self._flights)
+            }
+
+    def _lead(self, key: Hashable, flight: _Flight, fn: Callable[[], Any]) -> Any:
+        """Exécution par le meneur et publication du résultat"""
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
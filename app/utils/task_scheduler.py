@@ -0,0 +1,253 @@
+"""
+Ordonnanceur des tâches d'arrière-plan
+Pool de threads borné, priorités, annulation coopérative et dédoublonnage
+"""
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+import logging
+import threading
+from abc import ABCMeta, abstractmethod
+from enum import IntEnum
+from typing import Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+class TaskPriority(IntEnum):
+    """Priorité des tâches (la plus élevée est exécutée en premier)"""
+    PREFETCH = 0    # Préchargement spéculatif
+    MAINTENANCE = 5 # Rafraîchissements périodiques (VIEWs matérialisées)
+    INFO = 10       # Informations de VIEW, découverte
+    ANALYSIS = 20   # Analyse ou export demandé par l'utilisateur
+
+class CancellationToken:
+    """Jeton d'annulation partagé entre le demandeur et la tâche"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def __call__(self) -> bool:
+        """Permet de passer le jeton comme fonction is_cancelled"""
+        return self._event.is_set()
+
+class _ScheduledTaskMeta(ABCMeta, type(QObject)):
+    """Métaclasse d'un QObject abstrait"""
+
+class ScheduledTask(QObject, metaclass=_ScheduledTaskMeta):
+    """
+    Tâche exécutée dans le pool de l'ordonnanceur (classe abstraite)
+
+    Les sous-classes implémentent run() et déclarent leurs propres signaux.
+    Les signaux émis depuis le pool sont remis au thread de l'interface.
+    """
+
+    # Fin d'exécution (usage interne de l'ordonnanceur)
+    done = Signal()
+
+    def __init__(self, key: Optional[Hashable] = None, priority: TaskPriority = TaskPriority.INFO):
+        """
+        Args:
+            key: Clé de dédoublonnage (None : jamais dédoublonnée)
+            priority: Priorité d'exécution
+        """
+        # La construction d'un QObject ne vérifie pas les méthodes abstraites
+        abstract = getattr(type(self), '__abstractmethods__', ())
+        if abstract:
+            raise TypeError(f"Can't instantiate abstract class {type(self).__name__} "
+                            f"with abstract methods {', '.join(sorted(abstract))}")
+        super().__init__()
+        self.key = key
+        self.priority = priority
+        self.token = CancellationToken()
+        self._started = False
+        self._finished = False
+
+    @abstractmethod
+    def run(self):
+        """Corps de la tâche (exécuté dans un thread du pool)"""
+
+    def cancel(self):
+        """Demande d'annulation (vérifiée par la tâche entre ses étapes)"""
+        self.token.cancel()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self.token.is_cancelled
+
+    @property
+    def is_started(self) -> bool:
+        return self._started
+
+    @property
+    def is_done(self) -> bool:
+        return self._finished
+
+    def _execute(self):
+        """Point d'entrée du pool : les tâches annulées avant démarrage ne sont pas exécutées"""
+        self._started = True
+        try:
+            if not self.is_cancelled:
+                self.run()
+        except Exception as e:
+            logger.error(f"❌ Unhandled error in task {type(self).__name__}: {e}")
+        finally:
+            self._finished = True
+            self.done.emit()
+
+class _TaskRunnable(QRunnable):
+    """Adaptateur QRunnable d'une tâche planifiée"""
+
+    def __init__(self, task: ScheduledTask):
+        super().__init__()
+        self.task = task
+        self.setAutoDelete(False)  # Référence conservée par l'ordonnanceur (tryTake)
+
+    def run(self):
+        self.task._execute()
+
+class TaskScheduler(QObject):
+    """
+    Ordonnanceur central des tâches de l'application
+
+    Un nombre fixe de threads est réutilisé d'une requête à l'autre. Une tâche
+    en attente est remplacée par une nouvelle tâche de même clé.
+    """
+
+    # Nombre de tâches soumises et pas encore démarrées
+    queue_depth_changed = Signal(int)
+
+    def __init__(self, max_threads: int = 4, parent: Optional[QObject] = None):
+        """
+        Args:
+            max_threads: Nombre maximal de tâches exécutées simultanément
+            parent: QObject parent
+        """
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+
+        self._lock = threading.Lock()
+        self._tasks: Dict[int, _TaskRunnable] = {}          # Tâches soumises non terminées
+        self._pending_by_key: Dict[Hashable, ScheduledTask] = {}
+
+        self.stats = {
+            'submitted': 0,
+            'deduplicated': 0,
+            'cancelled_before_start': 0,
+            'completed': 0,
+            'max_queue_depth': 0
+        }
+        logger.info(f"🧵 Task scheduler ready ({max_threads} threads)")
+
+    def submit(self, task: ScheduledTask) -> ScheduledTask:
+        """
+        Soumet une tâche au pool
+
+        Les signaux de la tâche doivent être connectés avant l'appel.
+        Une tâche en attente de même clé est retirée de la file et annulée.
+
+        Args:
+            task: Tâche à exécuter
+
+        Returns:
+            La tâche soumise
+        """
+        runnable = _TaskRunnable(task)
+        task.done.connect(self._on_task_done)
+
+        with self._lock:
+            previous = self._pending_by_key.get(task.key) if task.key is not None else None
+            if previous is not None and self._take_pending(previous):
+                self.stats['deduplicated'] += 1
+                logger.debug(f"♻️ Pending task replaced: {task.key}")
+
+            self._tasks[id(task)] = runnable
+            if task.key is not None:
+                self._pending_by_key[task.key] = task
+            self.stats['submitted'] += 1
+
+        self.pool.start(runnable, int(task.priority))
+        self._emit_queue_depth()
+        return task
+
+    def cancel(self, task: Optional[ScheduledTask]):
+        """
+        Annule une tâche : retirée de la file si elle n'a pas démarré,
+        sinon son jeton d'annulation est positionné
+        """
+        if task is None:
+            return
+        task.cancel()
+        with self._lock:
+            taken = self._take_pending(task)
+            if taken:
+                self.stats['cancelled_before_start'] += 1
+        if taken:
+            self._emit_queue_depth()
+
+    def queue_depth(self) -> int:
+        """Nombre de tâches en attente d'un thread"""
+        with self._lock:
+            return sum(1 for r in self._tasks.values() if not r.task.is_started)
+
+    def active_count(self) -> int:
+        """Nombre de tâches en cours d'exécution"""
+        return self.pool.activeThreadCount()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Statistiques de l'ordonnanceur"""
+        stats = dict(self.stats)
+        stats['queue_depth'] = self.queue_depth()
+        stats['active'] = self.active_count()
+        return stats
+
+    def shutdown(self, timeout_ms: int = 1000) -> bool:
+        """
+        Annule toutes les tâches et attend la fin de celles en cours
+
+        Returns:
+            True si toutes les tâches sont terminées dans le délai
+        """
+        with self._lock:
+            for runnable in self._tasks.values():
+                runnable.task.cancel()
+            self._pending_by_key.clear()
+        self.pool.clear()
+        finished = self.pool.waitForDone(timeout_ms)
+        logger.info(f"🧵 Task scheduler stopped (all tasks finished: {finished})")
+        return finished
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _take_pending(self, task: ScheduledTask) -> bool:
+        """Retire une tâche non démarrée de la file (verrou détenu par l'appelant)"""
+        runnable = self._tasks.get(id(task))
+        if runnable is None or task.is_started or not self.pool.tryTake(runnable):
+            return False
+
+        task.cancel()
+        del self._tasks[id(task)]
+        if task.key is not None and self._pending_by_key.get(task.key) is task:
+            del self._pending_by_key[task.key]
+        return True
+
+    def _on_task_done(self):
+        """Libération d'une tâche terminée (thread de l'interface)"""
+        task = self.sender()
+        with self._lock:
+            self._tasks.pop(id(task), None)
+            if task.key is not None and self._pending_by_key.get(task.key) is task:
+                del self._pending_by_key[task.key]
+            self.stats['completed'] += 1
+        self._emit_queue_depth()
+
+    def _emit_queue_depth(self):
+        depth = self.queue_depth()
+        self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], depth)
+        self.queue_depth_changed.emit(depth)
@@ -70,3 +70,7 @@ class ViewPermissionError(ViewManagerException):
 class ViewDependencyError(ViewManagerException):
     """Erreur de dépendances entre VIEWs"""
     pass
+
+class ViewCreationCancelled(ViewCreationError):
+    """Création groupée de VIEWs annulée (transaction annulée)"""
+    pass
@@ -1,33 +1,61 @@
 """
-Workers pour l'exécution des tâches en arrière-plan (QThread)
+Workers pour l'exécution des tâches en arrière-plan (pool de l'ordonnanceur)
 """
 
-from PySide6.QtCore import QThread, Signal, QObject
+from PySide6.QtCore import Signal
 import logging
 from typing import Dict, Any
 
+from .task_scheduler import ScheduledTask, TaskPriority
+
 logger = logging.getLogger(__name__)
 
-class AnalysisWorker(QThread):
+def prepare_analysis_filters(params: Dict[str, Any]) -> Dict:
+    """
+    Construit les filtres d'analyse à partir des paramètres de la vue
+    
+    Partagé entre le worker et le contrôleur pour que le cache de résultats
+    utilise exactement les filtres envoyés à la base.
+    """
+    filters = {}
+    
+    # Filtres de dates
+    if 'date_start' in params and params['date_start']:
+        filters['date_start'] = params['date_start'].strftime('%Y-%m-%d')
+    
+    if 'date_end' in params and params['date_end']:
+        filters['date_end'] = params['date_end'].strftime('%Y-%m-%d')
+    
+    # Autres filtres
+    if 'filters' in params:
+        filters.update(params['filters'])
+    
+    return filters
+
+class AnalysisWorker(ScheduledTask):
     """Worker pour l'exécution d'analyses en arrière-plan"""
     
     # Signaux émis
-    finished = Signal(object)  # DataFrame des résultats
-    error = Signal(str)        # Message d'erreur
-    progress = Signal(str)     # Message de progression
+    finished = Signal(object)     # DataFrame des résultats
+    chunk_ready = Signal(object)  # Bloc de lignes reçu (affichage progressif)
+    error = Signal(str)           # Message d'erreur
+    progress = Signal(str)        # Message de progression
     
-    def __init__(self, analysis_engine, params: Dict[str, Any]):
+    def __init__(self, analysis_engine, params: Dict[str, Any],
+                 priority: TaskPriority = TaskPriority.ANALYSIS, key=None):
         """
         Initialisation du worker
         
         Args:
             analysis_engine: Instance de AnalysisEngine
             params: Paramètres de l'analyse (view_name, filters, etc.)
+            priority: Priorité (PREFETCH pour un préchargement)
+            key: Clé de dédoublonnage de la tâche
         """
-        super().__init__()
+        super().__init__(key=key, priority=priority)
         self.analysis_engine = analysis_engine
         self.params = params
-        self.is_cancelled = False
+        self._rows_fetched = 0
     
     def run(self):
         """Exécution de l'analyse en arrière-plan"""
@@ -49,50 +77,140 @@ class AnalysisWorker(QThread):
             
             self.progress.emit("Exécution de la requête...")
             
-            # Exécution de l'analyse
+            # Exécution de l'analyse, blocs transmis au fil de la lecture
             result = self.analysis_engine.run_analysis(
                 view_name=view_name,
                 filters=filters,
-                limit=self.params.get('limit', None)
+                limit=self.params.get('limit', None),
+                on_chunk=self._on_chunk,
+                is_cancelled=self.token
             )
             
             if self.is_cancelled:
                 return
             
-            self.progress.emit("Finalisation...")
-            
             # Émission du résultat
             self.finished.emit(result)
             logger.info(f"✅ Analysis worker completed for {view_name}")
             
         except Exception as e:
+            if self.is_cancelled:
+                return
             error_msg = f"Erreur lors de l'analyse: {str(e)}"
             logger.error(f"❌ {error_msg}")
             self.error.emit(error_msg)
     
     def _prepare_filters(self) -> Dict:
         """Préparation des filtres à partir des paramètres"""
-        filters = {}
-        
-        # Filtres de dates
-        if 'date_start' in self.params and self.params['date_start']:
-            filters['date_start'] = self.params['date_start'].strftime('%Y-%m-%d')
-        
-        if 'date_end' in self.params and self.params['date_end']:
-            filters['date_end'] = self.params['date_end'].strftime('%Y-%m-%d')
-        
-        # Autres filtres
-        if 'filters' in self.params:
-            filters.update(self.params['filters'])
-        
-        return filters
+        return prepare_analysis_filters(self.params)
+    
+    def _on_chunk(self, chunk):
+        """Transmission d'un bloc reçu et du nombre de lignes lues"""
+        if self.is_cancelled:
+            return
+        self._rows_fetched += len(chunk)
+        self.chunk_ready.emit(chunk)
+        self.progress.emit(f"{self._rows_fetched} lignes reçues...")
     
     def cancel(self):
         """Annulation de l'exécution"""
-        self.is_cancelled = True
+        super().cancel()
         logger.info("🛑 Analysis cancellation requested")
 
-class ViewDiscoveryWorker(QThread):
+class ExportWorker(ScheduledTask):
+    """Worker pour l'export complet d'une analyse en arrière-plan"""
+
+    # Signaux émis
+    progress = Signal(int, float)   # Lignes écrites, lignes/s
+    finished = Signal(str, int)     # Chemin du fichier, nombre de lignes
+    error = Signal(str)             # Message d'erreur
+    cancelled = Signal()            # Export annulé (aucun fichier conservé)
+
+    def __init__(self, exporter, params: Dict[str, Any], path: str, export_format: str):
+        """
+        Initialisation du worker
+
+        Args:
+            exporter: Instance de StreamingExporter
+            params: Paramètres de l'analyse affichée (view_name, dates, filtres)
+            path: Fichier de destination
+            export_format: 'csv', 'parquet' ou 'xlsx'
+        """
+        super().__init__(key=('export', path), priority=TaskPriority.ANALYSIS)
+        self.exporter = exporter
+        self.params = params
+        self.path = path
+        self.export_format = export_format
+
+    def run(self):
+        """Exécution de l'export en arrière-plan"""
+        view_name = self.params.get('view_name', '')
+        try:
+            logger.info(f"📤 Starting export worker for {view_name}")
+
+            rows = self.exporter.export(
+                view_name,
+                prepare_analysis_filters(self.params),
+                self.path,
+                self.export_format,
+                on_progress=self.progress.emit,
+                is_cancelled=self.token
+            )
+
+            self.finished.emit(self.path, rows)
+
+        except Exception as e:
+            if self.is_cancelled:
+                self.cancelled.emit()
+                return
+            error_msg = f"Erreur lors de l'export: {str(e)}"
+            logger.error(f"❌ {error_msg}")
+            self.error.emit(error_msg)
+
+    def cancel(self):
+        """Annulation de l'export (vérifiée à chaque bloc écrit)"""
+        super().cancel()
+        logger.info("🛑 Export cancellation requested")
+
+class StartupWorker(ScheduledTask):
+    """Connexion et découverte initiale des VIEWs, après l'affichage de la fenêtre"""
+    
+    # Signaux émis
+    finished = Signal(object, list, dict)  # Moteur d'analyse, VIEWs, infos de connexion
+    error = Signal(str)                    # Message d'erreur
+    
+    def __init__(self, database_manager_factory, analysis_engine_factory):
+        """
+        Initialisation du worker
+        
+        Args:
+            database_manager_factory: Création du DatabaseManager (connexion + test)
+            analysis_engine_factory: Création du moteur à partir de (db_manager, views)
+        """
+        super().__init__(key=('startup',), priority=TaskPriority.ANALYSIS)
+        self.database_manager_factory = database_manager_factory
+        self.analysis_engine_factory = analysis_engine_factory
+    
+    def run(self):
+        """Connexion, découverte unique des VIEWs et création du moteur"""
+        try:
+            logger.info("🔌 Connecting to database in background")
+            database_manager = self.database_manager_factory()
+            
+            # Découverte unique, partagée par le moteur et l'interface
+            views = database_manager.get_available_views()
+            analysis_engine = self.analysis_engine_factory(database_manager, views)
+            connection_info = database_manager.get_connection_info()
+            
+            self.finished.emit(analysis_engine, views, connection_info)
+            logger.info(f"✅ Startup completed: {len(views)} VIEWs found")
+            
+        except Exception as e:
+            error_msg = f"Erreur de connexion à la base de données: {str(e)}"
+            logger.error(f"❌ {error_msg}")
+            self.error.emit(error_msg)
+
+class ViewDiscoveryWorker(ScheduledTask):
     """Worker pour la découverte des VIEWs disponibles"""
     
     # Signaux émis
@@ -106,7 +224,7 @@ class ViewDiscoveryWorker(QThread):
         Args:
             database_manager: Instance de DatabaseManager
         """
-        super().__init__()
+        super().__init__(key=('discovery',), priority=TaskPriority.INFO)
         self.database_manager = database_manager
     
     def run(self):
@@ -117,6 +235,9 @@ class ViewDiscoveryWorker(QThread):
             # Découverte des VIEWs
             views = self.database_manager.get_available_views()
             
+            if self.is_cancelled:
+                return
+            
             # Émission du résultat
             self.finished.emit(views)
             logger.info(f"✅ Discovery completed: {len(views)} VIEWs found")
@@ -126,7 +247,7 @@ class ViewDiscoveryWorker(QThread):
             logger.error(f"❌ {error_msg}")
             self.error.emit(error_msg)
 
-class ViewInfoWorker(QThread):
+class ViewInfoWorker(ScheduledTask):
     """Worker pour récupérer les informations détaillées d'une VIEW"""
     
     # Signaux émis
@@ -141,7 +262,7 @@ class ViewInfoWorker(QThread):
             analysis_engine: Instance de AnalysisEngine
             view_name: Nom de la VIEW à analyser
         """
-        super().__init__()
+        super().__init__(key=('view_info', view_name), priority=TaskPriority.INFO)
         self.analysis_engine = analysis_engine
         self.view_name = view_name
     
@@ -153,6 +274,9 @@ class ViewInfoWorker(QThread):
             # Récupération des informations
             info = self.analysis_engine.get_view_info(self.view_name)
             
+            if self.is_cancelled:
+                return
+            
             # Émission du résultat
             self.finished.emit(self.view_name, info)
             logger.info(f"✅ VIEW {self.view_name} information retrieved")
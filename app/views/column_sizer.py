@@ -0,0 +1,92 @@
+"""
+Estimation de la largeur des colonnes du tableau de résultats
+Mesure l'en-tête et un échantillon de lignes plutôt que toutes les cellules
+"""
+
+import logging
+from typing import Callable, Dict, List, Tuple
+
+from PySide6.QtGui import QFont, QFontMetrics
+
+logger = logging.getLogger(__name__)
+
+class ColumnWidthEstimator:
+    """
+    Estimateur de largeur de colonnes par échantillonnage
+
+    Mesure l'en-tête, les premières et dernières lignes et un échantillon
+    aléatoire. Le résultat est mis en cache par signature de schéma.
+    """
+
+    HEAD_ROWS = 50
+    TAIL_ROWS = 50
+    RANDOM_ROWS = 100
+    PADDING = 24        # Marges de cellule + indicateur de tri
+    MIN_WIDTH = 40
+    MAX_WIDTH = 400
+
+    def __init__(self, formatter: Callable[[object], str]):
+        """
+        Args:
+            formatter: Fonction de formatage des cellules (identique à l'affichage)
+        """
+        self.formatter = formatter
+        self._cache: Dict[Tuple, List[int]] = {}
+
+    def estimate(self, dataframe, signature: Tuple, font: QFont, header_font: QFont) -> List[int]:
+        """
+        Calcule (ou relit en cache) la largeur de chaque colonne
+
+        Args:
+            dataframe: Lignes affichées dans le tableau
+            signature: Signature du schéma (colonnes et types)
+            font: Police des cellules
+            header_font: Police des en-têtes
+
+        Returns:
+            Liste des largeurs en pixels
+        """
+        if signature in self._cache:
+            return self._cache[signature]
+
+        cell_metrics = QFontMetrics(font)
+        header_metrics = QFontMetrics(header_font)
+        sample = dataframe.iloc[self._sample_positions(len(dataframe))]
+
+        widths = []
+        for col_idx, column in enumerate(dataframe.columns):
+            width = header_metrics.horizontalAdvance(str(column))
+            for value in sample.iloc[:, col_idx]:
+                width = max(width, cell_metrics.horizontalAdvance(self.formatter(value)))
+            widths.append(min(max(width + self.PADDING, self.MIN_WIDTH), self.MAX_WIDTH))
+
+        self._cache[signature] = widths
+        logger.debug(f"📏 Column widths estimated from {len(sample)} sampled rows")
+        return widths
+
+    def apply(self, table_view, dataframe, signature: Tuple):
+        """Applique les largeurs estimées à un QTableView"""
+        header = table_view.horizontalHeader()
+        widths = self.estimate(dataframe, signature, table_view.font(), header.font())
+        for col_idx, width in enumerate(widths):
+            header.resizeSection(col_idx, width)
+
+    def clear(self):
+        """Vide le cache des largeurs"""
+        self._cache.clear()
+
+    def _sample_positions(self, row_count: int):
+        """Positions échantillonnées : début, fin et tirage aléatoire reproductible"""
+        import numpy as np
+        if row_count <= self.HEAD_ROWS + self.TAIL_ROWS + self.RANDOM_ROWS:
+            return np.arange(row_count)
+
+        head = np.arange(self.HEAD_ROWS)
+        tail = np.arange(row_count - self.TAIL_ROWS, row_count)
+        rng = np.random.default_rng(row_count)
+        middle = rng.choice(
+            np.arange(self.HEAD_ROWS, row_count - self.TAIL_ROWS),
+            size=self.RANDOM_ROWS,
+            replace=False
+        )
+        return np.unique(np.concatenate([head, middle, tail]))
@@ -6,32 +6,59 @@ from PySide6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout,
                                QComboBox, QDateTimeEdit, QPushButton,
                                QProgressBar, QTableView, QTabWidget,
                                QWidget, QLabel, QSplitter, QMessageBox,
-                               QHeaderView)
-from PySide6.QtCore import Signal, QDateTime, Qt
+                               QHeaderView, QFileDialog)
+from PySide6.QtCore import Signal, QDateTime, Qt, QTimer
 from PySide6.QtGui import QStandardItemModel, QStandardItem, QFont
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import pandas as pd
 import logging
+from typing import TYPE_CHECKING
 
-# Import du constructeur de vues
-from .views_construct import AdvancedViewCreatorDialog
+from .column_sizer import ColumnWidthEstimator
+
+# Modules lourds chargés à la première utilisation (démarrage plus rapide) :
+# pandas à l'arrivée des premières données, matplotlib à l'ouverture de
+# l'onglet graphique, le constructeur de vues au clic sur son bouton
+if TYPE_CHECKING:
+    import pandas as pd
 
 logger = logging.getLogger(__name__)
 
+def format_cell_value(value) -> str:
+    """Formatage d'une valeur pour affichage dans le tableau"""
+    import pandas as pd  # Déjà chargé dès que des données sont affichées
+    if pd.isna(value):
+        return ""
+    elif isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
 class MainWindow(QMainWindow):
     """Main window of the BI application"""
     
+    # Nombre maximal de lignes affichées dans le tableau
+    DISPLAY_LIMIT = 1000
+    # Délai de regroupement des rafraîchissements du graphique en réception progressive (ms)
+    STREAM_CHART_REFRESH_MS = 500
+    
     # Signaux émis vers le contrôleur
     report_selected = Signal(str)  # Nom de la VIEW sélectionnée
     generate_clicked = Signal(dict)  # Paramètres complets d'analyse
     filters_changed = Signal(dict)  # Changement de filtres
     view_structure_requested = Signal(str)  # Demande structure VIEW
+    export_requested = Signal(dict)  # Export complet (path, format)
+    report_hovered = Signal(str)  # Nom de la VIEW survolée dans la liste
     
     def __init__(self, database_manager=None, analysis_engine=None):
         super().__init__()
-        self.current_data = pd.DataFrame()  # Données actuelles
+        self.current_data = None  # Données actuelles (DataFrame)
+        self.current_schema = None  # Schéma typé des données actuelles (rôles, index temporel)
+        self.column_sizer = ColumnWidthEstimator(format_cell_value)
+        
+        # Réception progressive : blocs pas encore fusionnés dans current_data
+        self._pending_chunks = []
+        self.stream_chart_timer = QTimer(self)
+        self.stream_chart_timer.setSingleShot(True)
+        self.stream_chart_timer.setInterval(self.STREAM_CHART_REFRESH_MS)
+        self.stream_chart_timer.timeout.connect(self._refresh_streamed_chart)
         
         # Services injectés pour accès aux données
         self.database_manager = database_manager
@@ -115,6 +142,7 @@ class MainWindow(QMainWindow):
         self.combo_views = QComboBox()
         self.combo_views.setMinimumWidth(350)
         self.combo_views.setToolTip(self.tr("Select the report to analyze"))
+        self.combo_views.view().setMouseTracking(True)  # Survol des rapports (préchargement)
         layout.addWidget(self.combo_views)
         
         layout.addSpacing(20)
@@ -206,6 +234,11 @@ class MainWindow(QMainWindow):
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
         self.table_view.setSelectionBehavior(QTableView.SelectRows)
         
+        # Menu contextuel des en-têtes : ajustement précis à la demande
+        header = self.table_view.horizontalHeader()
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self.on_header_context_menu)
+        
         self.tab_widget.addTab(self.table_view, self.tr("📋 Data"))
     
     def setup_chart_tab(self):
@@ -281,10 +314,12 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(controls_frame)
         
-        # === ZONE MATPLOTLIB ===
-        self.figure = Figure(figsize=(15, 8))
-        self.canvas = FigureCanvas(self.figure)
-        layout.addWidget(self.canvas)
+        # === ZONE MATPLOTLIB (créée à la première ouverture de l'onglet) ===
+        self.figure = None
+        self.canvas = None
+        self._chart_dirty = False  # Graphique à redessiner à l'ouverture de l'onglet
+        self.chart_layout = layout
+        self.chart_tab = chart_widget
         
         self.tab_widget.addTab(chart_widget, "📈 Graphiques")
     
@@ -321,11 +356,16 @@ class MainWindow(QMainWindow):
         self.combo_views.currentTextChanged.connect(
             lambda text: self.report_selected.emit(text) if text else None
         )
+        self.combo_views.view().entered.connect(self.on_report_hovered)
         
         # Actions utilisateur
         self.btn_generate.clicked.connect(self.on_generate_clicked)
         self.btn_refresh.clicked.connect(self.on_refresh_clicked)
         self.btn_view_constructor.clicked.connect(self.on_view_constructor_clicked)
+        self.btn_export.clicked.connect(self.on_export_clicked)
+        
+        # Ouverture de l'onglet graphique (création différée du canevas)
+        self.tab_widget.currentChanged.connect(self.on_tab_changed)
         
         # Changements de filtres
         self.date_start.dateTimeChanged.connect(self.on_filters_changed)
@@ -352,22 +392,42 @@ class MainWindow(QMainWindow):
             self.show_warning(self.tr("Please select a report"))
             return
         
-        params = {
-            'view_name': self.combo_views.currentText(),
-            'date_start': self.date_start.dateTime().toPython(),
-            'date_end': self.date_end.dateTime().toPython(),
-            'filters': self.get_current_filters()
-        }
-        self.generate_clicked.emit(params)
+        self.generate_clicked.emit(self.get_analysis_params(self.combo_views.currentText()))
+    
+    def on_report_hovered(self, index):
+        """Survol d'un rapport dans la liste déroulante"""
+        view_name = index.data(Qt.UserRole)
+        if view_name:
+            self.report_hovered.emit(view_name)
     
     def on_refresh_clicked(self):
         """Gestion du clic sur Actualiser"""
         # Signal pour actualiser les VIEWs
         self.view_structure_requested.emit("refresh")
     
+    def on_export_clicked(self):
+        """Choix du fichier d'export (résultat complet, relu depuis la base)"""
+        from ..models.export_pipeline import EXPORT_FORMATS  # pandas déjà chargé avec les données
+        
+        filters = {label: fmt for fmt, label in EXPORT_FORMATS.items()}
+        default_name = f"{self.combo_views.currentText() or 'export'}.csv"
+        path, selected_filter = QFileDialog.getSaveFileName(
+            self, self.tr("📊 Export data"), default_name, ";;".join(filters)
+        )
+        if not path:
+            return
+        
+        export_format = filters.get(selected_filter, 'csv')
+        if not path.lower().endswith(f".{export_format}"):
+            path += f".{export_format}"
+        
+        self.export_requested.emit({'path': path, 'format': export_format})
+    
     def on_view_constructor_clicked(self):
         """Gestion du clic sur le constructeur de vues"""
         try:
+            from .views_construct import AdvancedViewCreatorDialog
+            
             # Créer et afficher le dialogue du constructeur de vues
             constructor_dialog = AdvancedViewCreatorDialog(self, self.database_manager, self.analysis_engine)
             
@@ -386,6 +446,18 @@ class MainWindow(QMainWindow):
             logger.error(f"❌ Erreur lors de l'ouverture du constructeur de vues: {e}")
             self.show_error(f"Impossible d'ouvrir le constructeur de vues: {e}")
     
+    def on_header_context_menu(self, position):
+        """Menu contextuel des en-têtes du tableau"""
+        from PySide6.QtWidgets import QMenu
+        menu = QMenu(self)
+        fit_action = menu.addAction(self.tr("↔️ Fit columns to contents"))
+        fit_action.triggered.connect(self.resize_columns_precisely)
+        menu.exec(self.table_view.horizontalHeader().mapToGlobal(position))
+    
+    def resize_columns_precisely(self):
+        """Ajustement exact des colonnes (mesure de toutes les cellules affichées)"""
+        self.table_view.resizeColumnsToContents()
+    
     def on_filters_changed(self):
         """Gestion du changement des filtres"""
         filters = self.get_current_filters()
@@ -393,12 +465,22 @@ class MainWindow(QMainWindow):
     
     def on_chart_type_changed(self):
         """Gestion du changement de type de graphique"""
-        if not self.current_data.empty:
+        if self.has_data():
             self.display_chart(self.current_data, self.get_chart_type())
     
+    def on_tab_changed(self, index: int):
+        """Première ouverture de l'onglet graphique : création du canevas et dessin différé"""
+        if self.tab_widget.widget(index) is not self.chart_tab:
+            return
+        self._ensure_chart_canvas()
+        if self._chart_dirty:
+            self._chart_dirty = False
+            if self.has_data():
+                self._refresh_chart()
+    
     def on_generate_chart_clicked(self):
         """Gestion du clic sur génération manuelle de graphique"""
-        if self.current_data.empty:
+        if not self.has_data():
             self.show_warning(self.tr("No data available to generate a chart"))
             return
         
@@ -420,12 +502,25 @@ class MainWindow(QMainWindow):
         # Actualisation automatique si activée
         if (hasattr(self, 'checkbox_auto_refresh') and 
             self.checkbox_auto_refresh.isChecked() and 
-            not self.current_data.empty and
+            self.has_data() and
             self.combo_column_x.currentText() and 
             self.combo_column_y1.currentText()):
             logger.debug("Auto-refresh activé, génération du graphique...")
             self.display_chart_with_columns()
     
+    def has_data(self) -> bool:
+        """Indique si des données sont affichées"""
+        return self.current_data is not None and not self.current_data.empty
+    
+    def get_analysis_params(self, view_name: str) -> dict:
+        """Paramètres d'analyse d'une VIEW avec les filtres actuels"""
+        return {
+            'view_name': view_name,
+            'date_start': self.date_start.dateTime().toPython(),
+            'date_end': self.date_end.dateTime().toPython(),
+            'filters': self.get_current_filters()
+        }
+    
     def get_current_filters(self) -> dict:
         """Récupération des filtres actuels"""
         return {
@@ -484,11 +579,17 @@ class MainWindow(QMainWindow):
         self.btn_refresh.setEnabled(True)
         self.lbl_status.setText(self.tr("Ready"))
     
-    def display_data(self, dataframe: pd.DataFrame):
+    def display_data(self, dataframe: 'pd.DataFrame'):
         """Display data in the table"""
         try:
-            # Sauvegarde des données actuelles
-            self.current_data = dataframe.copy()
+            # Abandon d'une éventuelle réception progressive en cours
+            self.stream_chart_timer.stop()
+            self._pending_chunks = []
+            
+            from ..models.result_schema import infer_result_schema
+            
+            # Sauvegarde des données actuelles (colonnes temporelles typées une seule fois)
+            self.current_data, self.current_schema = infer_result_schema(dataframe)
             
             # === POPULATION DES SÉLECTEURS DE COLONNES ===
             self.populate_column_selectors(dataframe)
@@ -506,27 +607,13 @@ class MainWindow(QMainWindow):
             self.table_model.setHorizontalHeaderLabels(headers)
             
             # Limitation d'affichage pour performance
-            display_limit = 1000
-            display_df = dataframe.head(display_limit)
+            display_df = dataframe.head(self.DISPLAY_LIMIT)
             
             # Remplissage des données
-            for row_idx, row in display_df.iterrows():
-                items = []
-                for col_val in row:
-                    # Formatage des valeurs
-                    if pd.isna(col_val):
-                        display_val = ""
-                    elif isinstance(col_val, float):
-                        display_val = f"{col_val:.2f}"
-                    else:
-                        display_val = str(col_val)
-                    
-                    item = QStandardItem(display_val)
-                    items.append(item)
-                self.table_model.appendRow(items)
+            self._append_table_rows(display_df)
             
-            # Ajustement automatique des colonnes
-            self.table_view.resizeColumnsToContents()
+            # Ajustement des colonnes estimé sur un échantillon (mis en cache par schéma)
+            self.column_sizer.apply(self.table_view, display_df, self.current_schema.signature)
             
             # Mise à jour des compteurs
             total_rows = len(dataframe)
@@ -540,13 +627,7 @@ class MainWindow(QMainWindow):
             self.btn_export.setEnabled(True)
             
             # === GÉNÉRATION AUTOMATIQUE DU GRAPHIQUE ===
-            # Si l'auto-refresh est activé et que des colonnes sont sélectionnées
-            if (hasattr(self, 'checkbox_auto_refresh') and 
-                self.checkbox_auto_refresh.isChecked()):
-                self.display_chart_with_columns()
-            else:
-                # Sinon, graphique par défaut avec les 2 premières colonnes
-                self.display_chart(dataframe, self.get_chart_type())
+            self._refresh_chart()
             
             logger.info(f"📊 Data displayed: {displayed_rows} rows")
             
@@ -554,8 +635,116 @@ class MainWindow(QMainWindow):
             logger.error(f"❌ Error displaying data: {e}")
             self.show_error(f"Display error: {e}")
     
-    def display_chart(self, dataframe: pd.DataFrame, chart_type: str = 'line'):
+    def append_data(self, chunk: 'pd.DataFrame'):
+        """
+        Ajoute un bloc de lignes reçu pendant l'analyse
+        
+        Le tableau est complété jusqu'à la limite d'affichage ; le graphique
+        est redessiné au plus toutes les STREAM_CHART_REFRESH_MS.
+        """
+        if self.current_schema is None or chunk.empty:
+            return
+        
+        try:
+            chunk = self.current_schema.conform(chunk)
+            self._pending_chunks.append(chunk)
+            
+            shown_rows = self.table_model.rowCount()
+            if shown_rows < self.DISPLAY_LIMIT:
+                self._append_table_rows(chunk.head(self.DISPLAY_LIMIT - shown_rows))
+            
+            received = len(self.current_data) + sum(len(c) for c in self._pending_chunks)
+            self.lbl_row_count.setText(self.tr(f"{received} rows (loading...)"))
+            
+            if not self.stream_chart_timer.isActive():
+                self.stream_chart_timer.start()
+                
+        except Exception as e:
+            logger.error(f"❌ Error appending data: {e}")
+    
+    def finish_data(self, dataframe: 'pd.DataFrame'):
+        """
+        Fin de la réception progressive : résultat complet
+        
+        Le tableau déjà rempli est conservé, le schéma est recalculé une fois
+        sur l'ensemble des lignes et le graphique redessiné.
+        """
+        self.stream_chart_timer.stop()
+        self._pending_chunks = []
+        
+        try:
+            from ..models.result_schema import infer_result_schema
+            
+            self.current_data, self.current_schema = infer_result_schema(dataframe)
+            
+            total_rows = len(dataframe)
+            displayed_rows = self.table_model.rowCount()
+            if total_rows > displayed_rows:
+                self.lbl_row_count.setText(self.tr(f"{displayed_rows}/{total_rows} rows (limited)"))
+            else:
+                self.lbl_row_count.setText(f"{total_rows} rows")
+            
+            self.btn_export.setEnabled(total_rows > 0)
+            self._refresh_chart()
+            
+            logger.info(f"📊 Progressive display completed: {total_rows} rows")
+            
+        except Exception as e:
+            logger.error(f"❌ Error finalizing data: {e}")
+            self.show_error(f"Display error: {e}")
+    
+    def _append_table_rows(self, dataframe: 'pd.DataFrame'):
+        """Ajout de lignes au modèle du tableau"""
+        for row in dataframe.itertuples(index=False, name=None):
+            self.table_model.appendRow([QStandardItem(format_cell_value(v)) for v in row])
+    
+    def _refresh_streamed_chart(self):
+        """Fusion des blocs reçus et mise à jour du graphique"""
+        if not self._pending_chunks:
+            return
+        import pandas as pd
+        self.current_data = pd.concat([self.current_data] + self._pending_chunks, ignore_index=True)
+        self._pending_chunks = []
+        self._refresh_chart()
+    
+    def _ensure_chart_canvas(self):
+        """Création du canevas matplotlib (import du backend à la première utilisation)"""
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+        
+        self.figure = Figure(figsize=(15, 8))
+        self.canvas = FigureCanvas(self.figure)
+        self.chart_layout.addWidget(self.canvas)
+        logger.info("📈 Chart canvas created")
+    
+    def _chart_visible(self) -> bool:
+        """
+        Indique si le graphique peut être dessiné maintenant
+        
+        Onglet graphique masqué : le dessin est reporté à son ouverture.
+        """
+        if self.tab_widget.currentWidget() is not self.chart_tab:
+            self._chart_dirty = True
+            return False
+        self._ensure_chart_canvas()
+        return True
+    
+    def _refresh_chart(self):
+        """Graphique des données actuelles (colonnes choisies ou 2 premières colonnes)"""
+        # Si l'auto-refresh est activé et que des colonnes sont sélectionnées
+        if (hasattr(self, 'checkbox_auto_refresh') and 
+            self.checkbox_auto_refresh.isChecked()):
+            self.display_chart_with_columns()
+        else:
+            # Sinon, graphique par défaut avec les 2 premières colonnes
+            self.display_chart(self.current_data, self.get_chart_type())
+    
+    def display_chart(self, dataframe: 'pd.DataFrame', chart_type: str = 'line'):
         """Generate and display chart"""
+        if not self._chart_visible():
+            return
         try:
             self.figure.clear()
             
@@ -608,7 +797,7 @@ class MainWindow(QMainWindow):
                    transform=ax.transAxes, fontsize=10, color='red')
             self.canvas.draw()
     
-    def populate_column_selectors(self, dataframe: pd.DataFrame):
+    def populate_column_selectors(self, dataframe: 'pd.DataFrame'):
         """Populate column selectors with DataFrame headers"""
         if dataframe.empty:
             # Vider les combobox si pas de données
@@ -647,42 +836,25 @@ class MainWindow(QMainWindow):
     
     def display_chart_with_columns(self):
         """Generate a custom chart with selected columns"""
+        if not self._chart_visible():
+            return
         try:
             if self.current_data is None or self.current_data.empty:
                 logger.warning("⚠️ No data available for chart")
                 return
             
             # === GÉNÉRATION DU DATAFRAME FILTRÉ ENTRE DATES ===
-            filtered_df = self.current_data.copy()
+            filtered_df = self.current_data
             
             # Récupération des dates de filtrage
             start_date = self.date_start.date().toPython()
             end_date = self.date_end.date().toPython()
             
-            # Détection de la colonne de date dans le DataFrame
-            date_columns = []
-            for col in filtered_df.columns:
-                if filtered_df[col].dtype in ['datetime64[ns]', 'object']:
-                    try:
-                        # Test de conversion en datetime
-                        sample_val = filtered_df[col].dropna().iloc[0] if not filtered_df[col].dropna().empty else None
-                        if sample_val and pd.to_datetime(sample_val, errors='coerce') is not pd.NaT:
-                            date_columns.append(col)
-                    except:
-                        continue
-            
-            # Filtrage par dates si une colonne de date est trouvée
-            if date_columns:
-                date_col = date_columns[0]  # Utilisation de la première colonne de date trouvée
+            # Filtrage par dates sur l'axe temporel détecté à la réception des données
+            date_col = self.current_schema.time_axis if self.current_schema else None
+            if date_col:
                 try:
-                    # Conversion en datetime si nécessaire
-                    if filtered_df[date_col].dtype == 'object':
-                        filtered_df[date_col] = pd.to_datetime(filtered_df[date_col], errors='coerce')
-                    
-                    # Application du filtre
-                    mask = (filtered_df[date_col].dt.date >= start_date) & (filtered_df[date_col].dt.date <= end_date)
-                    filtered_df = filtered_df[mask]
-                    
+                    filtered_df = self.current_schema.slice_date_range(filtered_df, start_date, end_date)
                     logger.info(f"📅 Date filtering: {len(filtered_df)} rows retained on column '{date_col}'")
                 except Exception as e:
                     logger.warning(f"⚠️ Unable to filter by dates: {e}")
@@ -843,7 +1015,9 @@ class MainWindow(QMainWindow):
             
             # Rotation des labels X si nombreux
             if len(x_data) > 10:
-                plt.setp(ax1.get_xticklabels(), rotation=45, ha='right')
+                for label in ax1.get_xticklabels():
+                    label.set_rotation(45)
+                    label.set_horizontalalignment('right')
             
             # Ajustement du layout
             self.figure.tight_layout()
@@ -18,11 +18,12 @@ from PySide6.QtWidgets import (
     QCheckBox, QSpinBox, QDateEdit, QLineEdit, QTabWidget, QMessageBox,
     QTableWidget, QTableWidgetItem, QHeaderView
 )
-from PySide6.QtCore import Qt, QSize, Signal, QDate
+from PySide6.QtCore import Qt, QSize, Signal, QDate, QThread, QTimer
 from PySide6.QtGui import QFont, QIcon
 import json
 import logging
 from datetime import datetime, timedelta
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +31,194 @@ logger = logging.getLogger(__name__)
 from ..models.database_manager import DatabaseManager
 from ..models.view_manager import ViewManager
 from ..models.view_crud_manager import ViewCrudManager
-from ..models.view_builder import ViewBuilder, ViewDefinition, ModuleType
+from ..models.view_builder import ViewBuilder, ViewDefinition, ModuleType, ViewStorage
+from ..models.query_plan import QueryPlan, assess_plan
+from ..models.index_advisor import IndexAdvisor
 import pandas as pd
 
+# Délai sans modification avant l'estimation du planificateur (millisecondes)
+PLAN_PREVIEW_DELAY_MS = 500
+
+class QueryPlanWorker(QThread):
+    """Worker thread pour l'estimation du planificateur (EXPLAIN, rien n'est exécuté)"""
+    
+    # Signaux
+    plan_ready = Signal(int, object)  # Numéro de demande, QueryPlan
+    plan_failed = Signal(int, str)  # Numéro de demande, message d'erreur
+    
+    def __init__(self, database_manager: DatabaseManager, query: str, sequence: int):
+        super().__init__()
+        self.database_manager = database_manager
+        self.query = query
+        self.sequence = sequence
+    
+    def run(self):
+        try:
+            plan = QueryPlan.from_explain(self.database_manager.explain(self.query))
+            self.plan_ready.emit(self.sequence, plan)
+        except Exception as e:
+            self.plan_failed.emit(self.sequence, str(e))
+
+class IndexAdvisorWorker(QThread):
+    """Worker thread pour le conseiller d'index (EXPLAIN avant / après chaque index)"""
+    
+    # Signaux
+    advice_ready = Signal(list)  # IndexProposal mesurées
+    error_occurred = Signal(str)  # Message d'erreur
+    
+    def __init__(self, advisor: IndexAdvisor, view_def: ViewDefinition):
+        super().__init__()
+        self.advisor = advisor
+        self.view_def = view_def
+    
+    def run(self):
+        try:
+            self.advice_ready.emit(self.advisor.advise(self.view_def))
+        except Exception as e:
+            error_msg = f"Erreur du conseiller d'index: {str(e)}"
+            self.error_occurred.emit(error_msg)
+            logger.error(error_msg)
+
+class IndexBuildWorker(QThread):
+    """Worker thread pour la création des index retenus (CREATE INDEX CONCURRENTLY)"""
+    
+    # Signaux
+    index_started = Signal(str)  # Nom de l'index en construction
+    index_created = Signal(str)  # Nom de l'index créé
+    index_failed = Signal(str, str)  # Nom de l'index, message d'erreur
+    
+    def __init__(self, advisor: IndexAdvisor, proposals: list):
+        super().__init__()
+        self.advisor = advisor
+        self.proposals = proposals
+    
+    def run(self):
+        # Index construits l'un après l'autre : un échec n'arrête pas les suivants
+        for proposal in self.proposals:
+            self.index_started.emit(proposal.name)
+            try:
+                self.advisor.create_index(proposal)
+                self.index_created.emit(proposal.name)
+            except Exception as e:
+                logger.error(f"❌ Index build failed for {proposal.name}: {e}")
+                self.index_failed.emit(proposal.name, str(e))
+
+class IndexProposalsDialog(QDialog):
+    """Index proposés pour une vue ; les index cochés sont créés après confirmation"""
+    
+    def __init__(self, advisor: IndexAdvisor, proposals: list, parent=None):
+        super().__init__(parent)
+        self.advisor = advisor
+        self.proposals = proposals
+        self._build_worker = None
+        self._build_errors = []
+        self._built = 0
+        self.setWindowTitle("🧭 Conseiller d'index")
+        self.resize(900, 360)
+        
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel(
+            "Coût estimé de la requête de la vue sans puis avec chaque index.\n"
+            "Les index cochés sont créés avec CREATE INDEX CONCURRENTLY (écritures non bloquées)."
+        ))
+        
+        self.table = QTableWidget(len(proposals), 6)
+        self.table.setHorizontalHeaderLabels(["Créer", "Index", "Type", "Motif", "Coût avant → après", "Mesure"])
+        self.table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
+        for row, proposal in enumerate(proposals):
+            check = QTableWidgetItem()
+            check.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+            check.setCheckState(Qt.Checked if advisor.is_recommended(proposal) else Qt.Unchecked)
+            self.table.setItem(row, 0, check)
+            self.table.setItem(row, 1, QTableWidgetItem(f"{proposal.table}({proposal.column})"))
+            method = f"{proposal.method} {proposal.opclass}" if proposal.opclass else proposal.method
+            self.table.setItem(row, 2, QTableWidgetItem(method))
+            self.table.setItem(row, 3, QTableWidgetItem(proposal.reason))
+            if proposal.improvement is not None:
+                cost = f"{proposal.cost_before:,.0f} → {proposal.cost_after:,.0f} (-{proposal.improvement:.0%})"
+            else:
+                cost = "-"
+            self.table.setItem(row, 4, QTableWidgetItem(cost))
+            self.table.setItem(row, 5, QTableWidgetItem(proposal.measured_with or "; ".join(proposal.notes)))
+        layout.addWidget(self.table)
+        
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addStretch()
+        self.create_btn = QPushButton("🛠️ Créer les index cochés")
+        self.create_btn.setEnabled(bool(proposals))
+        self.create_btn.clicked.connect(self._create_selected)
+        buttons_layout.addWidget(self.create_btn)
+        self.close_btn = QPushButton("Fermer")
+        self.close_btn.clicked.connect(self.reject)
+        buttons_layout.addWidget(self.close_btn)
+        layout.addLayout(buttons_layout)
+        self.setLayout(layout)
+    
+    def _create_selected(self):
+        selected = [proposal for row, proposal in enumerate(self.proposals)
+                    if self.table.item(row, 0).checkState() == Qt.Checked]
+        if not selected:
+            return
+        answer = QMessageBox.question(
+            self,
+            "Créer les index",
+            "\n".join(proposal.create_sql() for proposal in selected) +
+            "\n\nLa construction peut être longue sur une grande table. Continuer ?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if answer != QMessageBox.Yes:
+            return
+        
+        # Construction en arrière-plan : l'interface reste réactive pendant CREATE INDEX
+        self._build_errors = []
+        self._built = 0
+        self.create_btn.setEnabled(False)
+        self.close_btn.setEnabled(False)
+        self.table.setEnabled(False)
+        self._build_worker = IndexBuildWorker(self.advisor, selected)
+        self._build_worker.index_started.connect(self._on_index_started)
+        self._build_worker.index_created.connect(self._on_index_created)
+        self._build_worker.index_failed.connect(self._on_index_failed)
+        self._build_worker.finished.connect(self._on_build_finished)
+        self._build_worker.start()
+    
+    def _on_index_started(self, name: str):
+        self.status_label.setText(f"⏳ Construction de {name}...")
+    
+    def _on_index_created(self, name: str):
+        self._built += 1
+    
+    def _on_index_failed(self, name: str, message: str):
+        self._build_errors.append(f"{name}: {message}")
+    
+    def _on_build_finished(self):
+        worker = self.sender()
+        if worker is self._build_worker:
+            self._build_worker = None
+        if worker is not None:
+            worker.deleteLater()
+        
+        self.status_label.setText("")
+        self.close_btn.setEnabled(True)
+        if self._build_errors:
+            self.create_btn.setEnabled(True)
+            self.table.setEnabled(True)
+            QMessageBox.warning(self, "Index", "❌ Création impossible:\n" + "\n".join(self._build_errors))
+        else:
+            QMessageBox.information(self, "Index", f"✅ {self._built} index créé(s)")
+            self.accept()
+    
+    def done(self, result):
+        # Fermeture refusée pendant la construction (Échap, croix de la fenêtre)
+        if self._build_worker is not None and self._build_worker.isRunning():
+            self.status_label.setText("⏳ Construction en cours, fermeture possible à la fin")
+            return
+        super().done(result)
+
 class AdvancedViewCreatorDialog(QDialog):
     """Dialog avancé pour créer des vues personnalisées avec agrégations"""
     
@@ -69,9 +255,21 @@ class AdvancedViewCreatorDialog(QDialog):
         self.review_comments = ""
         self.review_status = "draft"  # draft, reviewed, approved
         
+        # Estimation du planificateur : relancée après une pause dans la saisie ;
+        # seul le résultat de la dernière demande est affiché
+        self._plan_timer = QTimer(self)
+        self._plan_timer.setSingleShot(True)
+        self._plan_timer.setInterval(PLAN_PREVIEW_DELAY_MS)
+        self._plan_timer.timeout.connect(self._start_plan_preview)
+        self._plan_sequence = 0
+        self._plan_workers = []
+        self._plan_query = None  # Requête de la dernière demande d'estimation
+        self._last_plan = None  # (requête, plan, erreur) de la dernière estimation reçue
+        self._pending_save = None  # Définition enregistrée dès réception de son estimation
+        
         # Initialiser les gestionnaires
         try:
-            self.view_builder = ViewBuilder()
+            self.view_builder = ViewBuilder(self.database_manager)
             self.view_crud_manager = ViewCrudManager()
         except Exception as e:
             logger.error(f"Erreur initialisation gestionnaires: {e}")
@@ -99,6 +297,10 @@ class AdvancedViewCreatorDialog(QDialog):
         if not self.database_manager:
             return self._load_sample_tables()
         
+        # Métadonnées du catalogue partagées, champs lus à l'ouverture de chaque table
+        if self.view_builder:
+            return self.view_builder.tables_metadata
+        
         try:
             tables_metadata = self.database_manager.get_tables_metadata()
             tables_data = {}
@@ -329,6 +531,24 @@ class AdvancedViewCreatorDialog(QDialog):
         grouping_layout.addWidget(self.grouping_combo)
         step2_layout.addLayout(grouping_layout)
         
+        # Mode de stockage de la vue
+        storage_layout = QHBoxLayout()
+        storage_layout.addWidget(QLabel("Stockage:"))
+        self.storage_combo = QComboBox()
+        self.storage_combo.addItem("👁️ Vue simple (calcul à chaque lecture)", ViewStorage.VIEW)
+        self.storage_combo.addItem("💾 Vue matérialisée", ViewStorage.MATERIALIZED)
+        self.storage_combo.addItem("⚡ Vue matérialisée indexée (rafraîchissement non bloquant)",
+                                   ViewStorage.MATERIALIZED_INDEXED)
+        self.storage_combo.addItem("📦 Cumul journalier (KPI temporels, lecture immédiate)", ViewStorage.ROLLUP)
+        self.storage_combo.setToolTip(
+            "L'index unique sur la clé de groupement permet REFRESH ... CONCURRENTLY :\n"
+            "les lectures ne sont pas bloquées pendant le rafraîchissement.\n"
+            "Le cumul journalier stocke une ligne par jour, regroupée par semaine, mois,\n"
+            "trimestre ou année ; seuls les derniers jours sont recalculés au rafraîchissement."
+        )
+        storage_layout.addWidget(self.storage_combo)
+        step2_layout.addLayout(storage_layout)
+        
         # Champs Y (axes verticaux)
         y_layout = QVBoxLayout()
         y_layout.addWidget(QLabel("Axes Y (verticaux):"))
@@ -610,6 +830,25 @@ class AdvancedViewCreatorDialog(QDialog):
         info_group.setLayout(info_layout)
         layout.addWidget(info_group)
         
+        # Estimation du planificateur (lignes, coût, accès aux tables)
+        plan_group = QGroupBox("🧮 Estimation du Planificateur")
+        plan_layout = QVBoxLayout()
+        
+        self.plan_summary_label = QLabel("Estimation disponible avec une connexion à la base")
+        self.plan_summary_label.setWordWrap(True)
+        plan_layout.addWidget(self.plan_summary_label)
+        
+        self.plan_paths_label = QLabel("")
+        self.plan_paths_label.setWordWrap(True)
+        plan_layout.addWidget(self.plan_paths_label)
+        
+        self.plan_flags_label = QLabel("")
+        self.plan_flags_label.setWordWrap(True)
+        plan_layout.addWidget(self.plan_flags_label)
+        
+        plan_group.setLayout(plan_layout)
+        layout.addWidget(plan_group)
+        
         # Boutons d'action
         buttons_layout = QHBoxLayout()
         
@@ -656,6 +895,12 @@ class AdvancedViewCreatorDialog(QDialog):
         self.save_btn.clicked.connect(self._save_view)
         buttons_layout.addWidget(self.save_btn)
         
+        self.index_advisor_btn = QPushButton("🧭 Conseiller d'index")
+        self.index_advisor_btn.setEnabled(False)
+        self.index_advisor_btn.setToolTip("Index utiles aux filtres et groupements de la vue, coût mesuré avant / après")
+        self.index_advisor_btn.clicked.connect(self._run_index_advisor)
+        buttons_layout.addWidget(self.index_advisor_btn)
+        
         layout.addLayout(buttons_layout)
         
         widget.setLayout(layout)
@@ -814,6 +1059,7 @@ class AdvancedViewCreatorDialog(QDialog):
         self.y2_field_combo.currentIndexChanged.connect(self._on_field_changed)
         self.y3_field_combo.currentIndexChanged.connect(self._on_field_changed)
         self.grouping_combo.currentIndexChanged.connect(self._on_field_changed)
+        self.storage_combo.currentIndexChanged.connect(self._on_field_changed)
         
         # Signaux pour les agrégations
         self.y1_agg_combo.currentIndexChanged.connect(self._on_field_changed)
@@ -953,6 +1199,8 @@ class AdvancedViewCreatorDialog(QDialog):
         
         self.preview_btn.setEnabled(form_valid)
         self.save_btn.setEnabled(form_valid)
+        if hasattr(self, 'index_advisor_btn'):
+            self.index_advisor_btn.setEnabled(form_valid and self.database_manager is not None)
         
         if form_valid:
             self._generate_preview()
@@ -963,6 +1211,8 @@ class AdvancedViewCreatorDialog(QDialog):
             self.sql_preview.setPlainText("-- Sélectionnez une table et un champ X pour générer la prévisualisation")
             return
         
+        self._schedule_plan_preview()
+        
         try:
             # Utiliser ViewBuilder si disponible
             if self.view_builder:
@@ -1048,7 +1298,8 @@ class AdvancedViewCreatorDialog(QDialog):
                     grouping=grouping,
                     filters=filters,
                     secondary_table=self.selected_table2,
-                    module_type=ModuleType.AGGREGATION
+                    module_type=ModuleType.AGGREGATION,
+                    storage=self.storage_combo.currentData() or ViewStorage.VIEW
                 )
             else:
                 # Fallback: créer un objet simple pour le mode hors ligne
@@ -1084,6 +1335,8 @@ class AdvancedViewCreatorDialog(QDialog):
         
         self.preview_btn.setEnabled(form_valid)
         self.save_btn.setEnabled(form_valid)
+        if hasattr(self, 'index_advisor_btn'):
+            self.index_advisor_btn.setEnabled(form_valid and self.database_manager is not None)
         
         if form_valid:
             self._generate_preview()
@@ -1093,6 +1346,8 @@ class AdvancedViewCreatorDialog(QDialog):
         if not self.selected_table1:
             return
         
+        self._schedule_plan_preview()
+        
         table_name = self.selected_table1
         x_field = self.x_field_combo.currentData()
         y1_field = self.y1_field_combo.currentData()
@@ -1267,6 +1522,93 @@ class AdvancedViewCreatorDialog(QDialog):
         # Basculer vers l'onglet relecture
         self.tabs.setCurrentIndex(4)  # Index de l'onglet relecture
     
+    def _schedule_plan_preview(self):
+        """Relance le délai de l'estimation ; toute estimation en cours devient obsolète"""
+        if not self.database_manager or not hasattr(self.database_manager, 'explain'):
+            return
+        self._plan_sequence += 1
+        self.plan_summary_label.setText("⏳ Estimation en cours...")
+        self._plan_timer.start()
+    
+    def _start_plan_preview(self):
+        """EXPLAIN de la requête courante dans un thread séparé"""
+        view_def = self._create_view_definition() if self.view_builder else None
+        if not view_def:
+            self.plan_summary_label.setText("Définition incomplète : pas d'estimation")
+            self._plan_query = None
+            self._last_plan = (None, None, "Définition incomplète")
+            self._resume_pending_save()
+            return
+        try:
+            query = self.view_builder.build_select_query(view_def)
+        except Exception as e:
+            self._plan_query = None
+            self._on_plan_failed(self._plan_sequence, str(e))
+            return
+        
+        self._plan_query = query
+        worker = QueryPlanWorker(self.database_manager, query, self._plan_sequence)
+        worker.plan_ready.connect(self._on_plan_ready)
+        worker.plan_failed.connect(self._on_plan_failed)
+        worker.finished.connect(self._release_plan_worker)
+        self._plan_workers.append(worker)
+        worker.start()
+    
+    def _release_plan_worker(self):
+        """Libération d'un worker d'estimation terminé"""
+        worker = self.sender()
+        if worker in self._plan_workers:
+            self._plan_workers.remove(worker)
+            worker.deleteLater()
+    
+    def _on_plan_ready(self, sequence: int, plan: QueryPlan):
+        """Affiche l'estimation si elle correspond à la dernière définition"""
+        if sequence != self._plan_sequence:
+            return
+        self._last_plan = (self._plan_query, plan, None)
+        
+        self.plan_summary_label.setText(
+            f"Lignes estimées: ~{plan.plan_rows:,} · Coût total: {plan.total_cost:,.0f} · "
+            f"Nœud racine: {plan.node_type}"
+        )
+        
+        paths = []
+        for path in plan.access_paths():
+            icon = "🐢" if path['full_scan'] else "⚡"
+            via = f" via {path['index']}" if path['index'] else ""
+            paths.append(f"{icon} {path['node_type']} {path['relation']}{via} "
+                         f"(~{path['rows']:,} lignes, coût {path['cost']:,.0f})")
+        self.plan_paths_label.setText("\n".join(paths) or "Aucune lecture de table")
+        
+        config = self.database_manager.config
+        warnings = assess_plan(plan, config.get_plan_cost_warning(), config.get_plan_rows_warning(),
+                               config.get_plan_scan_cost_warning())
+        if warnings:
+            self.plan_flags_label.setStyleSheet("color: #c0392b; font-weight: bold;")
+            self.plan_flags_label.setText("⚠️ " + "\n⚠️ ".join(warnings))
+        else:
+            self.plan_flags_label.setStyleSheet("color: #28a745;")
+            self.plan_flags_label.setText("✅ Aucun signalement")
+        self._resume_pending_save()
+    
+    def _on_plan_failed(self, sequence: int, message: str):
+        if sequence != self._plan_sequence:
+            return
+        self._last_plan = (self._plan_query, None, message)
+        self.plan_summary_label.setText("❌ Requête refusée par le planificateur")
+        self.plan_paths_label.setText(message)
+        self.plan_flags_label.setText("")
+        self._resume_pending_save()
+    
+    def done(self, result):
+        """Fermeture : plus d'estimation planifiée, threads en cours terminés"""
+        self._plan_timer.stop()
+        self._plan_sequence += 1
+        self._pending_save = None
+        for worker in list(self._plan_workers):
+            worker.wait()
+        super().done(result)
+    
     def _update_preview_info(self, view_info: dict):
         """Met à jour les informations de prévisualisation"""
         try:
@@ -1321,6 +1663,105 @@ class AdvancedViewCreatorDialog(QDialog):
         """.strip()
         self.info_label.setText(info_text)
     
+    def _run_index_advisor(self):
+        """Lance le conseiller d'index sur la définition courante (thread séparé)"""
+        if not self.database_manager or not self.view_builder:
+            return
+        view_def = self._create_view_definition()
+        if not view_def:
+            QMessageBox.warning(self, "Erreur", "Impossible de créer la définition de vue")
+            return
+        
+        advisor = IndexAdvisor(self.database_manager, self.view_builder)
+        self.index_advisor_btn.setEnabled(False)
+        self.index_advisor_btn.setText("⏳ Analyse des index...")
+        self._index_worker = IndexAdvisorWorker(advisor, view_def)
+        self._index_worker.advice_ready.connect(
+            lambda proposals: self._show_index_proposals(advisor, proposals))
+        self._index_worker.error_occurred.connect(
+            lambda message: QMessageBox.warning(self, "Conseiller d'index", message))
+        self._index_worker.finished.connect(self._on_index_advisor_finished)
+        self._index_worker.start()
+    
+    def _on_index_advisor_finished(self):
+        self.index_advisor_btn.setText("🧭 Conseiller d'index")
+        self.index_advisor_btn.setEnabled(True)
+    
+    def _show_index_proposals(self, advisor: IndexAdvisor, proposals: list):
+        if not proposals:
+            QMessageBox.information(self, "Conseiller d'index",
+                                    "✅ Les filtres et groupements de la vue sont déjà couverts par des index")
+            return
+        IndexProposalsDialog(advisor, proposals, self).exec()
+    
+    def _save_after_query_plan(self, view_def: ViewDefinition):
+        """
+        Enregistre la vue une fois sa requête vérifiée par le planificateur
+        
+        L'estimation de la prévisualisation est reprise si elle porte sur la même
+        requête ; sinon elle est relancée immédiatement (thread séparé) et
+        l'enregistrement reprend à sa réception.
+        """
+        if not self.database_manager or not hasattr(self.database_manager, 'explain'):
+            self._create_view(view_def)
+            return
+        
+        query = self.view_builder.build_select_query(view_def)
+        if self._last_plan and self._last_plan[0] == query:
+            _, plan, error = self._last_plan
+            if self._confirm_query_plan(plan, error):
+                self._create_view(view_def)
+            return
+        
+        self._pending_save = view_def
+        self.save_btn.setEnabled(False)
+        in_flight = self._plan_query == query and not self._plan_timer.isActive() and self._plan_workers
+        if not in_flight:
+            self._plan_timer.stop()
+            self._plan_sequence += 1
+            self.plan_summary_label.setText("⏳ Estimation en cours...")
+            self._start_plan_preview()
+    
+    def _resume_pending_save(self):
+        """Reprend l'enregistrement en attente de l'estimation qui vient d'arriver"""
+        view_def, self._pending_save = self._pending_save, None
+        if view_def is None:
+            return
+        self.save_btn.setEnabled(True)
+        _, plan, error = self._last_plan
+        if self._confirm_query_plan(plan, error):
+            self._create_view(view_def)
+    
+    def _confirm_query_plan(self, plan: Optional[QueryPlan], error: Optional[str] = None) -> bool:
+        """
+        Décision d'enregistrement d'après l'estimation du planificateur (EXPLAIN, rien n'est exécuté)
+        
+        Args:
+            plan: Plan estimé de la requête de la vue
+            error: Erreur du planificateur si la requête est refusée
+        
+        Returns:
+            False si la requête est invalide ou si l'utilisateur renonce à une vue coûteuse
+        """
+        if plan is None:
+            QMessageBox.warning(self, "Requête invalide", f"La requête de la vue est refusée par la base:\n{error}")
+            return False
+        
+        config = self.database_manager.config
+        warnings = assess_plan(plan, config.get_plan_cost_warning(), config.get_plan_rows_warning())
+        if not warnings:
+            return True
+        
+        answer = QMessageBox.question(
+            self,
+            "Vue coûteuse",
+            "⚠️ " + "\n⚠️ ".join(warnings) +
+            f"\n\nLignes estimées: ~{plan.plan_rows:,}\n\nEnregistrer la vue quand même ?",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        return answer == QMessageBox.Yes
+    
     def _save_view(self):
         """Sauvegarde la vue créée"""
         try:
@@ -1337,45 +1778,9 @@ class AdvancedViewCreatorDialog(QDialog):
                     QMessageBox.warning(self, "Erreur de validation", "\n".join(errors))
                     return
                 
-                # Générer le SQL
-                sql_query = self.view_builder.build_sql_query(view_def)
-                
-                # Créer la vue avec ViewCrudManager
-                success, message = self.view_crud_manager.create_view(
-                    view_def.name,
-                    view_def.main_table,
-                    view_def.x_field,
-                    view_def.y_fields,
-                    view_def.aggregations,
-                    view_def.grouping,
-                    view_def.filters,
-                    sql_query
-                )
+                # Coût estimé par le planificateur (définition coûteuse signalée avant l'enregistrement)
+                self._save_after_query_plan(view_def)
                 
-                if success:
-                    # Créer les données de vue pour compatibilité
-                    view_data = self._create_view_data_from_definition(view_def, sql_query)
-                    
-                    # Ajouter à la liste locale pour relecture
-                    self._add_view_for_review(view_data)
-                    
-                    # Émettre le signal
-                    self.view_created.emit(view_data)
-                    
-                    # Message de succès
-                    QMessageBox.information(
-                        self, 
-                        "Vue créée", 
-                        f"La vue '{view_def.name}' a été créée avec succès !\n\n"
-                        f"Vous pouvez maintenant la relire dans l'onglet 'Relecture'."
-                    )
-                    
-                    # Basculer vers l'onglet relecture
-                    self.tabs.setCurrentIndex(4)
-                    
-                else:
-                    QMessageBox.critical(self, "Erreur", f"Erreur lors de la création: {message}")
-                    
             else:
                 # Fallback vers l'ancienne méthode
                 self._save_view_fallback()
@@ -1384,6 +1789,52 @@ class AdvancedViewCreatorDialog(QDialog):
             QMessageBox.critical(self, "Erreur", f"Erreur inattendue: {str(e)}")
             print(f"Erreur _save_view: {e}")
     
+    def _create_view(self, view_def: ViewDefinition):
+        """Création de la vue validée"""
+        try:
+            # Générer le SQL
+            sql_query = self.view_builder.build_sql_query(view_def)
+            
+            # Créer la vue avec ViewCrudManager
+            success, message = self.view_crud_manager.create_view(
+                view_def.name,
+                view_def.main_table,
+                view_def.x_field,
+                view_def.y_fields,
+                view_def.aggregations,
+                view_def.grouping,
+                view_def.filters,
+                sql_query
+            )
+            
+            if success:
+                # Créer les données de vue pour compatibilité
+                view_data = self._create_view_data_from_definition(view_def, sql_query)
+                
+                # Ajouter à la liste locale pour relecture
+                self._add_view_for_review(view_data)
+                
+                # Émettre le signal
+                self.view_created.emit(view_data)
+                
+                # Message de succès
+                QMessageBox.information(
+                    self, 
+                    "Vue créée", 
+                    f"La vue '{view_def.name}' a été créée avec succès !\n\n"
+                    f"Vous pouvez maintenant la relire dans l'onglet 'Relecture'."
+                )
+                
+                # Basculer vers l'onglet relecture
+                self.tabs.setCurrentIndex(4)
+                
+            else:
+                QMessageBox.critical(self, "Erreur", f"Erreur lors de la création: {message}")
+            
+        except Exception as e:
+            QMessageBox.critical(self, "Erreur", f"Erreur inattendue: {str(e)}")
+            print(f"Erreur _create_view: {e}")
+    
     def _create_view_data_from_definition(self, view_def: ViewDefinition, sql_query: str) -> dict:
         """Crée les données de vue à partir d'une ViewDefinition"""
         return {
@@ -7,7 +7,9 @@ Auteur: Assistant IA
 Date: 2025-01-14
 """
 
+import os
 import sys
+import time
 from PySide6.QtWidgets import QApplication
 from PySide6.QtCore import Qt, QTranslator, QLocale
 
@@ -15,13 +17,35 @@ from PySide6.QtCore import Qt, QTranslator, QLocale
 sys.path.insert(0, 'app')
 
 from app.config.logging import setup_logging
-from app.models.database_manager import DatabaseManager
-from app.models.analysis_engine import AnalysisEngine
 from app.views.main_window import MainWindow
 from app.controllers.main_controller import MainController
 
+def create_database_manager():
+    """
+    Connexion à la base (SQLAlchemy et pandas importés hors du chemin de démarrage)
+    
+    Si REPORTING_SERVICE_URL est défini, les données viennent du service de requêtes partagé.
+    """
+    service_url = os.getenv('REPORTING_SERVICE_URL')
+    if service_url:
+        from app.models.remote_analysis_engine import RemoteDatabaseManager
+        return RemoteDatabaseManager(service_url)
+    
+    from app.models.database_manager import DatabaseManager
+    return DatabaseManager()
+
+def create_analysis_engine(db_manager, views):
+    """Moteur d'analyse construit à partir de la découverte unique des VIEWs"""
+    if os.getenv('REPORTING_SERVICE_URL'):
+        from app.models.remote_analysis_engine import RemoteAnalysisEngine
+        return RemoteAnalysisEngine(db_manager, views=views)
+    
+    from app.models.analysis_engine import AnalysisEngine
+    return AnalysisEngine(db_manager, views=views)
+
 def main():
     """Point d'entrée principal de l'application"""
+    started_at = time.perf_counter()
     
     # Configuration logging
     logger = setup_logging()
@@ -40,21 +64,21 @@ def main():
     app.installTranslator(translator)
     
     try:
-        # Initialisation couche modèle
-        logger.info("📊 Initializing database...")
-        db_manager = DatabaseManager()
-        analysis_engine = AnalysisEngine(db_manager)
-        
-        # Initialisation interface
+        # Initialisation interface (la base est connectée ensuite, en arrière-plan)
         logger.info("🎨 Creating user interface...")
-        main_window = MainWindow(database_manager=db_manager, analysis_engine=analysis_engine)
+        main_window = MainWindow()
         
         # Initialisation contrôleur
         logger.info("🎮 Configuring controller...")
-        controller = MainController(analysis_engine, main_window)
+        controller = MainController(None, main_window)
         
         # Affichage interface
         main_window.show()
+        logger.info(f"⏱️ Window displayed in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+        
+        # Connexion, découverte unique des VIEWs et création du moteur
+        logger.info("📊 Initializing database...")
+        controller.start_background_startup(create_database_manager, create_analysis_engine)
         logger.info("✅ Application ready")
         
         # Boucle événements Qt
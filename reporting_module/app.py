@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Génération de rapports en ligne de commande (sans affichage)
+
+Exemples :
+    python reporting_module/app.py --view v_interventions --view v_stocks \\
+        --filters '{"date_start": "2025-01-01"}' --output reports/ --format csv parquet --chart png
+    python reporting_module/app.py --spec nightly_reports.json --output reports/ --workers 6
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Racine du dépôt (paquet app) et dossier app (imports internes « models », « utils »)
+# Le dossier du script est retiré : son app.py masquerait le paquet app
+REPO_ROOT = Path(__file__).resolve().parent.parent
+_SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path = [str(REPO_ROOT), str(REPO_ROOT / 'app')] + [
+    p for p in sys.path if Path(p or '.').resolve() != _SCRIPT_DIR
+]
+
+from reporting_module.config.logging import setup_logging
+from reporting_module.models.batch_runner import (
+    CHART_FORMATS, DATA_FORMATS, BatchReportRunner, expand_report_specs,
+    format_summary, load_report_specs
+)
+from reporting_module.utils.exceptions import BatchReportError, ReportSpecError
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Arguments de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Headless batch report runner")
+    parser.add_argument("--view", action="append", default=[], dest="views",
+                        help="VIEW à exporter (répétable)")
+    parser.add_argument("--filters", action="append", default=[],
+                        help="Jeu de filtres JSON, appliqué à chaque VIEW (répétable)")
+    parser.add_argument("--spec", help="Fichier JSON listant les rapports à produire")
+    parser.add_argument("--output", required=True, help="Dossier de sortie")
+    parser.add_argument("--format", nargs="+", default=["csv"], choices=DATA_FORMATS,
+                        dest="formats", help="Formats des données")
+    parser.add_argument("--chart", nargs="*", default=["png"], choices=CHART_FORMATS,
+                        dest="charts", help="Formats des graphiques (aucun si vide)")
+    parser.add_argument("--workers", type=int, default=4, help="Rapports exécutés simultanément")
+    parser.add_argument("--log-file", help="Fichier de log")
+    parser.add_argument("--verbose", action="store_true", help="Logs détaillés")
+    return parser.parse_args(argv)
+
+def build_specs(args: argparse.Namespace):
+    """Rapports demandés : fichier --spec puis couples --view x --filters"""
+    specs = load_report_specs(args.spec) if args.spec else []
+
+    filter_sets = []
+    for raw in args.filters:
+        try:
+            filters = json.loads(raw)
+        except ValueError as e:
+            raise ReportSpecError(f"Filtres JSON invalides ({raw}): {e}")
+        if not isinstance(filters, dict):
+            raise ReportSpecError(f"Les filtres doivent être un objet JSON: {raw}")
+        filter_sets.append(filters)
+
+    specs.extend(expand_report_specs(args.views, filter_sets))
+    if not specs:
+        raise ReportSpecError("Aucun rapport demandé (--view ou --spec)")
+    return specs
+
+def main(argv=None) -> int:
+    """Point d'entrée : 0 si tous les rapports sont produits, 1 sinon"""
+    args = parse_args(argv)
+    logger = setup_logging(args.verbose, args.log_file)
+
+    try:
+        specs = build_specs(args)
+
+        # Imports lourds après validation des arguments
+        from app.models.analysis_engine import AnalysisEngine
+        from reporting_module.models.database_manager import create_database_manager
+
+        logger.info("📊 Initializing database...")
+        db_manager = create_database_manager(args.workers)
+        engine = AnalysisEngine(db_manager)
+
+        runner = BatchReportRunner(engine, args.output, args.formats, args.charts, args.workers)
+        started = time.perf_counter()
+        results = runner.run(specs)
+        wall_seconds = time.perf_counter() - started
+    except BatchReportError as e:
+        logger.error(f"❌ {e}")
+        return 2
+    except Exception as e:
+        logger.error(f"❌ Batch aborted: {e}")
+        return 2
+
+    print(format_summary(results, wall_seconds))
+    return 0 if all(r.succeeded for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Configuration du logging en mode sans interface (serveur, tâches planifiées)
+"""
+
+import logging
+import logging.handlers
+import os
+import sys
+from typing import Optional
+
+def setup_logging(verbose: bool = False, log_file: Optional[str] = None):
+    """
+    Logging sur la sortie d'erreur, fichier optionnel avec rotation
+
+    Args:
+        verbose: Niveau DEBUG au lieu de INFO
+        log_file: Chemin du fichier de log (aucun fichier si None)
+    """
+    logger = logging.getLogger()
+    logger.setLevel(logging.DEBUG if verbose else logging.INFO)
+
+    # Nettoyage handlers existants
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # Sortie d'erreur : la sortie standard reste réservée au récapitulatif
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(formatter)
+    logger.addHandler(console_handler)
+
+    if log_file:
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=10*1024*1024,  # 10MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        logger.addHandler(file_handler)
+
+    return logger
@@ -0,0 +1,303 @@
+"""
+Génération de rapports par lot, sans interface graphique
+Exécution parallèle des analyses, export des résultats et rendu des graphiques
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from app.models.result_schema import ResultSchema, infer_result_schema
+from reporting_module.utils.exceptions import ReportSpecError
+
+logger = logging.getLogger(__name__)
+
+DATA_FORMATS = ('csv', 'parquet')
+CHART_FORMATS = ('png', 'svg')
+
+# Nombre maximal de catégories sur un graphique en barres
+MAX_BAR_CATEGORIES = 30
+
+# matplotlib n'est pas thread-safe : les requêtes sont parallèles, le rendu est sérialisé
+_render_lock = threading.Lock()
+
+@dataclass
+class ReportSpec:
+    """Définition d'un rapport : VIEW, filtres et agrégations"""
+    view: str
+    filters: Dict = field(default_factory=dict)
+    aggregations: Optional[Dict] = None
+    limit: Optional[int] = None
+    name: Optional[str] = None
+
+    @property
+    def report_name(self) -> str:
+        """Nom de fichier du rapport (nom explicite ou VIEW suivie des filtres)"""
+        if self.name:
+            return _slugify(self.name)
+        parts = [self.view] + [f"{key}-{value}" for key, value in sorted(self.filters.items())
+                               if value not in (None, '')]
+        return _slugify("_".join(str(part) for part in parts))
+
+@dataclass
+class ReportResult:
+    """Résultat et durées d'un rapport du lot"""
+    spec: ReportSpec
+    rows: int = 0
+    files: List[str] = field(default_factory=list)
+    query_seconds: float = 0.0
+    write_seconds: float = 0.0
+    chart_seconds: float = 0.0
+    truncated: bool = False
+    error: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.query_seconds + self.write_seconds + self.chart_seconds
+
+def load_report_specs(path: str) -> List[ReportSpec]:
+    """
+    Charge les définitions de rapports d'un fichier JSON
+
+    Format : liste d'objets {"view", "filters", "aggregations", "limit", "name"},
+    seule la clé "view" est obligatoire.
+
+    Args:
+        path: Chemin du fichier JSON
+    """
+    try:
+        with open(path, encoding='utf-8') as handle:
+            entries = json.load(handle)
+    except (OSError, ValueError) as e:
+        raise ReportSpecError(f"Fichier de rapports illisible ({path}): {e}")
+
+    if not isinstance(entries, list):
+        raise ReportSpecError(f"{path}: une liste de rapports est attendue")
+
+    specs = []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not entry.get('view'):
+            raise ReportSpecError(f"{path}: rapport #{index + 1} sans VIEW")
+        specs.append(ReportSpec(
+            view=entry['view'],
+            filters=entry.get('filters') or {},
+            aggregations=entry.get('aggregations'),
+            limit=entry.get('limit'),
+            name=entry.get('name')
+        ))
+    return specs
+
+def expand_report_specs(views: Sequence[str], filter_sets: Sequence[Dict]) -> List[ReportSpec]:
+    """Un rapport par couple (VIEW, jeu de filtres)"""
+    filter_sets = list(filter_sets) or [{}]
+    return [ReportSpec(view=view, filters=dict(filters)) for view in views for filters in filter_sets]
+
+class BatchReportRunner:
+    """
+    Exécute un lot de rapports en parallèle
+
+    Chaque rapport interroge sa VIEW par l'AnalysisEngine, écrit les données
+    dans les formats demandés puis rend un graphique avec le backend Agg.
+    """
+
+    def __init__(self, analysis_engine, output_dir: str,
+                 data_formats: Sequence[str] = ('csv',), chart_formats: Sequence[str] = ('png',),
+                 max_workers: int = 4):
+        """
+        Args:
+            analysis_engine: Moteur d'analyse connecté
+            output_dir: Dossier de sortie des rapports
+            data_formats: Formats des données ('csv', 'parquet')
+            chart_formats: Formats des graphiques ('png', 'svg'), vide pour aucun graphique
+            max_workers: Nombre de rapports exécutés simultanément
+        """
+        unknown = set(data_formats) - set(DATA_FORMATS) | set(chart_formats) - set(CHART_FORMATS)
+        if unknown:
+            raise ReportSpecError(f"Formats non supportés: {', '.join(sorted(unknown))}")
+
+        self.analysis_engine = analysis_engine
+        self.output_dir = output_dir
+        self.data_formats = tuple(data_formats)
+        self.chart_formats = tuple(chart_formats)
+        self.max_workers = max(1, max_workers)
+
+    def run(self, specs: Sequence[ReportSpec],
+            on_report: Optional[Callable[[ReportResult], None]] = None) -> List[ReportResult]:
+        """
+        Exécute les rapports du lot
+
+        Args:
+            specs: Rapports à produire
+            on_report: Rappel appelé à la fin de chaque rapport
+
+        Returns:
+            Résultats dans l'ordre des définitions
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._check_unique_names(specs)
+        logger.info(f"🚀 Running {len(specs)} reports with {self.max_workers} workers")
+
+        results: List[Optional[ReportResult]] = [None] * len(specs)
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="report") as executor:
+            futures = {executor.submit(self.run_report, spec): index for index, spec in enumerate(specs)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_report:
+                    on_report(result)
+        return results
+
+    def run_report(self, spec: ReportSpec) -> ReportResult:
+        """Produit un rapport ; les erreurs sont consignées dans le résultat"""
+        result = ReportResult(spec)
+        try:
+            started = time.perf_counter()
+            df = self.analysis_engine.run_analysis(spec.view, spec.filters, spec.aggregations, spec.limit)
+            result.query_seconds = time.perf_counter() - started
+            result.rows = len(df)
+            result.truncated = self._is_truncated(result.rows, spec.limit)
+            if result.truncated:
+                logger.warning(f"⚠️ Report {spec.report_name} truncated to {result.rows} rows "
+                               f"(MAX_QUERY_ROWS reached)")
+
+            started = time.perf_counter()
+            for fmt in self.data_formats:
+                result.files.append(self._write_data(df, spec.report_name, fmt))
+            result.write_seconds = time.perf_counter() - started
+
+            if self.chart_formats:
+                started = time.perf_counter()
+                result.files.extend(self._render_chart(df, spec))
+                result.chart_seconds = time.perf_counter() - started
+
+            logger.info(f"✅ Report {spec.report_name}: {result.rows} rows in {result.total_seconds:.2f}s")
+        except Exception as e:
+            result.error = str(e)
+            logger.error(f"❌ Report {spec.report_name} failed: {e}")
+        return result
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _check_unique_names(self, specs: Sequence[ReportSpec]):
+        """Deux rapports du lot ne peuvent pas écrire dans les mêmes fichiers"""
+        seen = set()
+        for spec in specs:
+            if spec.report_name in seen:
+                raise ReportSpecError(f"Nom de rapport en double: {spec.report_name}")
+            seen.add(spec.report_name)
+
+    def _is_truncated(self, rows: int, limit: Optional[int]) -> bool:
+        """Résultat coupé par la limite de sécurité (MAX_QUERY_ROWS) et non par la limite du rapport"""
+        max_rows = self.analysis_engine.db_manager.config.get_max_rows()
+        return rows >= max_rows and (not limit or limit > max_rows)
+
+    def _write_data(self, df: pd.DataFrame, report_name: str, fmt: str) -> str:
+        """
+        Écrit les données du rapport (fichier temporaire renommé une fois complet)
+
+        Une écriture en erreur ne laisse pas de fichier partiel.
+        """
+        path = os.path.join(self.output_dir, f"{report_name}.{fmt}")
+        part_path = f"{path}.part"
+        try:
+            if fmt == 'csv':
+                df.to_csv(part_path, index=False, encoding='utf-8')
+            else:
+                df.to_parquet(part_path, index=False)
+            os.replace(part_path, path)
+        finally:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+        return path
+
+    def _render_chart(self, df: pd.DataFrame, spec: ReportSpec) -> List[str]:
+        """Rendu du graphique du rapport dans chaque format demandé"""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        typed_df, schema = infer_result_schema(df)
+        with _render_lock:
+            figure = Figure(figsize=(10, 6))
+            FigureCanvasAgg(figure)
+            _plot_result(figure, typed_df, schema, spec.view)
+
+            paths = []
+            for fmt in self.chart_formats:
+                path = os.path.join(self.output_dir, f"{spec.report_name}.{fmt}")
+                figure.savefig(path, format=fmt)
+                paths.append(path)
+        return paths
+
+def format_summary(results: Sequence[ReportResult], wall_seconds: float) -> str:
+    """Récapitulatif texte des durées par rapport"""
+    name_width = max([len(r.spec.report_name) for r in results] + [len("report")])
+    lines = [
+        f"{'report':<{name_width}} {'rows':>9} {'query':>8} {'write':>8} {'chart':>8} {'total':>8}  status",
+        "-" * (name_width + 53)
+    ]
+    for r in results:
+        status = "ok" if r.succeeded else f"FAILED: {r.error}"
+        if r.succeeded and r.truncated:
+            status += " (truncated at MAX_QUERY_ROWS)"
+        lines.append(f"{r.spec.report_name:<{name_width}} {r.rows:>9} {r.query_seconds:>7.2f}s "
+                     f"{r.write_seconds:>7.2f}s {r.chart_seconds:>7.2f}s {r.total_seconds:>7.2f}s  {status}")
+
+    failed = sum(1 for r in results if not r.succeeded)
+    cumulated = sum(r.total_seconds for r in results)
+    lines.append("-" * (name_width + 53))
+    lines.append(f"{len(results)} reports, {failed} failed - wall time {wall_seconds:.2f}s "
+                 f"(cumulated {cumulated:.2f}s)")
+    return "\n".join(lines)
+
+def _plot_result(figure, df: pd.DataFrame, schema: ResultSchema, title: str):
+    """
+    Graphique selon le schéma du résultat : courbes sur l'axe temporel,
+    sinon barres des mesures par la première dimension
+    """
+    ax = figure.add_subplot(111)
+    measures = schema.measures[:3]
+
+    if df.empty or not measures:
+        message = 'No data to display' if df.empty else 'No numeric column to chart'
+        ax.text(0.5, 0.5, message, horizontalalignment='center', verticalalignment='center',
+                transform=ax.transAxes, fontsize=14)
+        ax.set_axis_off()
+        return
+
+    if schema.time_axis:
+        data = df.sort_values(schema.time_axis)
+        for measure in measures:
+            ax.plot(data[schema.time_axis], data[measure], marker='o', markersize=3, label=measure)
+        ax.set_xlabel(schema.time_axis)
+    else:
+        x_col = schema.dimensions[0] if schema.dimensions else None
+        data = df.head(MAX_BAR_CATEGORIES)
+        labels = data[x_col].astype(str) if x_col else data.index.astype(str)
+        width = 0.8 / len(measures)
+        positions = range(len(data))
+        for offset, measure in enumerate(measures):
+            ax.bar([p + offset * width for p in positions], data[measure], width=width, label=measure)
+        ax.set_xticks([p + width * (len(measures) - 1) / 2 for p in positions])
+        ax.set_xticklabels(labels, rotation=45, ha='right')
+        ax.set_xlabel(x_col or 'row')
+
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    figure.tight_layout()
+
+def _slugify(value: str) -> str:
+    """Nom de fichier sûr"""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', value).strip('_') or 'report'
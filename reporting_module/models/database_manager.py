@@ -0,0 +1,30 @@
+"""
+Accès base de données du générateur de rapports
+
+Réutilise le gestionnaire de l'application : même configuration (.env),
+même pool de connexions, sans dépendance à Qt.
+"""
+
+import logging
+
+from app.config.database import DatabaseConfig
+from app.models.database_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+def create_database_manager(max_workers: int) -> DatabaseManager:
+    """
+    Connexion à la base pour un lot exécuté par max_workers threads
+
+    Args:
+        max_workers: Nombre de rapports exécutés simultanément
+
+    Returns:
+        Gestionnaire connecté
+    """
+    options = DatabaseConfig.get_engine_options()
+    pool_capacity = options['pool_size'] + options['max_overflow']
+    if max_workers > pool_capacity:
+        logger.warning(f"⚠️ {max_workers} workers for {pool_capacity} pooled connections: "
+                       f"reports will wait for a connection")
+    return DatabaseManager()
@@ -0,0 +1,175 @@
+"""
+Service de requêtes partagé entre les postes d'analyse
+Un pool de connexions, un cache de résultats et un pool de workers communs
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from app.models.result_cache import ResultCache
+from app.models.result_schema import infer_result_schema
+from app.utils.exceptions import ViewNotFoundError
+from reporting_module.utils.exceptions import ReportSpecError, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Nombre maximal de points renvoyés par série de graphique
+MAX_CHART_POINTS = 2000
+
+class QueryService:
+    """
+    Exécution des analyses pour le service HTTP
+
+    Les requêtes identiques simultanées sont regroupées par l'AnalysisEngine,
+    les résultats récents sont servis par le cache (y compris les sous-plages
+    de dates d'un résultat complet) et le nombre de requêtes PostgreSQL
+    simultanées est borné par le pool de workers.
+    """
+
+    def __init__(self, analysis_engine, max_workers: int = 4, cache_ttl: float = 300.0,
+                 cache_entries: int = 100, request_timeout: float = 300.0):
+        """
+        Args:
+            analysis_engine: Moteur d'analyse connecté (pool de connexions partagé)
+            max_workers: Requêtes base de données simultanées
+            cache_ttl: Durée de validité d'un résultat en cache (secondes)
+            cache_entries: Nombre de résultats conservés
+            request_timeout: Attente maximale d'un résultat (secondes)
+        """
+        self.analysis_engine = analysis_engine
+        self.cache = ResultCache(max_entries=cache_entries)
+        self.cache_ttl = cache_ttl
+        self.request_timeout = request_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="query")
+        self.max_workers = max_workers
+        self._views_lock = threading.Lock()
+        logger.info(f"🧵 Query service ready ({max_workers} workers, cache TTL {cache_ttl:.0f}s)")
+
+    def list_views(self, refresh: bool = False) -> List[Dict]:
+        """VIEWs disponibles (rechargées à la demande, cache invalidé)"""
+        if refresh:
+            with self._views_lock:
+                self._run(self.analysis_engine.refresh_views)
+                self.cache.invalidate()
+        return self.analysis_engine.get_available_analyses()
+
+    def view_info(self, view_name: str) -> Dict:
+        """Structure et échantillon d'une VIEW"""
+        self._check_view(view_name)
+        return self._run(self.analysis_engine.get_view_info, view_name)
+
+    def analysis(self, view_name: str, filters: Optional[Dict] = None,
+                 aggregations: Optional[Dict] = None,
+                 limit: Optional[int] = None) -> Tuple[pd.DataFrame, str]:
+        """
+        Résultat d'une analyse
+
+        Args:
+            view_name: VIEW interrogée
+            filters: Filtres (mêmes clés que l'interface)
+            aggregations: Agrégations éventuelles
+            limit: Limite de lignes (plafonnée à MAX_QUERY_ROWS)
+
+        Returns:
+            Tuple (DataFrame, origine 'cache' ou 'database')
+
+        Raises:
+            InvalidFilterError: Filtre, agrégation ou limite refusés
+        """
+        self._check_view(view_name)
+        # Colonnes, agrégations et limite vérifiées sur le catalogue : 400 sinon
+        self._run(self.analysis_engine.validate_analysis_request, view_name, filters, aggregations, limit)
+        filters = filters or {}
+
+        # Seules les analyses brutes sont mises en cache (clé : VIEW et filtres)
+        cacheable = not aggregations and not limit
+        if cacheable:
+            cached = self.cache.lookup(view_name, filters, max_age=self.cache_ttl)
+            if cached is not None:
+                return cached, 'cache'
+
+        # Limite de sécurité appliquée côté serveur, comme pour la lecture progressive
+        max_rows = self.analysis_engine.db_manager.config.get_max_rows()
+        limit = min(limit, max_rows) if limit else max_rows
+        df = self._run(self.analysis_engine.run_analysis, view_name, filters, aggregations, limit)
+
+        if cacheable:
+            self.cache.store(view_name, filters, df,
+                             date_column=self.analysis_engine.get_date_column(view_name),
+                             complete=len(df) < max_rows, ttl=self.cache_ttl)
+        return df, 'database'
+
+    def chart_data(self, view_name: str, filters: Optional[Dict] = None,
+                   x_column: Optional[str] = None, y_columns: Sequence[str] = (),
+                   max_points: int = MAX_CHART_POINTS) -> Dict:
+        """
+        Séries prêtes à tracer, réduites à max_points points
+
+        L'axe X par défaut est l'axe temporel du résultat, sinon sa première
+        dimension ; les séries par défaut sont ses trois premières mesures.
+        """
+        df, source = self.analysis(view_name, filters)
+        typed_df, schema = infer_result_schema(df)
+
+        x_column = x_column or schema.time_axis or (schema.dimensions[0] if schema.dimensions else None)
+        y_columns = list(y_columns) or schema.measures[:3]
+        missing = [c for c in [x_column, *y_columns] if c is not None and c not in typed_df.columns]
+        if missing:
+            raise ReportSpecError(f"Colonnes inconnues: {', '.join(missing)}")
+
+        if x_column == schema.time_axis and x_column is not None:
+            typed_df = typed_df.sort_values(x_column)
+        total_points = len(typed_df)
+        if max_points and total_points > max_points:
+            step = -(-total_points // max_points)
+            typed_df = typed_df.iloc[::step]
+
+        x_values = typed_df[x_column] if x_column else typed_df.index.to_series()
+        return {
+            'view': view_name,
+            'source': source,
+            'x': {'name': x_column, 'values': _json_values(x_values)},
+            'series': [{'name': col, 'values': _json_values(typed_df[col])} for col in y_columns],
+            'points': len(typed_df),
+            'total_points': total_points
+        }
+
+    def get_stats(self) -> Dict:
+        """Statistiques du cache et des requêtes regroupées"""
+        return {
+            'cache': self.cache.get_stats(),
+            'in_flight': self.analysis_engine.get_in_flight_stats(),
+            'workers': self.max_workers
+        }
+
+    def shutdown(self):
+        """Arrêt du pool de workers (requêtes en cours terminées)"""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        logger.info("🧵 Query service stopped")
+
+    # === MÉTHODES PRIVÉES ===
+
+    def _run(self, fn, *args):
+        """Exécution dans le pool de workers, attente bornée du résultat"""
+        try:
+            future = self.executor.submit(fn, *args)
+        except RuntimeError as e:
+            raise ServiceUnavailableError(f"Service en cours d'arrêt: {e}")
+        return future.result(timeout=self.request_timeout)
+
+    def _check_view(self, view_name: str):
+        """Refuse les VIEWs inconnues avant toute requête"""
+        names = {view['name'] for view in self.analysis_engine.get_available_analyses()}
+        if view_name not in names:
+            raise ViewNotFoundError(f"VIEW {view_name} non trouvée")
+
+def _json_values(series: pd.Series) -> List:
+    """Valeurs sérialisables en JSON (dates ISO, valeurs manquantes à null)"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return [value.isoformat() if not pd.isna(value) else None for value in series]
+    return [None if pd.isna(value) else (value.item() if hasattr(value, 'item') else value)
+            for value in series]
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Service HTTP local de requêtes d'analyse
+
+Les postes d'analyse partagent un pool de connexions, un cache de résultats
+et un pool de workers au lieu d'interroger PostgreSQL chacun de leur côté.
+
+    python reporting_module/service.py --host 0.0.0.0 --port 8765 --workers 4
+
+Points d'accès (JSON) :
+    GET  /health                   État du service et limite de lignes
+    GET  /views[?refresh=1]        VIEWs disponibles
+    GET  /views/<nom>              Structure et échantillon d'une VIEW
+    GET  /stats                    Cache et requêtes regroupées
+    POST /analysis                 {"view", "filters", "aggregations", "limit"}
+    POST /chart-data               {"view", "filters", "x", "y", "max_points"}
+"""
+
+import argparse
+import json
+import logging
+import sys
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Même configuration des chemins que app.py (le dossier du script masquerait le paquet app)
+REPO_ROOT = Path(__file__).resolve().parent.parent
+_SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path = [str(REPO_ROOT), str(REPO_ROOT / 'app')] + [
+    p for p in sys.path if Path(p or '.').resolve() != _SCRIPT_DIR
+]
+
+from app.models.remote_analysis_engine import encode_dataframe
+from app.utils.exceptions import ViewNotFoundError
+from reporting_module.config.logging import setup_logging
+from reporting_module.utils.exceptions import ReportSpecError, ServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Taille maximale d'un corps de requête (filtres, agrégations)
+MAX_BODY_BYTES = 1024 * 1024
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """Routage des requêtes vers le QueryService du serveur"""
+
+    server_version = "ReportingQueryService/1.0"
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        service = self.server.query_service
+
+        if url.path == '/health':
+            engine = service.analysis_engine
+            self._handle(lambda: {
+                'status': 'ok',
+                'max_rows': engine.db_manager.config.get_max_rows(),
+                'connection': engine.db_manager.get_connection_info()
+            })
+        elif url.path == '/views':
+            refresh = parse_qs(url.query).get('refresh', ['0'])[0] in ('1', 'true')
+            self._handle(lambda: {'views': service.list_views(refresh)})
+        elif url.path.startswith('/views/'):
+            view_name = unquote(url.path[len('/views/'):])
+            self._handle(lambda: service.view_info(view_name))
+        elif url.path == '/stats':
+            self._handle(service.get_stats)
+        else:
+            self._send_error(404, f"Unknown endpoint: {url.path}")
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        service = self.server.query_service
+
+        if url.path == '/analysis':
+            self._handle(lambda: self._analysis(service, self._read_json()))
+        elif url.path == '/chart-data':
+            self._handle(lambda: self._chart_data(service, self._read_json()))
+        else:
+            self._send_error(404, f"Unknown endpoint: {url.path}")
+
+    def log_message(self, format, *args):
+        logger.debug(f"🌐 {self.address_string()} {format % args}")
+
+    # === MÉTHODES PRIVÉES ===
+
+    @staticmethod
+    def _analysis(service, body: dict) -> str:
+        """Résultat d'analyse au format d'échange du client distant"""
+        view_name = _require_view(body)
+        df, source = service.analysis(view_name, body.get('filters'),
+                                      body.get('aggregations'), body.get('limit'))
+        logger.info(f"🌐 /analysis {view_name}: {len(df)} rows ({source})")
+        return encode_dataframe(df, source=source,
+                                date_column=service.analysis_engine.get_date_column(view_name))
+
+    @staticmethod
+    def _chart_data(service, body: dict) -> dict:
+        view_name = _require_view(body)
+        y_columns = body.get('y') or []
+        if isinstance(y_columns, str):
+            y_columns = [y_columns]
+        # max_points absent : réduction par défaut du service (MAX_CHART_POINTS)
+        options = {}
+        if body.get('max_points') is not None:
+            options['max_points'] = int(body['max_points'])
+        return service.chart_data(view_name, body.get('filters'), body.get('x'), y_columns, **options)
+
+    def _read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ReportSpecError("Corps de requête trop volumineux")
+        raw = self.rfile.read(length) if length else b'{}'
+        try:
+            body = json.loads(raw.decode('utf-8'))
+        except ValueError as e:
+            raise ReportSpecError(f"JSON invalide: {e}")
+        if not isinstance(body, dict):
+            raise ReportSpecError("Un objet JSON est attendu")
+        return body
+
+    def _handle(self, producer):
+        """Exécute le traitement et traduit les erreurs en statuts HTTP"""
+        try:
+            self._send_json(200, producer())
+        except ViewNotFoundError as e:
+            self._send_error(404, str(e))
+        except (ReportSpecError, ValueError) as e:
+            self._send_error(400, str(e))
+        except FutureTimeoutError:
+            self._send_error(504, "Délai d'exécution de la requête dépassé")
+        except ServiceUnavailableError as e:
+            self._send_error(503, str(e))
+        except Exception as e:
+            logger.error(f"❌ {self.command} {self.path} failed: {e}")
+            self._send_error(500, str(e))
+
+    def _send_json(self, status: int, body):
+        payload = (body if isinstance(body, str) else json.dumps(body, default=str)).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_error(self, status: int, message: str):
+        self._send_json(status, {'error': message})
+
+def _require_view(body: dict) -> str:
+    view_name = body.get('view')
+    if not view_name:
+        raise ReportSpecError("Paramètre 'view' manquant")
+    return view_name
+
+def create_server(query_service, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """
+    Serveur HTTP adossé au service de requêtes
+
+    Args:
+        query_service: Service partagé par toutes les connexions
+        host: Adresse d'écoute
+        port: Port d'écoute (0 : port libre choisi par le système)
+    """
+    server = ThreadingHTTPServer((host, port), QueryRequestHandler)
+    server.daemon_threads = True
+    server.query_service = query_service
+    return server
+
+def main(argv=None) -> int:
+    """Démarrage du service jusqu'à interruption (Ctrl+C)"""
+    parser = argparse.ArgumentParser(description="Local HTTP query service")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8765, help="Port d'écoute")
+    parser.add_argument("--workers", type=int, default=4, help="Requêtes base de données simultanées")
+    parser.add_argument("--cache-ttl", type=float, default=300.0, help="Validité du cache (secondes)")
+    parser.add_argument("--log-file", help="Fichier de log")
+    parser.add_argument("--verbose", action="store_true", help="Logs détaillés")
+    args = parser.parse_args(argv)
+    setup_logging(args.verbose, args.log_file)
+
+    from app.models.analysis_engine import AnalysisEngine
+    from reporting_module.models.database_manager import create_database_manager
+    from reporting_module.models.query_service import QueryService
+
+    try:
+        db_manager = create_database_manager(args.workers)
+    except Exception as e:
+        logger.error(f"❌ {e}")
+        return 2
+
+    service = QueryService(AnalysisEngine(db_manager), args.workers, args.cache_ttl)
+    server = create_server(service, args.host, args.port)
+    logger.info(f"🌐 Query service listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping query service")
+    finally:
+        server.server_close()
+        service.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,17 @@
+"""
+Exceptions du générateur de rapports en ligne de commande
+"""
+
+from app.utils.exceptions import ReportingModuleException
+
+class BatchReportError(ReportingModuleException):
+    """Erreur lors de la génération d'un rapport du lot"""
+    pass
+
+class ReportSpecError(BatchReportError):
+    """Définition de rapport invalide (VIEW, filtres ou formats)"""
+    pass
+
+class ServiceUnavailableError(ReportingModuleException):
+    """Service de requêtes arrêté ou injoignable"""
+    pass
@@ -0,0 +1,75 @@
+"""
+Tests du générateur de rapports par lot (moteur d'analyse simulé)
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from reporting_module.models.batch_runner import BatchReportRunner, ReportSpec, format_summary
+
+class FakeConfig:
+    def __init__(self, max_rows=10000):
+        self.max_rows = max_rows
+
+    def get_max_rows(self):
+        return self.max_rows
+
+class FakeDatabaseManager:
+    def __init__(self, max_rows=10000):
+        self.config = FakeConfig(max_rows)
+
+class FakeEngine:
+    def __init__(self, max_rows=10000):
+        self.db_manager = FakeDatabaseManager(max_rows)
+
+    def run_analysis(self, view_name, filters=None, aggregations=None, limit=None):
+        if view_name == 'v_missing':
+            raise ValueError("VIEW v_missing non trouvée")
+        return pd.DataFrame({
+            'date_intervention': pd.date_range('2025-01-01', periods=5, freq='D'),
+            'site': ['A', 'B', 'A', 'B', 'C'],
+            'duree': [1.5, 2.0, 0.5, 3.0, 1.0]
+        })
+
+def test_batch_runner_writes_data_and_charts(tmp_path):
+    runner = BatchReportRunner(FakeEngine(), str(tmp_path), ('csv', 'parquet'), ('png', 'svg'), max_workers=2)
+    specs = [
+        ReportSpec('v_interventions', {'date_start': '2025-01-01'}),
+        ReportSpec('v_missing')
+    ]
+
+    results = runner.run(specs)
+
+    ok, failed = results
+    assert ok.succeeded and ok.rows == 5
+    assert {Path(f).suffix for f in ok.files} == {'.csv', '.parquet', '.png', '.svg'}
+    assert all(Path(f).stat().st_size > 0 for f in ok.files)
+    assert pd.read_parquet(tmp_path / f"{ok.spec.report_name}.parquet").shape == (5, 3)
+    assert not failed.succeeded and 'v_missing' in failed.error
+    assert "1 failed" in format_summary(results, 0.1)
+
+def test_batch_runner_flags_results_cut_by_max_query_rows(tmp_path):
+    runner = BatchReportRunner(FakeEngine(max_rows=5), str(tmp_path), ('csv',), ())
+
+    capped, limited = runner.run([ReportSpec('v_interventions', name='capped'),
+                                  ReportSpec('v_interventions', limit=5, name='limited')])
+
+    assert capped.succeeded and capped.truncated
+    assert limited.succeeded and not limited.truncated
+    assert "ok (truncated at MAX_QUERY_ROWS)" in format_summary([capped, limited], 0.1)
+
+def test_batch_runner_removes_partial_file_on_write_error(tmp_path, monkeypatch):
+    def failing_to_csv(df, path, **kwargs):
+        Path(path).write_text("date_intervention,site")
+        raise OSError("No space left on device")
+    monkeypatch.setattr(pd.DataFrame, 'to_csv', failing_to_csv)
+    runner = BatchReportRunner(FakeEngine(), str(tmp_path), ('csv',), ())
+
+    [result] = runner.run([ReportSpec('v_interventions')])
+
+    assert not result.succeeded and 'No space left' in result.error
+    assert list(tmp_path.iterdir()) == []
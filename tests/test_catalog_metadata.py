@@ -0,0 +1,83 @@
+"""
+Tests des métadonnées de tables lues dans le catalogue (base simulée)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.catalog_metadata import CatalogMetadataService, LazyTablesMetadata
+from app.models.view_builder import ViewBuilder
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self):
+        self.fingerprint = 'f1'
+        self.field_queries = []
+        self.available = True
+        self.queries = 0
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        self.queries += 1
+        if not self.available:
+            raise RuntimeError("connexion perdue")
+        if 'fingerprint' in query:
+            return [{'fingerprint': self.fingerprint}]
+        if 'obj_description' in query:
+            return [{'table_name': 'commande_achat', 'comment': None},
+                    {'table_name': 'maintenance', 'comment': '🔧 Maintenance'}]
+        self.field_queries.append(params[1])
+        return [
+            {'column_name': 'id_commande', 'type_name': 'int4', 'comment': None, 'is_key': True},
+            {'column_name': 'date_commande', 'type_name': 'timestamptz', 'comment': None, 'is_key': False},
+            {'column_name': 'montant_ht', 'type_name': 'numeric', 'comment': 'Montant HT', 'is_key': False}
+        ]
+
+def test_fields_load_only_for_opened_tables_and_reload_on_catalog_change():
+    db = FakeDatabaseManager()
+    service = CatalogMetadataService(db, check_interval=0)
+    tables = LazyTablesMetadata(service)
+
+    assert {name: entry['display_name'] for name, entry in tables.items()} == {
+        'commande_achat': '📊 Commande Achat', 'maintenance': '🔧 Maintenance'}
+    assert db.field_queries == []
+
+    fields = tables['commande_achat']['fields']
+    assert fields['id_commande'] == {'type': 'integer', 'display': 'Id Commande', 'aggregable': False}
+    assert fields['date_commande']['type'] == 'date'
+    assert fields['montant_ht'] == {'type': 'numeric', 'display': 'Montant HT', 'aggregable': True}
+    tables['commande_achat']['fields']
+    assert db.field_queries == ['commande_achat']
+
+    db.fingerprint = 'f2'
+    tables['commande_achat']['fields']
+    assert db.field_queries == ['commande_achat', 'commande_achat']
+
+def test_builder_falls_back_to_builtin_tables():
+    db = FakeDatabaseManager()
+    db.available = False
+    builder = ViewBuilder(db)
+
+    assert 'maintenance' in builder.get_available_tables()
+    assert 'cout_total' in builder.get_aggregable_fields('maintenance')
+
+def test_unavailable_catalog_is_not_queried_again_within_check_interval():
+    db = FakeDatabaseManager()
+    db.available = False
+    service = CatalogMetadataService(db, check_interval=60)
+    tables = LazyTablesMetadata(service, fallback={'maintenance': {'display_name': '🔧', 'fields': {}}})
+
+    assert list(tables) == ['maintenance']
+    assert 'maintenance' in tables and len(tables) == 1 and tables['maintenance']['fields'] == {}
+    assert db.queries == 1
+
+    # Intervalle écoulé : nouvelle tentative, catalogue revenu
+    db.available = True
+    tables._unavailable_until = 0
+    assert list(tables) == ['commande_achat', 'maintenance']
@@ -0,0 +1,37 @@
+"""
+Tests du gestionnaire de base de données (SQLite en mémoire)
+"""
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.database_manager import DatabaseManager
+
+class FakeConfig:
+    def get_max_rows(self):
+        return 2
+
+def make_manager():
+    db = DatabaseManager.__new__(DatabaseManager)
+    db.config = FakeConfig()
+    db.engine = create_engine('sqlite://', poolclass=StaticPool)
+    db.execute_query("CREATE TABLE views (name TEXT, last_row_count INTEGER)", fetch_results=False)
+    db.execute_query("INSERT INTO views VALUES ('a', 12), ('b', NULL), ('c', 7)", fetch_results=False)
+    return db
+
+def test_fetched_records_keep_nulls_and_integers_without_row_cap():
+    db = make_manager()
+
+    rows = db.execute_query("SELECT name, last_row_count FROM views ORDER BY name", fetch_results=True)
+
+    assert rows == [{'name': 'a', 'last_row_count': 12},
+                    {'name': 'b', 'last_row_count': None},
+                    {'name': 'c', 'last_row_count': 7}]
+    assert isinstance(rows[0]['last_row_count'], int)
+    # Le DataFrame reste plafonné à MAX_QUERY_ROWS
+    assert len(db.execute_query("SELECT * FROM views")) == 2
@@ -0,0 +1,20 @@
+"""
+Budget d'import au démarrage : la fenêtre doit s'afficher sans les modules lourds
+"""
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.import_profiler import heavy_modules_loaded, measure_imports, total_import_ms
+
+REPO_ROOT = Path(__file__).parent.parent
+IMPORT_BUDGET_MS = float(os.getenv('IMPORT_BUDGET_MS', '1500'))
+
+def test_main_import_budget():
+    """import main ne charge ni pandas, ni numpy, ni SQLAlchemy, ni matplotlib"""
+    records = measure_imports('main', cwd=str(REPO_ROOT), env={'QT_QPA_PLATFORM': 'offscreen'})
+
+    assert heavy_modules_loaded(records) == []
+    assert total_import_ms(records, 'main') < IMPORT_BUDGET_MS
@@ -0,0 +1,154 @@
+"""
+Tests du conseiller d'index des VIEWs KPI (base simulée)
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.database_manager import DatabaseManager
+from app.models.index_advisor import IndexAdvisor
+from app.models.view_builder import ModuleType, ViewDefinition
+from utils.exceptions import QueryExecutionError
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self, extensions=(), indexes=None, row_estimate=5000, correlation=0.2):
+        self.extensions = set(extensions)
+        self.indexes = indexes or {}
+        self.row_estimate = row_estimate
+        self.correlation = correlation
+        self.explains = []
+        self.autocommit = []
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        if 'pg_extension' in query:
+            return [{'extname': name} for name in self.extensions]
+        if 'pg_index' in query:
+            return self.indexes.get(params[1], [])
+        if 'reltuples' in query:
+            return [{'row_estimate': self.row_estimate, 'correlation': self.correlation}]
+        raise AssertionError(query)
+
+    def explain(self, query, params=None, setup=(), teardown=()):
+        self.explains.append((query, list(setup), list(teardown)))
+        cost = 100.0 if setup else 1000.0
+        return [{'Plan': {'Node Type': 'Aggregate', 'Total Cost': cost, 'Plan Rows': 12, 'Plan Width': 16}}]
+
+    def execute_autocommit(self, statement):
+        self.autocommit.append(statement)
+        if 'fail' in statement:
+            raise RuntimeError("deadlock detected")
+
+def make_definition(**filters):
+    return ViewDefinition(
+        name='Backlog', main_table='maintenance', x_field='date_debut_reelle',
+        y_fields=['cout_total'], aggregations={'y1': 'SUM'}, grouping='monthly',
+        filters=filters, module_type=ModuleType.TEMPORAL
+    )
+
+def test_existing_indexes_are_skipped_and_join_column_is_proposed():
+    db = FakeDatabaseManager(indexes={'maintenance': [
+        {'index_name': 'maintenance_date_idx', 'method': 'btree',
+         'leading_column': 'date_debut_reelle', 'opclass': 'date_ops'}
+    ]})
+    view_def = make_definition(date_start='2025-01-01')
+    view_def.secondary_table = 'machine'
+    view_def.join_condition = 'maintenance.id_machine = machine.id_machine'
+
+    proposals = IndexAdvisor(db).candidates(view_def)
+
+    assert [(p.table, p.column, p.method) for p in proposals] == [('machine', 'id_machine', 'btree')]
+
+def test_large_correlated_table_gets_brin_and_trigram_needs_extension():
+    db = FakeDatabaseManager(row_estimate=50_000_000, correlation=0.98)
+    proposals = IndexAdvisor(db).candidates(make_definition(date_end='2025-12-31', contains_text='pompe'))
+
+    by_method = {p.method: p for p in proposals}
+    assert by_method['brin'].column == 'date_debut_reelle'
+    assert by_method['gin'].requires_extension == 'pg_trgm'
+    assert by_method['gin'].create_sql() == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS maintenance_date_debut_reelle_trgm "
+        "ON public.maintenance USING gin (date_debut_reelle gin_trgm_ops)"
+    )
+
+def test_costs_are_measured_with_hypopg_or_a_rolled_back_temporary_index():
+    db = FakeDatabaseManager(extensions={'hypopg'})
+    advisor = IndexAdvisor(db)
+    [proposal] = advisor.advise(make_definition(date_start='2025-01-01'))
+
+    assert proposal.measured_with == 'hypopg'
+    assert (proposal.cost_before, proposal.cost_after) == (1000.0, 100.0)
+    assert advisor.is_recommended(proposal)
+    _, setup, teardown = db.explains[-1]
+    assert 'hypopg_create_index' in setup[-1] and teardown == ['SELECT hypopg_reset()']
+
+    db = FakeDatabaseManager()
+    [proposal] = IndexAdvisor(db).advise(make_definition(date_start='2025-01-01'))
+    assert proposal.measured_with == 'temporary'
+    assert db.explains[-1][1] == [proposal.create_sql(concurrently=False)]
+
+    db = FakeDatabaseManager(row_estimate=50_000_000)
+    [proposal] = IndexAdvisor(db).advise(make_definition(date_start='2025-01-01'))
+    assert proposal.cost_after is None and len(db.explains) == 1
+
+def test_failed_concurrent_build_drops_the_invalid_index():
+    db = FakeDatabaseManager()
+    advisor = IndexAdvisor(db)
+    proposal = advisor.candidates(make_definition(min_value=10))[0]
+    assert proposal.column == 'cout_total'
+    proposal.table = 'fail'
+
+    with pytest.raises(RuntimeError):
+        advisor.create_index(proposal)
+
+    assert db.autocommit == [proposal.create_sql(), f"DROP INDEX CONCURRENTLY IF EXISTS public.{proposal.name}"]
+
+def test_explain_teardown_runs_after_rollback_even_when_explain_fails():
+    db = DatabaseManager.__new__(DatabaseManager)
+    db.engine = create_engine('sqlite://')
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement))
+    event.listen(db.engine, 'rollback', lambda conn: statements.append('ROLLBACK'))
+
+    # SQLite ne connaît pas EXPLAIN (FORMAT JSON) : l'erreur survient entre setup et teardown
+    with pytest.raises(QueryExecutionError):
+        db.explain("SELECT 1", setup=["SELECT 'setup'"], teardown=["SELECT 'teardown'"])
+
+    assert statements.index('ROLLBACK') < statements.index("SELECT 'teardown'")
+    assert statements[0] == "SELECT 'setup'"
+
+def test_index_builds_run_in_a_worker_thread_and_report_each_index():
+    from PySide6.QtCore import QCoreApplication
+    from app.views.views_construct import IndexBuildWorker
+
+    app = QCoreApplication.instance() or QCoreApplication([])
+    db = FakeDatabaseManager()
+    advisor = IndexAdvisor(db)
+    proposals = advisor.candidates(make_definition(date_start='2025-01-01', min_value=10))
+    proposals[0].table = 'fail'
+    threads, events = [], []
+    db_autocommit = db.execute_autocommit
+    db.execute_autocommit = lambda statement: (threads.append(threading.get_ident()),
+                                               db_autocommit(statement))
+
+    worker = IndexBuildWorker(advisor, proposals)
+    worker.index_created.connect(lambda name: events.append(('created', name)))
+    worker.index_failed.connect(lambda name, message: events.append(('failed', name)))
+    worker.start()
+    assert worker.wait(5000)
+    app.processEvents()
+
+    assert threading.get_ident() not in threads
+    assert events == [('failed', proposals[0].name), ('created', proposals[1].name)]
@@ -0,0 +1,133 @@
+"""
+Tests du contrôleur principal (fenêtre simulée)
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+from PySide6.QtCore import QCoreApplication, QObject, QThread, Signal
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.controllers.main_controller import MainController
+
+class FakeMainWindow(QObject):
+    report_selected = Signal(str)
+    generate_clicked = Signal(dict)
+    filters_changed = Signal(dict)
+    view_structure_requested = Signal(str)
+    export_requested = Signal(dict)
+    report_hovered = Signal(str)
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def show_loading(self, message):
+        self.calls.append('show_loading')
+
+    def hide_loading(self):
+        self.calls.append('hide_loading')
+
+    def update_connection_status(self, connected, info=None):
+        self.calls.append(('status', connected))
+
+    def show_error(self, message):
+        self.calls.append('show_error')
+
+    def show_warning(self, message):
+        self.calls.append('show_warning')
+
+    def get_analysis_params(self, view_name):
+        return {'view_name': view_name, 'filters': {'filter_site': 'A'}}
+
+    def populate_views(self, views):
+        self.calls.append('populate_views')
+
+    def display_data(self, dataframe):
+        self.calls.append(('display', len(dataframe)))
+
+def _app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+def _failing_factory():
+    raise ConnectionError("connection refused")
+
+def test_startup_error_hides_loading_and_refresh_retries():
+    app = _app()
+    window = FakeMainWindow()
+    controller = MainController(None, window)
+
+    controller.start_background_startup(_failing_factory, lambda db, views: None)
+    deadline = time.monotonic() + 5
+    while 'show_error' not in window.calls and time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.01)
+
+    assert window.calls[-3:] == [('status', False), 'hide_loading', 'show_error']
+    assert controller.startup_worker is None
+
+    controller.refresh_views()
+    assert controller.startup_worker is not None
+    assert window.calls[-1] == 'show_loading'
+    controller.scheduler.shutdown()
+
+class FakeConfig:
+    def get_max_rows(self):
+        return 10000
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def get_connection_info(self):
+        return {'database': 'gmao'}
+
+class BlockingEngine:
+    """Analyse bloquée jusqu'à l'ouverture de la barrière"""
+
+    def __init__(self):
+        self.db_manager = FakeDatabaseManager()
+        self.gate = threading.Event()
+        self.runs = 0
+
+    def get_available_analyses(self):
+        return [{'name': 'v_interventions'}]
+
+    def get_date_column(self, view_name):
+        return None
+
+    def run_analysis(self, view_name, filters=None, limit=None, on_chunk=None, is_cancelled=None):
+        self.runs += 1
+        self.gate.wait(5)
+        return pd.DataFrame({'site': ['A', 'A', 'A']})
+
+def test_generate_twice_during_adopted_prefetch_keeps_the_running_task():
+    app = _app()
+    window = FakeMainWindow()
+    engine = BlockingEngine()
+    controller = MainController(engine, window)
+
+    controller._prefetch('v_interventions')
+    [prefetch] = controller.prefetch_tasks.values()
+    while not prefetch.is_started:
+        QThread.msleep(1)
+
+    # Deux clics « Générer » avec les mêmes paramètres pendant le préchargement
+    window.generate_clicked.emit({'view_name': 'v_interventions', 'filters': {'filter_site': 'A'}})
+    window.generate_clicked.emit({'view_name': 'v_interventions', 'filters': {'filter_site': 'A'}})
+
+    assert controller.current_analysis_worker is prefetch and not prefetch.is_cancelled
+    assert controller.prefetch_tasks == {}
+    assert controller.prefetch_policy._in_flight == set()
+
+    engine.gate.set()
+    assert controller.scheduler.pool.waitForDone(5000)
+    app.processEvents()
+
+    assert engine.runs == 1
+    assert window.calls.count('hide_loading') == 1 and window.calls[-1] == ('display', 3)
+    assert controller.current_analysis_worker is None
+    controller.scheduler.shutdown()
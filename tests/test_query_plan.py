@@ -0,0 +1,57 @@
+"""
+Tests des plans d'exécution estimés (sortie EXPLAIN simulée)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.query_plan import QueryPlan, assess_plan
+
+EXPLAIN_OUTPUT = [{'Plan': {
+    'Node Type': 'Hash Join', 'Total Cost': 52000.0, 'Startup Cost': 10.0, 'Plan Rows': 800, 'Plan Width': 24,
+    'Plans': [
+        {'Node Type': 'Seq Scan', 'Relation Name': 'mouvement_stock', 'Total Cost': 48000.0, 'Plan Rows': 2000000},
+        {'Node Type': 'Hash', 'Total Cost': 30.0, 'Plans': [
+            {'Node Type': 'Index Scan', 'Relation Name': 'piece_detachee', 'Index Name': 'piece_detachee_pkey',
+             'Total Cost': 25.0, 'Plan Rows': 40}
+        ]}
+    ]
+}}]
+
+def test_access_paths_list_scans_by_cost():
+    plan = QueryPlan.from_explain(EXPLAIN_OUTPUT)
+
+    assert [(p['node_type'], p['relation'], p['index'], p['full_scan']) for p in plan.access_paths()] == [
+        ('Seq Scan', 'mouvement_stock', None, True),
+        ('Index Scan', 'piece_detachee', 'piece_detachee_pkey', False)
+    ]
+
+def test_bitmap_scan_is_reported_on_the_heap_relation():
+    plan = QueryPlan.from_explain([{'Plan': {
+        'Node Type': 'Bitmap Heap Scan', 'Relation Name': 'maintenance', 'Total Cost': 900.0, 'Plan Rows': 1200,
+        'Plans': [{'Node Type': 'BitmapAnd', 'Total Cost': 60.0, 'Plans': [
+            {'Node Type': 'Bitmap Index Scan', 'Index Name': 'maintenance_date_idx', 'Total Cost': 30.0},
+            {'Node Type': 'Bitmap Index Scan', 'Index Name': 'maintenance_site_idx', 'Total Cost': 25.0}
+        ]}]
+    }}])
+
+    assert plan.access_paths() == [{
+        'node_type': 'Bitmap Heap Scan', 'relation': 'maintenance',
+        'index': 'maintenance_date_idx, maintenance_site_idx',
+        'rows': 1200, 'cost': 900.0, 'full_scan': False
+    }]
+
+def test_costly_sequential_scan_is_flagged_below_the_query_threshold():
+    plan = QueryPlan.from_explain(EXPLAIN_OUTPUT)
+
+    assert assess_plan(plan, max_cost=1000000, max_rows=1000000) == []
+    assert assess_plan(plan, max_cost=1000000, max_rows=1000000, max_scan_cost=10000) == [
+        "Parcours séquentiel de mouvement_stock: coût 48,000 (seuil 10,000)"
+    ]
+    assert assess_plan(plan, max_cost=50000, max_rows=100, max_scan_cost=10000) == [
+        "Coût estimé élevé: 52,000 (seuil 50,000)",
+        "Parcours séquentiels: mouvement_stock",
+        "Résultat volumineux: ~800 lignes (seuil 100)"
+    ]
@@ -0,0 +1,166 @@
+"""
+Tests du service HTTP de requêtes et du moteur distant (moteur d'analyse simulé)
+"""
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.analysis_engine import AnalysisEngine
+from app.models.remote_analysis_engine import RemoteAnalysisEngine, RemoteDatabaseManager
+from reporting_module.models.query_service import MAX_CHART_POINTS, QueryService
+from reporting_module.service import create_server
+from utils.exceptions import ViewNotFoundError
+
+class FakeConfig:
+    def get_max_rows(self):
+        return 10000
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def get_connection_info(self):
+        return {'database': 'gmao', 'username': 'reporting', 'schema': 'public'}
+
+class FakeEngine:
+    def __init__(self):
+        self.db_manager = FakeDatabaseManager()
+        self.queries = 0
+        self.rows = 10
+
+    def get_available_analyses(self):
+        return [{'name': 'v_interventions', 'description': '', 'columns': [], 'column_count': 3}]
+
+    def run_analysis(self, view_name, filters=None, aggregations=None, limit=None):
+        self.queries += 1
+        return pd.DataFrame({
+            'date_intervention': pd.date_range('2025-01-01', periods=self.rows, freq='D'),
+            'site': list('AB' * (self.rows // 2)),
+            'duree': [float(i) for i in range(self.rows)]
+        })
+
+    def get_date_column(self, view_name):
+        return 'date_intervention'
+
+    def get_view_columns(self, view_name):
+        return ['date_intervention', 'site', 'duree']
+
+    validate_analysis_request = AnalysisEngine.validate_analysis_request
+
+    def get_in_flight_stats(self):
+        return {'executions': self.queries, 'saved_queries': 0, 'in_flight': 0}
+
+@pytest.fixture
+def service_url():
+    engine = FakeEngine()
+    service = QueryService(engine, max_workers=2)
+    server = create_server(service, '127.0.0.1', 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", engine
+    server.shutdown()
+    server.server_close()
+    service.shutdown()
+
+def test_remote_engine_uses_shared_cache(service_url):
+    url, engine = service_url
+    remote = RemoteAnalysisEngine(RemoteDatabaseManager(url))
+
+    first = remote.run_analysis('v_interventions', {'date_start': '2025-01-01'})
+    # Sous-plage servie par le cache du service (filtrage local)
+    second = remote.run_analysis('v_interventions', {'date_start': '2025-01-05'})
+
+    assert len(first) == 10 and len(second) == 6
+    assert pd.api.types.is_datetime64_any_dtype(second['date_intervention'])
+    assert remote.get_date_column('v_interventions') == 'date_intervention'
+    assert engine.queries == 1
+
+    with pytest.raises(ViewNotFoundError):
+        remote.run_analysis('v_unknown')
+
+def test_chart_data_endpoint(service_url):
+    url, _ = service_url
+    client = RemoteDatabaseManager(url).client
+
+    data = client.post('/chart-data', {'view': 'v_interventions', 'max_points': 5})
+
+    assert data['x']['name'] == 'date_intervention'
+    assert [s['name'] for s in data['series']] == ['duree']
+    assert data['points'] == 5 and data['total_points'] == 10
+
+def test_chart_data_endpoint_keeps_default_point_cap(service_url):
+    url, engine = service_url
+    engine.rows = MAX_CHART_POINTS * 2
+    client = RemoteDatabaseManager(url).client
+
+    data = client.post('/chart-data', {'view': 'v_interventions'})
+
+    assert data['total_points'] == MAX_CHART_POINTS * 2
+    assert data['points'] == MAX_CHART_POINTS
+
+def post_status(url, body):
+    request = Request(f"{url}/analysis", data=json.dumps(body).encode('utf-8'),
+                      headers={'Content-Type': 'application/json'}, method='POST')
+    try:
+        with urlopen(request) as response:
+            return response.status
+    except HTTPError as e:
+        return e.code
+
+@pytest.mark.parametrize('body', [
+    {'filters': {"filter_site = 'A' OR 1=1; DROP TABLE intervention; --": 'A'}},
+    {'filters': {'date_start': "2025-01-01' OR '1'='1"}},
+    {'filters': {'filter_site': ['A']}},
+    {'aggregations': {'group_by': ['site'], 'sum': ['duree'], 'order_by': 'sum_duree; DROP TABLE intervention'}},
+    {'aggregations': {'group_by': ['pg_sleep(10)']}},
+    {'aggregations': {'max': ['duree']}},
+    {'limit': '10; DROP TABLE intervention'},
+])
+def test_analysis_rejects_injected_identifiers_and_values(service_url, body):
+    url, engine = service_url
+
+    assert post_status(url, {'view': 'v_interventions', **body}) == 400
+    assert engine.queries == 0
+    assert post_status(url, {'view': 'v_interventions', 'filters': {'filter_site': 'A'},
+                             'aggregations': {'group_by': ['site'], 'sum': ['duree'],
+                                              'order_by': 'sum_duree DESC'},
+                             'limit': 5}) == 200
+
+class CatalogDatabaseManager:
+    def get_view_structure(self, view_name):
+        return {'columns': [{'name': 'date_intervention', 'type': 'date', 'nullable': True},
+                            {'name': 'site', 'type': 'text', 'nullable': True},
+                            {'name': 'duree', 'type': 'numeric', 'nullable': True}]}
+
+def test_filter_values_are_bound_parameters():
+    engine = AnalysisEngine(CatalogDatabaseManager(), views=[])
+    value = "A' OR '1'='1"
+
+    query = engine._build_query('v_interventions', {'date_start': '2025-01-01', 'filter_site': value}, None, 5)
+
+    assert value not in str(query)
+    assert str(query) == ("SELECT * FROM v_interventions "
+                          "WHERE date_intervention >= :p0 AND site ILIKE :p1 LIMIT 5")
+    assert query.compile().params == {'p0': '2025-01-01', 'p1': f"%{value}%"}
+
+@pytest.mark.skipif(not os.getenv('DB_HOST'), reason="PostgreSQL non configuré (DB_HOST)")
+def test_injected_value_is_a_literal_on_postgresql():
+    from sqlalchemy import text
+    from app.models.database_manager import DatabaseManager
+
+    db = DatabaseManager()
+    value = "x' OR '1'='1"
+    rows = db.execute_query(
+        text("SELECT count(*) AS n FROM (VALUES ('a'), ('b')) AS t(site) WHERE site ILIKE :p0")
+        .bindparams(p0=f"%{value}%"), fetch_results=True
+    )
+    assert rows[0]['n'] == 0
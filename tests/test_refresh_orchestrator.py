@@ -0,0 +1,74 @@
+"""
+Tests du rafraîchissement ordonné des VIEWs matérialisées (base simulée)
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.refresh_orchestrator import RefreshOrchestrator
+from app.models.refresh_scheduler import MaterializedViewRefreshScheduler
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    """kpi_base <- v_join (vue simple) <- kpi_top ; kpi_base <- kpi_mid ; kpi_alone isolée"""
+    config = FakeConfig()
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.refreshed = []
+        self._lock = threading.Lock()
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        if 'pg_matviews' in query:
+            return [{'schema_name': 'public', 'view_name': name, 'is_populated': True,
+                     'has_unique_index': False}
+                    for name in ('kpi_base', 'kpi_mid', 'kpi_top', 'kpi_alone')]
+        if 'pg_rewrite' in query:
+            return [
+                {'view_name': 'kpi_base', 'view_kind': 'm', 'source_name': 'interventions', 'source_kind': 'r'},
+                {'view_name': 'v_join', 'view_kind': 'v', 'source_name': 'kpi_base', 'source_kind': 'm'},
+                {'view_name': 'kpi_top', 'view_kind': 'm', 'source_name': 'v_join', 'source_kind': 'v'},
+                {'view_name': 'kpi_mid', 'view_kind': 'm', 'source_name': 'kpi_base', 'source_kind': 'm'},
+                {'view_name': 'kpi_alone', 'view_kind': 'm', 'source_name': 'stocks', 'source_kind': 'r'}
+            ]
+        name = query.split('.')[-1].strip('"')
+        if name in self.failing:
+            raise RuntimeError("refresh failed")
+        time.sleep(0.05)
+        with self._lock:
+            self.refreshed.append(name)
+
+def make_orchestrator(db):
+    return RefreshOrchestrator(db, MaterializedViewRefreshScheduler(db), max_workers=2)
+
+def test_views_refresh_after_their_dependencies():
+    db = FakeDatabaseManager()
+    orchestrator = make_orchestrator(db)
+
+    graph = orchestrator.load_graph()
+    assert graph['kpi_top'] == {'kpi_base'} and graph['kpi_alone'] == set()
+
+    report = orchestrator.refresh()
+    assert report.success and sorted(db.refreshed) == ['kpi_alone', 'kpi_base', 'kpi_mid', 'kpi_top']
+    assert db.refreshed.index('kpi_base') < db.refreshed.index('kpi_top')
+    assert db.refreshed.index('kpi_base') < db.refreshed.index('kpi_mid')
+    assert report.critical_path[0] == 'kpi_base' and len(report.critical_path) == 2
+
+    db.refreshed.clear()
+    assert set(orchestrator.refresh(['kpi_top']).results) == {'kpi_base', 'kpi_top'}
+
+def test_failure_skips_dependents_only():
+    db = FakeDatabaseManager(failing={'kpi_base'})
+    report = make_orchestrator(db).refresh()
+
+    statuses = {name: result.status for name, result in report.results.items()}
+    assert statuses == {'kpi_base': 'failed', 'kpi_mid': 'skipped',
+                        'kpi_top': 'skipped', 'kpi_alone': 'refreshed'}
+    assert not report.success
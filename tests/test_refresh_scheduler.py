@@ -0,0 +1,94 @@
+"""
+Tests de l'ordonnanceur de rafraîchissement des VIEWs matérialisées (base simulée)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.refresh_scheduler import MaterializedViewRefreshScheduler
+
+class FakePgError(Exception):
+    """Erreur du pilote avec son SQLSTATE (comme psycopg2)"""
+
+    def __init__(self, message, pgcode):
+        super().__init__(message)
+        self.pgcode = pgcode
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self):
+        self.statements = []
+        self.concurrent_error = None
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        if fetch_results:
+            return [
+                {'schema_name': 'public', 'view_name': 'kpi_maint_backlog', 'is_populated': True, 'has_unique_index': True},
+                {'schema_name': 'public', 'view_name': 'kpi_stock_levels', 'is_populated': False, 'has_unique_index': False},
+                {'schema_name': 'public', 'view_name': 'kpi_maint_mttr', 'is_populated': True, 'has_unique_index': True}
+            ]
+        if 'CONCURRENTLY' in query and 'mttr' in query:
+            try:
+                raise FakePgError("cannot refresh materialized view concurrently", '55000')
+            except FakePgError as e:
+                # Enveloppée comme par DatabaseManager.execute_query
+                raise RuntimeError(f"Erreur lors de l'exécution: {e}")
+        if 'CONCURRENTLY' in query and self.concurrent_error:
+            raise self.concurrent_error
+        self.statements.append(query)
+
+def test_due_views_are_capped_and_prioritised():
+    db = FakeDatabaseManager()
+    scheduler = MaterializedViewRefreshScheduler(db, base_interval=100, min_interval=10, max_concurrent=2)
+    scheduler.discover()
+
+    # Jamais remplie : due immédiatement, les autres après l'intervalle de base
+    assert scheduler.acquire_due() == ['kpi_stock_levels']
+    assert scheduler.refresh('kpi_stock_levels').success
+    assert db.statements == ['REFRESH MATERIALIZED VIEW "public"."kpi_stock_levels"']
+
+    later = scheduler._states['kpi_maint_backlog'].last_refresh + 1000
+    due = scheduler.acquire_due(now=later)
+    assert len(due) == 2 and scheduler.acquire_due(now=later) == []
+
+def test_expensive_views_refresh_less_often_and_fallback():
+    db = FakeDatabaseManager()
+    scheduler = MaterializedViewRefreshScheduler(db, base_interval=100, cost_factor=20)
+    scheduler.discover()
+
+    outcome = scheduler.refresh('kpi_maint_mttr')
+    assert outcome.success and not outcome.concurrent
+    assert db.statements[-1] == 'REFRESH MATERIALIZED VIEW "public"."kpi_maint_mttr"'
+
+    cheap = scheduler._states['kpi_maint_backlog']
+    expensive = scheduler._states['kpi_maint_mttr']
+    expensive.avg_duration = 30.0
+    assert scheduler.interval_for(expensive) == 700 > scheduler.interval_for(cheap)
+
+def test_transient_error_does_not_disable_concurrent_refresh():
+    db = FakeDatabaseManager()
+    scheduler = MaterializedViewRefreshScheduler(db)
+    scheduler.discover()
+    db.concurrent_error = FakePgError("canceling statement due to lock timeout", '55P03')
+
+    outcome = scheduler.refresh('kpi_maint_backlog')
+
+    assert not outcome.success and outcome.concurrent
+    assert db.statements == []  # Pas de repli bloquant
+    assert scheduler._states['kpi_maint_backlog'].has_unique_index
+
+    db.concurrent_error = None
+    assert scheduler.refresh('kpi_maint_backlog').concurrent
+
+    # Refus réel : repli jusqu'au recensement suivant, qui relit l'index unique
+    scheduler.refresh('kpi_maint_mttr')
+    assert not scheduler._states['kpi_maint_mttr'].has_unique_index
+    scheduler.discover()
+    assert scheduler._states['kpi_maint_mttr'].has_unique_index
@@ -0,0 +1,43 @@
+"""
+Tests for the result schema inference
+"""
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.result_schema import ColumnRole, infer_result_schema
+
+def _sample_frame():
+    return pd.DataFrame({
+        'machine_id': [3, 1, 2, 1],
+        'date_intervention': [date(2024, 1, 20), date(2024, 1, 5), None, date(2024, 2, 1)],
+        'atelier': ['A', 'B', 'A', 'C'],
+        'cout_total': [120.5, 80.0, 42.0, 300.0],
+    })
+
+def test_roles_are_inferred_once():
+    """Date-like object columns become datetime64 and the time axis"""
+    df, schema = infer_result_schema(_sample_frame())
+
+    assert schema.time_axis == 'date_intervention'
+    assert pd.api.types.is_datetime64_any_dtype(df['date_intervention'])
+    assert schema.roles['cout_total'] == ColumnRole.MEASURE
+    assert schema.roles['machine_id'] == ColumnRole.DIMENSION
+    assert schema.roles['atelier'] == ColumnRole.DIMENSION
+
+def test_date_range_slice_keeps_row_order():
+    """The sorted index returns the matching rows in their original order"""
+    df, schema = infer_result_schema(_sample_frame())
+
+    sliced = schema.slice_date_range(df, date(2024, 1, 5), date(2024, 1, 20))
+
+    assert list(sliced['cout_total']) == [120.5, 80.0]
+
+def test_slice_without_time_bounds_drops_null_dates():
+    df, schema = infer_result_schema(_sample_frame())
+
+    assert len(schema.slice_time_range(df)) == 3
@@ -0,0 +1,108 @@
+"""
+Tests des cumuls journaliers des KPI temporels (base simulée)
+"""
+import sys
+from contextlib import contextmanager
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.rollup_manager import RollupManager
+from app.models.view_builder import ModuleType, ViewBuilder, ViewDefinition, ViewStorage
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeResult:
+    def __init__(self, value=None, rowcount=0):
+        self.value = value
+        self.rowcount = rowcount
+
+    def scalar(self):
+        return self.value
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def exec_driver_sql(self, sql, params=None):
+        self.db.statements.append(sql)
+        if sql.startswith('SELECT max(day)'):
+            return FakeResult(self.db.last_day)
+        return FakeResult(rowcount=4)
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self, last_day=None):
+        self.last_day = last_day
+        self.statements = []
+        self.updates = []
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        if fetch_results is False:
+            self.updates.append(query)
+            return None
+        return []
+
+    @contextmanager
+    def transaction(self):
+        yield FakeConnection(self)
+
+def make_definition(grouping='quarterly', aggregations=None):
+    return ViewDefinition(
+        name='Couts', main_table='maintenance', x_field='date_debut_reelle',
+        y_fields=['cout_total', 'duree_intervention_h'],
+        aggregations=aggregations or {'y1': 'SUM', 'y2': 'AVG'}, grouping=grouping,
+        filters={'min_value': 10}, module_type=ModuleType.TEMPORAL, storage=ViewStorage.ROLLUP
+    )
+
+def test_rollup_creates_daily_table_and_regroups_additive_aggregates():
+    builder = ViewBuilder()
+    view_def = make_definition()
+
+    assert builder.validate_view_definition(view_def) == (True, [])
+    assert not view_def.is_materialized
+    sql = builder.generate_view_sql(view_def)
+
+    assert sql.startswith('CREATE TABLE rollup_kpi_temporal_couts AS\n'
+                          "SELECT DATE_TRUNC('day', date_debut_reelle)::date AS day, "
+                          'SUM(cout_total) AS cout_total_sum, SUM(duree_intervention_h) AS duree_intervention_h_sum, '
+                          'COUNT(duree_intervention_h) AS duree_intervention_h_count')
+    assert 'WHERE cout_total >= 10 AND date_debut_reelle IS NOT NULL' in sql
+    assert 'ALTER TABLE rollup_kpi_temporal_couts ADD PRIMARY KEY (day);' in sql
+    assert ("CREATE VIEW kpi_temporal_couts AS\n"
+            "SELECT DATE_TRUNC('quarter', day) as date_debut_reelle_grouped, "
+            "SUM(cout_total_sum) as cout_total_sum, "
+            "SUM(duree_intervention_h_sum)::numeric / NULLIF(SUM(duree_intervention_h_count), 0) "
+            "as duree_intervention_h_avg\nFROM rollup_kpi_temporal_couts") in sql
+
+def test_rollup_requires_date_grouping_and_aggregated_fields():
+    builder = ViewBuilder()
+    is_valid, errors = builder.validate_view_definition(
+        make_definition(grouping='none', aggregations={'y1': 'SUM', 'y2': 'NONE'})
+    )
+
+    assert not is_valid
+    assert "Un groupement temporel est requis pour le cumul journalier" in errors
+    assert "Le cumul journalier requiert une agrégation pour chaque champ Y" in errors
+
+def test_refresh_recomputes_only_recent_days():
+    db = FakeDatabaseManager(last_day=date(2025, 6, 30))
+    manager = RollupManager(db, lookback_days=3)
+
+    result = manager.refresh(make_definition(), 'kpi_temporal_couts')
+
+    assert (result.since, result.days, result.full) == (date(2025, 6, 27), 4, False)
+    assert db.statements[0] == 'LOCK TABLE rollup_kpi_temporal_couts IN SHARE ROW EXCLUSIVE MODE'
+    assert db.statements[2] == "DELETE FROM rollup_kpi_temporal_couts WHERE day >= DATE '2025-06-27'"
+    assert db.statements[3].startswith('INSERT INTO rollup_kpi_temporal_couts\nSELECT')
+    assert db.statements[3].endswith("date_debut_reelle >= DATE '2025-06-27'\nGROUP BY 1")
+    assert db.updates[-1].startswith('UPDATE public.kpi_view_metadata SET last_refresh_at')
+
+    db = FakeDatabaseManager()
+    result = RollupManager(db).refresh(make_definition(), 'kpi_temporal_couts')
+    assert result.full and db.statements[2] == 'DELETE FROM rollup_kpi_temporal_couts'
@@ -0,0 +1,47 @@
+"""
+Tests des nombres de lignes estimés ou exacts (base simulée)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.row_count_provider import RowCountProvider
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self):
+        self.queries = []
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        self.queries.append(query)
+        if 'reltuples' in query:
+            return [{'view_name': 'kpi_performance_mttr', 'estimate': 1200}]
+        if query.startswith('EXPLAIN'):
+            return [{'QUERY PLAN': [{'Plan': {'Plan Rows': 48}}]}]
+        return [{'row_count': 51}]
+
+def test_listing_uses_estimates_then_exact_counts():
+    db = FakeDatabaseManager()
+    provider = RowCountProvider(db)
+    views = ['kpi_performance_mttr', 'kpi_temporal_backlog']
+
+    counts = provider.get_counts(views, materialized=['kpi_performance_mttr'])
+
+    assert (counts['kpi_performance_mttr'].count, counts['kpi_performance_mttr'].source) == (1200, 'statistics')
+    assert (counts['kpi_temporal_backlog'].count, counts['kpi_temporal_backlog'].source) == (48, 'planner')
+    assert not any(count.exact for count in counts.values())
+    assert not any('COUNT(*)' in query for query in db.queries)
+
+    assert provider.count_exact('kpi_temporal_backlog') == 51
+    queries_before = len(db.queries)
+    counts = provider.get_counts(views, materialized=['kpi_performance_mttr'])
+    assert counts['kpi_temporal_backlog'].exact and counts['kpi_temporal_backlog'].count == 51
+    assert len(db.queries) == queries_before
+    assert not provider.needs_exact('kpi_temporal_backlog') and provider.needs_exact('kpi_performance_mttr')
@@ -0,0 +1,76 @@
+"""
+Tests for in-flight request coalescing
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.utils.single_flight import SingleFlight
+
+def _run_concurrently(flight, key, fn, count):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flight.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return results, errors
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = []
+
+    def query():
+        executions.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results, errors = _run_concurrently(flight, ('analysis', 'v'), query, 5)
+
+    assert not errors
+    assert len(executions) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.get_stats()['saved_queries'] == 4
+
+def test_leader_error_is_shared_and_nothing_is_kept():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    results, errors = _run_concurrently(flight, 'k', failing, 3)
+    assert not results and len(errors) == 3
+
+    assert flight.do('k', lambda: 42) == 42
+
+def test_followers_retry_when_leader_is_cancelled():
+    class Cancelled(Exception):
+        pass
+
+    flight = SingleFlight(retry_on=(Cancelled,))
+    started = threading.Event()
+
+    def cancelled_leader():
+        started.set()
+        time.sleep(0.1)
+        raise Cancelled()
+
+    leader = threading.Thread(target=lambda: pytest.raises(Cancelled, flight.do, 'k', cancelled_leader))
+    leader.start()
+    started.wait(5)
+
+    assert flight.do('k', lambda: 'fresh') == 'fresh'
+    leader.join(5)
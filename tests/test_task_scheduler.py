@@ -0,0 +1,74 @@
+"""
+Tests for the background task scheduler
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from PySide6.QtCore import QCoreApplication, QThread
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.utils.task_scheduler import ScheduledTask, TaskPriority, TaskScheduler
+
+class _RecordingTask(ScheduledTask):
+    def __init__(self, name, log, gate=None, key=None, priority=TaskPriority.INFO):
+        super().__init__(key=key, priority=priority)
+        self.name = name
+        self.log = log
+        self.gate = gate
+
+    def run(self):
+        if self.gate is not None:
+            self.gate.wait(5)
+        self.log.append(self.name)
+
+def _app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+def test_priority_order_and_pending_deduplication():
+    """Higher priorities run first; a pending task with the same key is replaced"""
+    app = _app()
+    scheduler = TaskScheduler(max_threads=1)
+    log, gate = [], threading.Event()
+
+    blocker = scheduler.submit(_RecordingTask('blocker', log, gate=gate))
+    while not blocker.is_started:
+        QThread.msleep(1)
+    scheduler.submit(_RecordingTask('prefetch', log, priority=TaskPriority.PREFETCH))
+    scheduler.submit(_RecordingTask('info-old', log, key=('view_info', 'v')))
+    scheduler.submit(_RecordingTask('info-new', log, key=('view_info', 'v')))
+    scheduler.submit(_RecordingTask('analysis', log, priority=TaskPriority.ANALYSIS))
+
+    assert scheduler.queue_depth() == 3
+    gate.set()
+    assert scheduler.pool.waitForDone(5000)
+    app.processEvents()
+
+    assert log == ['blocker', 'analysis', 'info-new', 'prefetch']
+    assert scheduler.get_stats()['deduplicated'] == 1
+
+def test_cancelled_pending_task_never_runs():
+    app = _app()
+    scheduler = TaskScheduler(max_threads=1)
+    log, gate = [], threading.Event()
+
+    blocker = scheduler.submit(_RecordingTask('blocker', log, gate=gate))
+    while not blocker.is_started:
+        QThread.msleep(1)
+    task = scheduler.submit(_RecordingTask('cancelled', log))
+    scheduler.cancel(task)
+    gate.set()
+    assert scheduler.shutdown(5000)
+    app.processEvents()
+
+    assert log == ['blocker']
+
+def test_scheduled_task_is_abstract():
+    """A task without run() cannot be instantiated"""
+    class _Incomplete(ScheduledTask):
+        pass
+
+    with pytest.raises(TypeError):
+        _Incomplete()
@@ -0,0 +1,111 @@
+"""
+Tests de la création groupée des VIEWs KPI (base simulée)
+"""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.view_builder import ModuleType, ViewDefinition
+from app.models.view_manager import ViewManager
+from app.utils.view_exceptions import ViewCreationCancelled
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeSavepoint:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def commit(self):
+        self.conn.log.append('RELEASE')
+
+    def rollback(self):
+        self.conn.log.append('ROLLBACK TO')
+
+class FakeConnection:
+    def __init__(self, log):
+        self.log = log
+
+    def begin_nested(self):
+        self.log.append('SAVEPOINT')
+        return FakeSavepoint(self)
+
+    def exec_driver_sql(self, sql, params=None):
+        if 'broken' in sql:
+            raise RuntimeError('column "broken" does not exist')
+        self.log.append(sql.split(' AS')[0])
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self):
+        self.log = []
+        self.catalog_queries = 0
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        if fetch_results is False:
+            return None
+        if 'kpi_view_metadata' in query:
+            return []
+        if 'fingerprint' in query:
+            return [{'fingerprint': 'f0'}]
+        if 'obj_description' in query:
+            return [{'table_name': 'maintenance', 'comment': None}]
+        self.catalog_queries += 1
+        return [{'view_name': 'kpi_temporal_backlog', 'is_materialized': False}]
+
+    @contextmanager
+    def transaction(self):
+        self.log.append('BEGIN')
+        try:
+            yield FakeConnection(self.log)
+        except Exception:
+            self.log.append('ROLLBACK')
+            raise
+        self.log.append('COMMIT')
+
+def make_definition(name, y_field='cout_total'):
+    return ViewDefinition(
+        name=name, main_table='maintenance', x_field='date_debut_reelle',
+        y_fields=[y_field], aggregations={'y1': 'SUM'}, grouping='monthly',
+        filters={}, module_type=ModuleType.TEMPORAL
+    )
+
+def test_bulk_creation_uses_one_snapshot_and_one_transaction():
+    db = FakeDatabaseManager()
+    manager = ViewManager(db)
+    progress = []
+    definitions = [make_definition('backlog'), make_definition('costs', 'broken'),
+                   make_definition('mttr'), make_definition('')]
+
+    results = manager.create_views_bulk(definitions, progress_callback=lambda *args: progress.append(args))
+
+    assert results['success'] == ['kpi_temporal_backlog', 'kpi_temporal_mttr']
+    assert len(results['errors']) == 2 and 'broken' in results['errors'][1]
+    assert db.catalog_queries == 1
+    assert db.log[0] == 'BEGIN' and db.log[-1] == 'COMMIT' and db.log.count('BEGIN') == 1
+    assert ('DROP VIEW kpi_temporal_backlog;\nDROP TABLE IF EXISTS rollup_kpi_temporal_backlog;\n'
+            'CREATE VIEW kpi_temporal_backlog') in db.log
+    assert db.log.count('ROLLBACK TO') == 1 and db.log.count('RELEASE') == 2
+    # Métadonnées écrites sous le point de sauvegarde de chaque VIEW créée
+    assert sum('INSERT INTO public.kpi_view_metadata' in entry for entry in db.log) == 2
+    assert [p[0] for p in progress] == [1, 2, 3]
+    assert manager.registry.exists('kpi_temporal_mttr')
+
+def test_cancelled_bulk_creation_rolls_everything_back():
+    db = FakeDatabaseManager()
+    manager = ViewManager(db)
+
+    with pytest.raises(ViewCreationCancelled):
+        manager.create_views_bulk([make_definition('a'), make_definition('b')],
+                                  progress_callback=lambda *args: None,
+                                  is_cancelled=lambda: 'RELEASE' in db.log)
+
+    assert db.log[-1] == 'ROLLBACK'
+    assert not manager.registry.exists('kpi_temporal_a')
@@ -0,0 +1,158 @@
+"""
+Tests du contrôleur des VIEWs KPI (base simulée)
+"""
+import sys
+import threading
+from pathlib import Path
+
+from PySide6.QtCore import QCoreApplication
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.controllers.view_kpi_controller import ViewKpiController
+from app.models.refresh_orchestrator import RefreshReport
+from app.models.rollup_manager import RollupRefreshResult
+from app.utils.task_scheduler import TaskPriority, TaskScheduler
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self):
+        self.refreshes = []
+        self.discovery_threads = []
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        query = str(query)
+        if 'REFRESH MATERIALIZED VIEW' in query:
+            self.refreshes.append((query, threading.get_ident()))
+        elif 'matviewname' in query:
+            self.discovery_threads.append(threading.get_ident())
+            return [{'schema_name': 'public', 'view_name': 'kpi_temporal_stock_levels',
+                     'is_populated': False, 'has_unique_index': False}]
+        return [] if fetch_results else None
+
+def _app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+def test_refresh_tick_submits_matview_refreshes_to_the_shared_scheduler():
+    app = _app()
+    db = FakeDatabaseManager()
+    scheduler = TaskScheduler(max_threads=2)
+    controller = ViewKpiController(db, task_scheduler=scheduler)
+    refreshed = []
+    controller.matview_refreshed.connect(lambda name, success, duration: refreshed.append((name, success)))
+
+    controller._on_refresh_tick()
+
+    # Recensement en tâche de fond, puis rafraîchissement des VIEWs échues
+    assert scheduler.pool.waitForDone(5000)
+    app.processEvents()
+    assert list(controller._refresh_tasks) == ['kpi_temporal_stock_levels']
+    assert scheduler.pool.waitForDone(5000)
+    app.processEvents()
+    assert len(db.discovery_threads) == 1 and db.discovery_threads[0] != threading.get_ident()
+    assert [query for query, _ in db.refreshes] == ['REFRESH MATERIALIZED VIEW "public"."kpi_temporal_stock_levels"']
+    assert db.refreshes[0][1] != threading.get_ident()
+    assert refreshed == [('kpi_temporal_stock_levels', True)]
+    assert controller._refresh_tasks == {}
+
+class FakeRollupManager:
+    def __init__(self):
+        self.threads = []
+
+    def refresh_all(self):
+        self.threads.append(threading.get_ident())
+        return [RollupRefreshResult('kpi_temporal_backlog', None, 90, 0.1)]
+
+def test_refresh_tick_updates_rollup_views_once_per_interval():
+    app = _app()
+    scheduler = TaskScheduler(max_threads=2)
+    controller = ViewKpiController(FakeDatabaseManager(), task_scheduler=scheduler)
+    controller.view_manager.rollups = rollups = FakeRollupManager()
+    refreshed = []
+    controller.rollups_refreshed.connect(lambda results: refreshed.extend(r.view_name for r in results))
+
+    controller._on_refresh_tick()
+    controller._on_refresh_tick()  # Passe en cours : pas de seconde soumission
+    assert scheduler.pool.waitForDone(5000)
+    app.processEvents()
+
+    assert len(rollups.threads) == 1 and rollups.threads[0] != threading.get_ident()
+    assert refreshed == ['kpi_temporal_backlog']
+
+    # Intervalle de base non écoulé : rien de plus
+    controller._on_refresh_tick()
+    assert scheduler.pool.waitForDone(5000)
+    assert len(rollups.threads) == 1
+
+class FakeOrchestrator:
+    def __init__(self):
+        self.threads = []
+        self.max_workers = 1
+
+    def refresh(self, targets=None):
+        self.threads.append(threading.get_ident())
+        return RefreshReport(results={}, order=[], wall_time=0.5, critical_path=[],
+                             critical_path_seconds=0.0, max_workers=self.max_workers)
+
+def test_ordered_refresh_runs_in_the_shared_scheduler():
+    app = _app()
+    scheduler = TaskScheduler(max_threads=2)
+    controller = ViewKpiController(FakeDatabaseManager(), task_scheduler=scheduler)
+    controller.refresh_orchestrator = orchestrator = FakeOrchestrator()
+    reports, errors = [], []
+    controller.ordered_refresh_completed.connect(reports.append)
+    controller.error_occurred.connect(errors.append)
+
+    controller.refresh_materialized_views(max_workers=3)
+    controller.refresh_materialized_views()  # Passe en cours : refusée
+    assert controller.ordered_refresh_worker.priority == TaskPriority.MAINTENANCE
+    assert scheduler.pool.waitForDone(5000)
+    app.processEvents()
+
+    assert len(orchestrator.threads) == 1 and orchestrator.threads[0] != threading.get_ident()
+    assert orchestrator.max_workers == 3
+    assert len(reports) == 1 and errors == ["Un rafraîchissement ordonné est déjà en cours"]
+    assert controller.ordered_refresh_worker is None
+
+class BlockingRowCounts:
+    def __init__(self):
+        self.gate = threading.Event()
+        self.counted = []
+
+    def count_exact_rows(self, view_name):
+        if not self.counted:
+            self.gate.wait(5)
+        self.counted.append(view_name)
+        return len(self.counted)
+
+def test_new_listing_cancels_running_exact_counts():
+    app = _app()
+    scheduler = TaskScheduler(max_threads=2)
+    controller = ViewKpiController(FakeDatabaseManager(), task_scheduler=scheduler)
+    counts = BlockingRowCounts()
+    controller.view_manager.count_exact_rows = counts.count_exact_rows
+    updated = []
+    controller.row_count_updated.connect(lambda name, count, exact: updated.append(name))
+
+    controller._start_exact_counts(['kpi_temporal_a', 'kpi_temporal_b'])
+    first = controller.count_worker
+    assert first.priority == TaskPriority.INFO
+    while not first.is_started:
+        app.processEvents()
+
+    # Nouveau listage pendant le premier comptage : arrêt après celui-ci
+    controller._start_exact_counts(['kpi_temporal_c'])
+    assert first.is_cancelled
+    counts.gate.set()
+    assert scheduler.pool.waitForDone(5000)
+    app.processEvents()
+
+    assert sorted(counts.counted) == ['kpi_temporal_a', 'kpi_temporal_c']
+    assert sorted(updated) == ['kpi_temporal_a', 'kpi_temporal_c']
+    assert controller.count_worker is None
@@ -0,0 +1,52 @@
+"""
+Tests du registre des noms de VIEWs KPI (catalogue simulé)
+"""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.view_builder import ModuleType, ViewBuilder
+from app.models.view_registry import ViewRegistry
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self):
+        self.catalog_queries = 0
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        self.catalog_queries += 1
+        return [
+            {'view_name': 'kpi_temporal_Backlog', 'is_materialized': False},
+            {'view_name': 'kpi_performance_mttr', 'is_materialized': True},
+            {'view_name': 'v_interventions', 'is_materialized': False}
+        ]
+
+def test_lookups_use_a_single_catalog_query():
+    db = FakeDatabaseManager()
+    registry = ViewRegistry(db, ViewBuilder().prefixes)
+
+    assert registry.exists('KPI_TEMPORAL_BACKLOG')
+    assert registry.resolve('backlog') == 'kpi_temporal_backlog'
+    assert registry.resolve('MTTR') == 'kpi_performance_mttr'
+    assert registry.resolve('unknown') is None
+    assert registry.is_materialized('kpi_performance_mttr')
+    assert registry.kpi_views(ModuleType.PERFORMANCE) == ['kpi_performance_mttr']
+    assert registry.kpi_views() == ['kpi_performance_mttr', 'kpi_temporal_backlog']
+    assert db.catalog_queries == 1
+
+    registry.add('kpi_comparison_sites')
+    registry.remove('kpi_temporal_backlog')
+    assert registry.resolve('sites') == 'kpi_comparison_sites'
+    assert not registry.exists('kpi_temporal_backlog') and registry.resolve('backlog') is None
+    assert db.catalog_queries == 1
+
+    registry.ttl = 0
+    registry.exists('kpi_comparison_sites')
+    assert db.catalog_queries == 2
@@ -0,0 +1,97 @@
+"""
+Tests des modes de stockage des VIEWs KPI (base simulée)
+"""
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "app"))
+
+from app.models.view_builder import ModuleType, ViewBuilder, ViewDefinition, ViewStorage
+from app.models.view_manager import ViewManager
+
+class FakeConfig:
+    def get_schema(self):
+        return 'public'
+
+    def get_plan_cost_warning(self):
+        return 1000.0
+
+    def get_plan_rows_warning(self):
+        return 100
+
+class FakeDatabaseManager:
+    config = FakeConfig()
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.statements = []
+
+    def execute_query(self, query, params=None, fetch_results=None):
+        if 'has_unique_index' in query:
+            return [{'has_unique_index': True}]
+        if fetch_results:
+            return self.catalog
+        self.statements.append(query)
+
+    @contextmanager
+    def transaction(self):
+        yield self
+
+    def exec_driver_sql(self, sql, params=None):
+        self.statements.append(sql)
+
+    def explain(self, query, params=None):
+        self.statements.append(f"EXPLAIN {query}")
+        return [{'Plan': {'Node Type': 'Seq Scan', 'Relation Name': 'maintenance',
+                          'Total Cost': 12000.0, 'Plan Rows': 24, 'Plan Width': 16}}]
+
+def make_definition(storage, grouping='monthly'):
+    return ViewDefinition(
+        name='Backlog', main_table='maintenance', x_field='date_debut_reelle',
+        y_fields=['cout_total'], aggregations={'y1': 'SUM'}, grouping=grouping,
+        filters={}, module_type=ModuleType.TEMPORAL, storage=storage
+    )
+
+def test_generated_sql_follows_storage_mode():
+    builder = ViewBuilder()
+
+    plain = builder.generate_view_sql(make_definition(ViewStorage.VIEW))
+    assert plain.startswith('CREATE VIEW kpi_temporal_backlog AS') and 'INDEX' not in plain
+
+    materialized = builder.generate_view_sql(make_definition(ViewStorage.MATERIALIZED))
+    assert materialized.startswith('CREATE MATERIALIZED VIEW kpi_temporal_backlog AS')
+    assert 'WITH DATA' in materialized and 'INDEX' not in materialized
+
+    indexed = builder.generate_view_sql(make_definition(ViewStorage.MATERIALIZED_INDEXED))
+    assert indexed.endswith('CREATE UNIQUE INDEX kpi_temporal_backlog_key_uidx '
+                            'ON kpi_temporal_backlog (date_debut_reelle_grouped);')
+
+    # Sans groupement, aucune clé unique à indexer
+    is_valid, errors = builder.validate_view_definition(
+        make_definition(ViewStorage.MATERIALIZED_INDEXED, grouping='none'))
+    assert not is_valid and errors
+
+def test_recreate_and_refresh_materialized_view():
+    db = FakeDatabaseManager([{'view_name': 'kpi_temporal_backlog', 'is_materialized': True}])
+    manager = ViewManager(db)
+
+    assert manager.create_view(make_definition(ViewStorage.MATERIALIZED_INDEXED), force_recreate=True)
+    # Validation par EXPLAIN du SELECT (aucune DDL), puis recréation en une transaction
+    assert db.statements[0].startswith('EXPLAIN SELECT')
+    assert db.statements[2].startswith('DROP MATERIALIZED VIEW kpi_temporal_backlog;\nCREATE MATERIALIZED VIEW')
+    # Métadonnées enregistrées dans la transaction de la DDL
+    assert db.statements[1].startswith('\nCREATE TABLE IF NOT EXISTS public.kpi_view_metadata')
+    assert db.statements[3].lstrip().startswith('INSERT INTO public.kpi_view_metadata')
+    assert not any('temp_validate' in statement for statement in db.statements)
+
+    validation = manager.validate_query_plan(make_definition(ViewStorage.VIEW))
+    assert validation.valid and validation.plan_rows == 24
+    assert validation.warnings[0].startswith('Coût estimé élevé')
+    assert validation.warnings[1] == 'Parcours séquentiels: maintenance'
+    assert manager.registry.is_materialized('kpi_temporal_backlog')
+
+    assert manager.refresh_view('backlog')
+    assert db.statements[-2] == 'REFRESH MATERIALIZED VIEW CONCURRENTLY kpi_temporal_backlog;'
+    assert db.statements[-1].startswith('UPDATE public.kpi_view_metadata SET last_refresh_at')